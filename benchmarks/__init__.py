@@ -0,0 +1,5 @@
+"""Reproducible Guard Bands benchmarks.
+
+Run ``make bench`` (or ``python -m benchmarks``) from the repository root. See
+``docs/LIMITS.md`` for the cases, output format, and regression gate.
+"""
@@ -0,0 +1,74 @@
+"""Command-line entry point: ``python -m benchmarks``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from .cases import QUICK_SIZES, SIZES, all_cases
+from .harness import (
+    DEFAULT_THRESHOLD,
+    Measurement,
+    compare,
+    format_ns,
+    load_results,
+    regressions,
+    run_suite,
+    write_results,
+)
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="two payload sizes, short samples")
+    parser.add_argument("--filter", default="", help="only run cases whose key contains this")
+    parser.add_argument("--output", type=Path, help="write JSON results to this path")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="fail when a median is this fraction slower than the baseline",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="overwrite the baseline with this run"
+    )
+    parser.add_argument("--min-time", type=float, default=None, help="seconds per sample")
+    parser.add_argument("--repeat", type=int, default=None, help="samples per case")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    min_time = args.min_time if args.min_time is not None else (0.02 if args.quick else 0.2)
+    repeat = args.repeat if args.repeat is not None else (3 if args.quick else 5)
+    cases = [case for case in all_cases(sizes) if args.filter in case.key]
+
+    def report(measurement: Measurement) -> None:
+        print(f"{measurement.key:<48} {format_ns(measurement.median_ns):>12}", flush=True)
+
+    results = run_suite(cases, min_time=min_time, repeat=repeat, report=report)
+    if args.output is not None:
+        write_results(args.output, results)
+    if args.update_baseline:
+        write_results(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; skipping regression check")
+        return 0
+
+    comparisons = compare(results, load_results(args.baseline))
+    slower = regressions(comparisons, args.threshold)
+    print(f"\nCompared {len(comparisons)} cases with {args.baseline}")
+    for item in slower:
+        print(
+            f"REGRESSION {item.key}: {format_ns(item.baseline)} -> "
+            f"{format_ns(item.current)} ({item.ratio:.2f}x)"
+        )
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Drive ASGI applications in-process, without a server or network socket."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
+
+ASGIApp = Callable[..., Awaitable[None]]
+
+
+def http_scope(
+    path: str,
+    *,
+    method: str = "POST",
+    headers: Iterable[tuple[bytes, bytes]] = (),
+) -> dict[str, Any]:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": b"",
+        "root_path": "",
+        "headers": list(headers),
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+    }
+
+
+def json_headers(body: bytes) -> list[tuple[bytes, bytes]]:
+    return [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+    ]
+
+
+async def request(
+    app: ASGIApp,
+    path: str,
+    body: bytes,
+    *,
+    chunk_size: int = 65_536,
+    headers: Iterable[tuple[bytes, bytes]] | None = None,
+) -> int:
+    """Send one HTTP request through ``app`` and return the response status.
+
+    The body is delivered in ``chunk_size`` pieces, as ASGI servers do, and
+    the response body is consumed and discarded.
+    """
+    chunks = [body[index : index + chunk_size] for index in range(0, len(body), chunk_size)]
+    chunks = chunks or [b""]
+    position = 0
+    status = 0
+
+    async def receive() -> dict[str, Any]:
+        nonlocal position
+        if position < len(chunks):
+            chunk = chunks[position]
+            position += 1
+            return {
+                "type": "http.request",
+                "body": chunk,
+                "more_body": position < len(chunks),
+            }
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = http_scope(path, headers=json_headers(body) if headers is None else headers)
+    await app(scope, receive, send)
+    return status
+
+
+async def websocket_session(app: ASGIApp, path: str, messages: Iterable[str]) -> int:
+    """Open one WebSocket, send ``messages`` as text frames, and close it.
+
+    Returns the number of frames the application sent back.
+    """
+    incoming: list[dict[str, Any]] = [{"type": "websocket.connect"}]
+    incoming += [{"type": "websocket.receive", "text": text} for text in messages]
+    incoming.append({"type": "websocket.disconnect", "code": 1000})
+    position = 0
+    replies = 0
+
+    async def receive() -> dict[str, Any]:
+        nonlocal position
+        message = incoming[min(position, len(incoming) - 1)]
+        position += 1
+        return message
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal replies
+        if message["type"] == "websocket.send":
+            replies += 1
+
+    scope = http_scope(path, method="GET")
+    scope.update(type="websocket", scheme="ws", subprotocols=[])
+    del scope["method"]
+    await app(scope, receive, send)
+    return replies
@@ -0,0 +1,733 @@
+"""Benchmark cases for the core, the replay ledgers, and both integrations.
+
+Every case builds its inputs in ``setup`` so only the operation under test is
+timed. Payload-sized cases are swept across ``SIZES``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+from guardbands import (
+    DIGEST_TEXT_KIND,
+    TEXT_KIND,
+    AsyncRESPReplayLedger,
+    GuardBandCrypto,
+    NonceReplayLedger,
+    RESPReplayLedger,
+    SQLiteReplayLedger,
+    StaticKeyResolver,
+    canonical_json,
+    extract_guard_band_blocks,
+)
+from guardbands.crypto import _canonical_json_v1
+
+from .asgi import request, websocket_session
+from .harness import BenchmarkCase, Fixture
+from .resp_stub import RESPStubServer
+
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (100, 10_000)
+CONTEXT = {
+    "request_id": "req-bench-0001",
+    "tenant_id": "tenant-a",
+    "user": "alice",
+    "policy_path": "support.summarize",
+}
+# Extraction rescans to the next marker close for every forged start, so its
+# cost grows quadratically with marker density; larger hostile inputs take
+# tens of seconds per sample and are left out of the sweep.
+HOSTILE_MAX_SIZE = 100_000
+BATCH_SIZE = 32
+RESULT_BLOCKS = 16
+COALESCED_CONSUMES = 64
+# Use a real Redis-protocol server with GUARDBANDS_BENCH_RESP=host:port;
+# otherwise the in-process test stub stands in for one.
+RESP_ENV = "GUARDBANDS_BENCH_RESP"
+
+_SENTENCE = "Quarterly summary for the support queue, including escalations. "
+
+
+def text_of_size(size: int) -> str:
+    """Deterministic ASCII prose of exactly ``size`` bytes."""
+    repeats = size // len(_SENTENCE) + 1
+    return (_SENTENCE * repeats)[:size]
+
+
+def document_of_size(size: int) -> dict[str, Any]:
+    """A JSON document whose canonical form is roughly ``size`` bytes."""
+    chunk = max(size // 8, 1)
+    text = text_of_size(size)
+    return {
+        "documents": [
+            {"id": f"doc-{index}", "text": text[start : start + chunk]}
+            for index, start in enumerate(range(0, size, chunk))
+        ],
+        "source": "benchmark",
+    }
+
+
+def hmac_crypto() -> GuardBandCrypto:
+    return GuardBandCrypto(b"benchmark-secret-key-material-32b")
+
+
+def ed25519_crypto() -> GuardBandCrypto:
+    key = Ed25519PrivateKey.from_private_bytes(bytes(range(32)))
+    return GuardBandCrypto(key_resolver=StaticKeyResolver({"key001": key}))
+
+
+def _fixture(operation: Callable[[], object]) -> Fixture:
+    return Fixture(operation)
+
+
+def _counter(prefix: str) -> Iterator[str]:
+    return (f"{prefix}-{index:016d}" for index in itertools.count())
+
+
+def core_cases(sizes: Sequence[int]) -> list[BenchmarkCase]:
+    cases: list[BenchmarkCase] = []
+    for size in sizes:
+        cases.extend(
+            [
+                BenchmarkCase("canonical_json.v2", _canonical_setup(size, canonical_json), size),
+                BenchmarkCase(
+                    "canonical_json.v1", _canonical_setup(size, _canonical_json_v1), size
+                ),
+                BenchmarkCase("crypto.wrap.hmac", _wrap_setup(size, hmac_crypto), size),
+                BenchmarkCase("crypto.verify.hmac", _verify_setup(size, hmac_crypto), size),
+                BenchmarkCase("crypto.wrap.ed25519", _wrap_setup(size, ed25519_crypto), size),
+                BenchmarkCase("crypto.verify.ed25519", _verify_setup(size, ed25519_crypto), size),
+                BenchmarkCase(
+                    "crypto.wrap.hmac_digest",
+                    _wrap_setup(size, hmac_crypto, DIGEST_TEXT_KIND),
+                    size,
+                ),
+                BenchmarkCase(
+                    "crypto.verify.hmac_digest",
+                    _verify_setup(size, hmac_crypto, DIGEST_TEXT_KIND),
+                    size,
+                ),
+                BenchmarkCase("crypto.sign_value", _sign_value_setup(size), size),
+                BenchmarkCase("crypto.verify_value", _verify_value_setup(size), size),
+                BenchmarkCase("crypto.sign_bytes", _sign_bytes_setup(size), size),
+                BenchmarkCase("crypto.verify_file", _verify_file_setup(size), size),
+                BenchmarkCase("crypto.extract_benign", _extract_benign_setup(size), size),
+            ]
+        )
+        if size <= HOSTILE_MAX_SIZE:
+            cases.append(
+                BenchmarkCase("crypto.extract_hostile", _extract_hostile_setup(size), size)
+            )
+    return cases
+
+
+def _canonical_setup(size: int, encode: Callable[[Any], str]) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        document = document_of_size(size)
+        return _fixture(lambda: encode(document))
+
+    return setup
+
+
+def _wrap_setup(
+    size: int, make: Callable[[], GuardBandCrypto], kind: str = TEXT_KIND
+) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = make()
+        content = text_of_size(size)
+        return _fixture(lambda: crypto.wrap_content(content, CONTEXT, kind=kind))
+
+    return setup
+
+
+def _verify_setup(
+    size: int, make: Callable[[], GuardBandCrypto], kind: str = TEXT_KIND
+) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = make()
+        wrapped = crypto.wrap_content(text_of_size(size), CONTEXT, kind=kind)
+
+        def verify() -> None:
+            assert crypto.extract_and_verify(wrapped, CONTEXT)["valid"]
+
+        return _fixture(verify)
+
+    return setup
+
+
+def _sign_value_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        document = document_of_size(size)
+        return _fixture(lambda: crypto.sign_value(document, CONTEXT))
+
+    return setup
+
+
+def _verify_value_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        document = document_of_size(size)
+        envelope = crypto.sign_value(document, CONTEXT)
+
+        def verify() -> None:
+            assert crypto.verify_value(document, envelope, CONTEXT)["valid"]
+
+        return _fixture(verify)
+
+    return setup
+
+
+def _sign_bytes_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        data = text_of_size(size).encode("ascii")
+        return _fixture(lambda: crypto.sign_bytes(data, CONTEXT))
+
+    return setup
+
+
+def _verify_file_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        directory = tempfile.mkdtemp(prefix="guardbands-bench-")
+        path = Path(directory) / "artifact.bin"
+        path.write_bytes(text_of_size(size).encode("ascii"))
+        envelope = crypto.sign_file(path, CONTEXT)
+
+        def verify() -> None:
+            assert crypto.verify_file(path, envelope, CONTEXT)["valid"]
+
+        return Fixture(verify, lambda: shutil.rmtree(directory, ignore_errors=True))
+
+    return setup
+
+
+def _extract_benign_setup(size: int) -> Callable[[], Fixture]:
+    """A prompt of eight signed excerpts separated by untrusted prose."""
+
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        excerpt = text_of_size(max(size // 16, 1))
+        parts = []
+        for _ in range(8):
+            parts.append(excerpt)
+            parts.append(crypto.wrap_content(excerpt, CONTEXT))
+        prompt = "\n".join(parts)
+
+        def extract() -> None:
+            blocks = extract_guard_band_blocks(prompt)
+            assert all(crypto.extract_and_verify(block, CONTEXT)["valid"] for block in blocks)
+
+        return _fixture(extract)
+
+    return setup
+
+
+def _extract_hostile_setup(size: int) -> Callable[[], Fixture]:
+    """``size`` bytes of forged start markers ahead of one genuine band."""
+
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        marker = "⟪INERT:START:v:2:r:"
+        hostile = marker * max(size // len(marker.encode("utf-8")), 1)
+        prompt = hostile + "\n" + crypto.wrap_content("genuine", CONTEXT)
+
+        def extract() -> None:
+            (block,) = extract_guard_band_blocks(prompt)
+            assert crypto.extract_and_verify(block, CONTEXT)["valid"]
+
+        return _fixture(extract)
+
+    return setup
+
+
+def batch_cases() -> list[BenchmarkCase]:
+    """Verify one request's worth of bands, one by one and as a batch."""
+    return [
+        BenchmarkCase("crypto.verify_each", _batch_verify_setup(batched=False), items=BATCH_SIZE),
+        BenchmarkCase("crypto.verify_many", _batch_verify_setup(batched=True), items=BATCH_SIZE),
+    ]
+
+
+def _batch_verify_setup(*, batched: bool) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        bands = [crypto.wrap_content(text_of_size(1_000), CONTEXT) for _ in range(BATCH_SIZE)]
+
+        def verify() -> None:
+            if batched:
+                results = crypto.extract_and_verify_many(bands, CONTEXT)
+            else:
+                results = [crypto.extract_and_verify(band, CONTEXT) for band in bands]
+            assert all(result["valid"] for result in results)
+
+        return _fixture(verify)
+
+    return setup
+
+
+def ledger_cases() -> list[BenchmarkCase]:
+    return [
+        BenchmarkCase("ledger.memory.consume", _memory_ledger_setup(batch=False)),
+        BenchmarkCase(
+            "ledger.memory.consume_many",
+            _memory_ledger_setup(batch=True),
+            items=BATCH_SIZE,
+        ),
+        BenchmarkCase("ledger.sqlite.consume", _sqlite_ledger_setup(batch=False)),
+        BenchmarkCase(
+            "ledger.sqlite.consume_many",
+            _sqlite_ledger_setup(batch=True),
+            items=BATCH_SIZE,
+        ),
+        BenchmarkCase("ledger.resp.consume", _resp_ledger_setup(batch=False)),
+        BenchmarkCase(
+            "ledger.resp.consume_many",
+            _resp_ledger_setup(batch=True),
+            items=BATCH_SIZE,
+        ),
+        BenchmarkCase(
+            "ledger.resp_async.consume_coalesced",
+            _async_resp_ledger_setup,
+            items=COALESCED_CONSUMES,
+        ),
+        BenchmarkCase("ledger.mcp_input.consume", _mcp_input_ledger_setup),
+    ]
+
+
+def _consumer(ledger: Any, batch: bool) -> Callable[[], object]:
+    nonces = _counter("nonce")
+    if batch:
+        return lambda: ledger.consume_many(
+            CONTEXT, [("key001", next(nonces)) for _ in range(BATCH_SIZE)]
+        )
+    return lambda: ledger.consume(CONTEXT, "key001", next(nonces))
+
+
+def _memory_ledger_setup(*, batch: bool) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        return _fixture(_consumer(NonceReplayLedger(ttl_seconds=900), batch))
+
+    return setup
+
+
+def _sqlite_ledger_setup(*, batch: bool) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        directory = tempfile.mkdtemp(prefix="guardbands-bench-")
+        ledger = SQLiteReplayLedger(str(Path(directory) / "replay.sqlite3"), ttl_seconds=900)
+        return Fixture(
+            _consumer(ledger, batch),
+            lambda: shutil.rmtree(directory, ignore_errors=True),
+        )
+
+    return setup
+
+
+def resp_endpoint() -> tuple[str, int, Callable[[], None]]:
+    configured = os.environ.get(RESP_ENV)
+    if configured:
+        host, _, port = configured.rpartition(":")
+        return host or "127.0.0.1", int(port), lambda: None
+    server = RESPStubServer().__enter__()
+    return "127.0.0.1", server.port, server.stop
+
+
+def _resp_ledger_setup(*, batch: bool) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        host, port, stop = resp_endpoint()
+        ledger = RESPReplayLedger(host, port, ttl_seconds=900)
+
+        def cleanup() -> None:
+            ledger.close()
+            stop()
+
+        return Fixture(_consumer(ledger, batch), cleanup)
+
+    return setup
+
+
+def _async_resp_ledger_setup() -> Fixture:
+    host, port, stop = resp_endpoint()
+    loop = asyncio.new_event_loop()
+    ledger = AsyncRESPReplayLedger(host, port, ttl_seconds=900)
+    nonces = _counter("nonce")
+
+    async def consume_concurrently() -> None:
+        await asyncio.gather(
+            *(ledger.consume(CONTEXT, "key001", next(nonces)) for _ in range(COALESCED_CONSUMES))
+        )
+
+    def cleanup() -> None:
+        loop.run_until_complete(ledger.aclose())
+        loop.close()
+        stop()
+
+    return Fixture(lambda: loop.run_until_complete(consume_concurrently()), cleanup)
+
+
+def _mcp_input_ledger_setup() -> Fixture:
+    from guardbands.integrations.mcp import MCPInputReplayLedger
+
+    ledger = MCPInputReplayLedger()
+    calls = _counter("call")
+    digest = "0" * 64
+    return _fixture(lambda: ledger.consume(next(calls), digest, "nonce-000000000001", 2**40))
+
+
+ROUTE_COUNTS = (10, 1_000)
+_ROUTE_PROBES = (
+    "/tenants/acme/service7/42/summarize",
+    "/tenants/acme/service3/widget",
+    "/static/service5/manifest",
+    "/admin/service9/users/7/roles",
+    "/tenants/acme/service7/42/unknown",
+    "/health",
+    "/tenants/acme/unregistered/1/summarize",
+    "/admin",
+)
+
+
+def routing_cases() -> list[BenchmarkCase]:
+    """Match a fixed set of hits and misses against N registered templates."""
+    return [
+        BenchmarkCase(
+            f"fastapi.route_match.{count}_routes", _routing_setup(count), items=len(_ROUTE_PROBES)
+        )
+        for count in ROUTE_COUNTS
+    ]
+
+
+def _routing_setup(count: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        from guardbands.integrations.fastapi import GuardBandVerificationMiddleware
+
+        templates = []
+        for index in range(count // 4 + 1):
+            templates.extend(
+                [
+                    f"/tenants/{{tenant}}/service{index}/{{item:int}}/summarize",
+                    f"/tenants/{{tenant}}/service{index}/{{slug}}",
+                    f"/static/service{index}/manifest",
+                    f"/admin/service{index}/*",
+                ]
+            )
+
+        async def downstream(scope: Any, receive: Any, send: Any) -> None:
+            return None
+
+        middleware = GuardBandVerificationMiddleware(
+            downstream, crypto=hmac_crypto(), required_paths=templates[:count]
+        )
+        scopes = [{"type": "http", "method": "POST", "path": path} for path in _ROUTE_PROBES]
+        route_for = middleware._route_for
+
+        def match() -> None:
+            for scope in scopes:
+                route_for(scope)
+
+        return _fixture(match)
+
+    return setup
+
+
+def integration_cases(sizes: Sequence[int]) -> list[BenchmarkCase]:
+    cases: list[BenchmarkCase] = [*routing_cases()]
+    for size in sizes:
+        cases.append(BenchmarkCase("fastapi.verify_request", _fastapi_setup(size), size))
+        cases.append(BenchmarkCase("mcp.guarded_call", _mcp_setup(size), size))
+        cases.append(BenchmarkCase("mcp.sign_result_blocks", _mcp_sign_result_setup(size), size))
+        cases.append(
+            BenchmarkCase(
+                "mcp.sign_result_blocks_threaded", _mcp_sign_result_setup(size, threads=4), size
+            )
+        )
+        cases.append(
+            BenchmarkCase(
+                "mcp.sign_result_blocks_digest",
+                _mcp_sign_result_setup(size, band_kinds=[TEXT_KIND, DIGEST_TEXT_KIND]),
+                size,
+            )
+        )
+    cases.append(
+        BenchmarkCase("fastapi.websocket_messages", _websocket_setup, 1_000, items=BATCH_SIZE)
+    )
+    for keys in ("ed25519", "session"):
+        cases.append(
+            BenchmarkCase(
+                f"mcp.guarded_call_{keys}",
+                _mcp_setup(1_000, keys=keys, blocks=RESULT_BLOCKS),
+                1_000,
+            )
+        )
+    return cases
+
+
+def _fastapi_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        from fastapi import FastAPI
+
+        from guardbands.integrations.fastapi import GuardBandVerificationMiddleware
+
+        crypto = hmac_crypto()
+        app = FastAPI()
+        app.add_middleware(
+            GuardBandVerificationMiddleware,
+            crypto=crypto,
+            required_paths={"/guarded"},
+            max_body_bytes=4 * size + 10_000,
+        )
+
+        @app.post("/guarded")
+        async def guarded() -> dict[str, bool]:
+            return {"ok": True}
+
+        body = json.dumps(
+            {
+                "wrapped_content": crypto.wrap_content(text_of_size(size), CONTEXT),
+                "context": CONTEXT,
+            }
+        ).encode("utf-8")
+        loop = asyncio.new_event_loop()
+
+        def call() -> None:
+            assert loop.run_until_complete(request(app, "/guarded", body)) == 200
+
+        return Fixture(call, loop.close)
+
+    return setup
+
+
+def _websocket_setup() -> Fixture:
+    """One connection carrying ``BATCH_SIZE`` guarded 1 KB messages."""
+    from guardbands.integrations.fastapi import GuardBandVerificationMiddleware
+
+    async def echo(scope: dict[str, Any], receive: Any, send: Any) -> None:
+        await receive()
+        await send({"type": "websocket.accept"})
+        while (await receive())["type"] == "websocket.receive":
+            await send({"type": "websocket.send", "text": "ok"})
+
+    crypto = hmac_crypto()
+    app = GuardBandVerificationMiddleware(echo, crypto=crypto, required_paths={"/ws"})
+    # Each connection has its own replay ledger, so every session can reuse
+    # the same bands.
+    context = {"path": "/ws", "query": ""}
+    messages = [
+        json.dumps({"wrapped_content": crypto.wrap_content(text_of_size(1_000), context)})
+        for _ in range(BATCH_SIZE)
+    ]
+    loop = asyncio.new_event_loop()
+
+    def session() -> None:
+        assert loop.run_until_complete(websocket_session(app, "/ws", messages)) == BATCH_SIZE
+
+    return Fixture(session, loop.close)
+
+
+class _PersistentSession:
+    """Keep an async context open in one long-lived task of a private loop.
+
+    MCP clients hold anyio cancel scopes that must be entered and exited by the
+    same task, so each timed call is handed to that task through a queue.
+    """
+
+    def __init__(self, open_session: Callable[[], Any]) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+        self._ready: asyncio.Future[Any] = self.loop.create_future()
+        self._task = self.loop.create_task(self._serve(open_session))
+        self.session = self.loop.run_until_complete(self._ready)
+
+    async def _serve(self, open_session: Callable[[], Any]) -> None:
+        async with open_session() as session:
+            self._ready.set_result(session)
+            while (item := await self._queue.get()) is not None:
+                future, call = item
+                try:
+                    future.set_result(await call())
+                except Exception as exc:  # pragma: no cover - surfaced to caller
+                    future.set_exception(exc)
+
+    def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        future = self.loop.create_future()
+        self._queue.put_nowait((future, call))
+        return self.loop.run_until_complete(future)
+
+    def close(self) -> None:
+        self._queue.put_nowait(None)
+        self.loop.run_until_complete(self._task)
+        self.loop.close()
+
+
+def ed25519_peers() -> tuple[GuardBandCrypto, GuardBandCrypto]:
+    """Server and client with their own Ed25519 keys, each trusting the other."""
+    server_key = Ed25519PrivateKey.from_private_bytes(bytes(range(32)))
+    client_key = Ed25519PrivateKey.from_private_bytes(bytes(range(32, 64)))
+    server = StaticKeyResolver({"server": server_key, "client": client_key.public_key()}, "server")
+    client = StaticKeyResolver({"client": client_key, "server": server_key.public_key()}, "client")
+    return GuardBandCrypto(key_resolver=server), GuardBandCrypto(key_resolver=client)
+
+
+def _mcp_setup(size: int, *, keys: str = "hmac", blocks: int = 1) -> Callable[[], Fixture]:
+    """One guarded call of ``size`` bytes echoed back in ``blocks`` text blocks.
+
+    ``keys`` is ``hmac`` or ``ed25519`` for per-call signatures, or
+    ``session`` for Ed25519 keys with a session opened before timing starts.
+    """
+
+    def setup() -> Fixture:
+        from mcp import Client
+        from mcp.server.mcpserver import MCPServer
+        from mcp.types import CallToolResult, TextContent
+
+        from guardbands.integrations.mcp import (
+            GuardBandMCPClient,
+            GuardBandMCPServerExtension,
+            MCPToolPolicy,
+            guard_bands_client_capability,
+        )
+
+        if keys == "hmac":
+            server_crypto = client_crypto = hmac_crypto()
+        else:
+            server_crypto, client_crypto = ed25519_peers()
+        policy = MCPToolPolicy(guard_inputs=True, guard_outputs=True)
+        limit = 4 * size * blocks + 10_000
+        server = MCPServer(
+            "bench-server",
+            extensions=[
+                GuardBandMCPServerExtension(
+                    server_crypto,
+                    audience="bench-server",
+                    policies={"echo": policy},
+                    max_payload_bytes=limit,
+                    session_ttl_seconds=3_600 if keys == "session" else None,
+                )
+            ],
+        )
+
+        # Annotated ``Any`` because postponed annotations cannot see the
+        # lazily imported MCP types; the server passes a CallToolResult through.
+        @server.tool(name="echo")
+        def echo(text: str) -> Any:
+            if blocks == 1:
+                return text
+            return CallToolResult(content=[TextContent(type="text", text=text)] * blocks)
+
+        session = _PersistentSession(
+            lambda: Client(server, extensions=[guard_bands_client_capability()])
+        )
+        guarded = GuardBandMCPClient(
+            session.session,
+            client_crypto,
+            audience="bench-server",
+            policies={"echo": policy},
+            max_payload_bytes=limit,
+            use_sessions=keys == "session",
+        )
+        arguments = {"text": text_of_size(size)}
+        if keys == "session":
+            session.run(lambda: guarded.call_tool("echo", arguments))
+        return Fixture(
+            lambda: session.run(lambda: guarded.call_tool("echo", arguments)),
+            session.close,
+        )
+
+    return setup
+
+
+def mcp_request_context(band_kinds: list[str] | None = None) -> Any:
+    """The request context of a call from a client advertising ``band_kinds``.
+
+    The default context resolver never looks at it; the server extension
+    only reads the client's advertised Guard Band settings.
+    """
+    from mcp.types import ClientCapabilities
+
+    from guardbands.integrations.mcp import MCP_GUARD_BAND_ID
+
+    settings = {} if band_kinds is None else {"bandKinds": band_kinds}
+    return SimpleNamespace(
+        session=SimpleNamespace(
+            client_capabilities=ClientCapabilities(extensions={MCP_GUARD_BAND_ID: settings})
+        )
+    )
+
+
+def _mcp_sign_result_setup(
+    size: int, *, threads: int = 0, band_kinds: list[str] | None = None
+) -> Callable[[], Fixture]:
+    """Server-side signing of a ``size``-byte result split over text blocks.
+
+    With ``threads``, the blocks are signed in a thread pool of that size.
+    With ``band_kinds``, the client advertises them, so the server may
+    negotiate digest bands.
+    """
+
+    def setup() -> Fixture:
+        from mcp.types import CallToolRequestParams, CallToolResult, TextContent
+
+        from guardbands.integrations.mcp import (
+            MCP_GUARD_BAND_ID,
+            MCP_GUARD_BAND_VERSION,
+            GuardBandMCPServerExtension,
+            MCPToolPolicy,
+        )
+
+        executor = ThreadPoolExecutor(threads) if threads else None
+        extension = GuardBandMCPServerExtension(
+            hmac_crypto(),
+            audience="bench-server",
+            policies={"echo": MCPToolPolicy(guard_outputs=True)},
+            max_payload_bytes=4 * size + 100_000,
+            executor=executor,
+        )
+        params = CallToolRequestParams(
+            name="echo",
+            arguments={},
+            _meta={
+                MCP_GUARD_BAND_ID: {
+                    "version": MCP_GUARD_BAND_VERSION,
+                    "call_id": "call-0000000000000001",
+                }
+            },
+        )
+        text = text_of_size(max(size // RESULT_BLOCKS, 1))
+        result = CallToolResult(
+            content=[TextContent(type="text", text=text) for _ in range(RESULT_BLOCKS)]
+        )
+
+        async def call_next(_ctx: Any) -> CallToolResult:
+            return result
+
+        ctx = mcp_request_context(band_kinds)
+        loop = asyncio.new_event_loop()
+
+        def sign() -> None:
+            loop.run_until_complete(extension.intercept_tool_call(params, ctx, call_next))
+
+        def cleanup() -> None:
+            loop.close()
+            if executor is not None:
+                executor.shutdown()
+
+        return Fixture(sign, cleanup)
+
+    return setup
+
+
+def all_cases(sizes: Sequence[int] = SIZES) -> list[BenchmarkCase]:
+    return [*core_cases(sizes), *batch_cases(), *ledger_cases(), *integration_cases(sizes)]
@@ -0,0 +1,177 @@
+"""Timing, result serialization, and baseline comparison for the benchmarks."""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+RESULT_SCHEMA = 1
+DEFAULT_THRESHOLD = 0.25
+
+Operation = Callable[[], object]
+
+
+@dataclass(slots=True)
+class Fixture:
+    """A prepared operation plus the cleanup that releases its resources."""
+
+    operation: Operation
+    cleanup: Callable[[], None] = lambda: None
+
+
+@dataclass(frozen=True, slots=True)
+class BenchmarkCase:
+    """One named measurement; ``setup`` runs untimed before sampling."""
+
+    name: str
+    setup: Callable[[], Fixture]
+    size: int | None = None
+    # Units of work per operation, e.g. nonces per batched consume.
+    items: int = 1
+
+    @property
+    def key(self) -> str:
+        return self.name if self.size is None else f"{self.name}[{self.size}]"
+
+
+@dataclass(slots=True)
+class Measurement:
+    key: str
+    name: str
+    size: int | None
+    loops: int
+    samples_ns: list[float] = field(default_factory=list)
+    items: int = 1
+
+    @property
+    def median_ns(self) -> float:
+        return statistics.median(self.samples_ns)
+
+    def to_json(self) -> dict[str, Any]:
+        median = self.median_ns
+        result: dict[str, Any] = {
+            "name": self.name,
+            "size": self.size,
+            "loops": self.loops,
+            "repeat": len(self.samples_ns),
+            "median_ns": round(median, 1),
+            "min_ns": round(min(self.samples_ns), 1),
+            "stdev_ns": round(statistics.pstdev(self.samples_ns), 1),
+            "ops_per_sec": round(1e9 * self.items / median, 1) if median else None,
+        }
+        if self.size is not None and median:
+            result["bytes_per_sec"] = round(1e9 * self.size / median, 1)
+        return result
+
+
+def measure(case: BenchmarkCase, *, min_time: float, repeat: int) -> Measurement:
+    """Time ``case`` with an auto-calibrated loop count, like ``timeit``.
+
+    Each sample is the mean duration of ``loops`` calls. ``loops`` grows until
+    one sample takes at least ``min_time`` seconds; ``min_time=0`` runs every
+    operation exactly once, which the test suite uses as a smoke check.
+    """
+    fixture = case.setup()
+    try:
+        operation = fixture.operation
+        operation()  # warm caches and lazy imports outside the samples
+        loops = 1
+        while True:
+            elapsed = _time_loops(operation, loops)
+            if elapsed >= min_time or loops >= 1 << 24:
+                break
+            loops *= 10 if elapsed < min_time / 10 else 2
+        samples = [elapsed / loops * 1e9]
+        samples.extend(_time_loops(operation, loops) / loops * 1e9 for _ in range(repeat - 1))
+    finally:
+        fixture.cleanup()
+    return Measurement(case.key, case.name, case.size, loops, samples, case.items)
+
+
+def _time_loops(operation: Operation, loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        operation()
+    return time.perf_counter() - started
+
+
+def run_suite(
+    cases: Iterable[BenchmarkCase],
+    *,
+    min_time: float,
+    repeat: int,
+    report: Callable[[Measurement], None] | None = None,
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for case in cases:
+        measurement = measure(case, min_time=min_time, repeat=repeat)
+        results[case.key] = measurement.to_json()
+        if report is not None:
+            report(measurement)
+    return {"schema": RESULT_SCHEMA, "environment": environment(), "results": results}
+
+
+def environment() -> dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class Comparison:
+    key: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else 1.0
+
+
+def compare(
+    current: dict[str, Any],
+    baseline: dict[str, Any],
+    *,
+    metric: str = "median_ns",
+) -> list[Comparison]:
+    """Pair every result present in both runs; lower values are better."""
+    if baseline.get("schema") != current.get("schema"):
+        raise ValueError("Baseline was written by an incompatible benchmark schema")
+    comparisons = []
+    for key, result in current["results"].items():
+        previous = baseline["results"].get(key)
+        if previous is not None:
+            comparisons.append(Comparison(key, float(previous[metric]), float(result[metric])))
+    return comparisons
+
+
+def regressions(comparisons: Iterable[Comparison], threshold: float) -> list[Comparison]:
+    return [item for item in comparisons if item.ratio > 1 + threshold]
+
+
+def load_results(path: Path) -> dict[str, Any]:
+    with path.open(encoding="utf-8") as handle:
+        data: dict[str, Any] = json.load(handle)
+    return data
+
+
+def write_results(path: Path, results: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def format_ns(value: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value:.0f} ns"
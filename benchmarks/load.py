@@ -0,0 +1,344 @@
+"""Load and soak harness for the FastAPI verification middleware.
+
+``python -m benchmarks.load`` drives :class:`GuardBandVerificationMiddleware`
+through the ASGI interface with concurrent in-process clients and a weighted
+mix of valid, forged, expired, replayed, and oversized requests. It reports
+throughput, latency percentiles per request kind, event-loop lag, and RSS
+sampled over the run. No server, socket, or external load tool is involved.
+
+Valid requests are signed by the clients on the same event loop as the
+middleware. That signing time is measured separately and subtracted to give
+``server_throughput_rps``, the rate the middleware alone sustained.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from array import array
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from guardbands import (
+    GuardBandCrypto,
+    NonceReplayLedger,
+    ReplayLedger,
+    RESPReplayLedger,
+    SQLiteReplayLedger,
+)
+from guardbands.integrations.fastapi import GuardBandVerificationMiddleware
+
+from .asgi import ASGIApp, request
+from .cases import CONTEXT, hmac_crypto, resp_endpoint, text_of_size
+from .harness import environment, write_results
+
+KINDS = ("valid", "forged", "expired", "replayed", "oversized")
+LEDGERS = ("none", "memory", "sqlite", "resp")
+DEFAULT_MIX = "valid=80,forged=5,expired=5,replayed=5,oversized=5"
+PATH = "/guarded"
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """Parse ``kind=weight`` pairs such as ``valid=90,forged=10``."""
+    mix: dict[str, float] = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        kind, _, weight = item.partition("=")
+        if kind not in KINDS:
+            raise ValueError(f"Unknown request kind: {kind}")
+        mix[kind] = float(weight)
+        if mix[kind] < 0:
+            raise ValueError(f"Weight must not be negative: {kind}")
+    if not any(mix.values()):
+        raise ValueError("Traffic mix needs at least one positive weight")
+    return mix
+
+
+@dataclass(slots=True)
+class LoadConfig:
+    clients: int = 32
+    requests: int | None = 20_000
+    duration: float | None = None
+    size: int = 1_000
+    mix: Mapping[str, float] = field(default_factory=lambda: parse_mix(DEFAULT_MIX))
+    sample_interval: float = 1.0
+    seed: int = 0
+
+
+class Traffic:
+    """Build request bodies of each kind for one middleware configuration."""
+
+    def __init__(self, crypto: GuardBandCrypto, size: int, max_body_bytes: int) -> None:
+        self.crypto = crypto
+        self.content = text_of_size(size)
+        expired = crypto.wrap_content(
+            self.content, CONTEXT, ttl_seconds=60, now=time.time() - 3_600
+        )
+        forged_context = {**CONTEXT, "user": "mallory"}
+        self._fixed = {
+            "expired": _body(expired, CONTEXT),
+            "forged": _body(self.valid_band(), forged_context),
+            "oversized": b" " * (max_body_bytes + 1),
+        }
+        # Delivered once during warm-up, so every later copy is a replay.
+        self._fixed["replayed"] = self.valid()
+
+    def valid_band(self) -> str:
+        return self.crypto.wrap_content(self.content, CONTEXT)
+
+    def valid(self) -> bytes:
+        return _body(self.valid_band(), CONTEXT)
+
+    def body(self, kind: str) -> bytes:
+        return self.valid() if kind == "valid" else self._fixed[kind]
+
+
+def _body(wrapped: str, context: dict[str, Any]) -> bytes:
+    return json.dumps({"wrapped_content": wrapped, "context": context}).encode("utf-8")
+
+
+async def _downstream(scope: dict[str, Any], receive: Any, send: Any) -> None:
+    await receive()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b'{"ok":true}'})
+
+
+def _ledger(kind: str) -> tuple[ReplayLedger | None, Callable[[], None]]:
+    if kind == "none":
+        return None, lambda: None
+    if kind == "memory":
+        return NonceReplayLedger(ttl_seconds=900), lambda: None
+    if kind == "sqlite":
+        directory = tempfile.mkdtemp(prefix="guardbands-load-")
+        ledger = SQLiteReplayLedger(str(Path(directory) / "replay.sqlite3"), ttl_seconds=900)
+        return ledger, lambda: shutil.rmtree(directory, ignore_errors=True)
+    if kind == "resp":
+        host, port, stop = resp_endpoint()
+        resp = RESPReplayLedger(host, port, ttl_seconds=900)
+
+        def cleanup() -> None:
+            resp.close()
+            stop()
+
+        return resp, cleanup
+    raise ValueError(f"Unknown ledger: {kind}")
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size, or ``None`` where it cannot be read."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def percentiles(samples: Sequence[float]) -> dict[str, float]:
+    """Nearest-rank p50, p95, p99, and max of ``samples``, in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+
+    def rank(q: float) -> float:
+        return round(ordered[min(last, int(q * len(ordered)))] * 1e3, 3)
+
+    return {"p50": rank(0.50), "p95": rank(0.95), "p99": rank(0.99), "max": rank(1.0)}
+
+
+async def run_load(ledger_kind: str, config: LoadConfig) -> dict[str, Any]:
+    """Run one load test against a middleware using ``ledger_kind``."""
+    ledger, cleanup = _ledger(ledger_kind)
+    try:
+        return await _run(ledger_kind, ledger, config)
+    finally:
+        cleanup()
+
+
+async def _run(ledger_kind: str, ledger: ReplayLedger | None, config: LoadConfig) -> dict[str, Any]:
+    crypto = hmac_crypto()
+    max_body_bytes = 4 * config.size + 10_000
+    app: ASGIApp = GuardBandVerificationMiddleware(
+        _downstream,
+        crypto=crypto,
+        required_paths={PATH},
+        replay_ledger=ledger,
+        max_body_bytes=max_body_bytes,
+    )
+    traffic = Traffic(crypto, config.size, max_body_bytes)
+    assert await request(app, PATH, traffic.body("replayed")) == 200
+
+    expected = dict.fromkeys(KINDS, 400)
+    expected["valid"] = 200
+    if ledger is None:
+        expected["replayed"] = 200
+    kinds = [kind for kind, weight in config.mix.items() if weight > 0]
+    weights = [config.mix[kind] for kind in kinds]
+    rng = random.Random(config.seed)
+    latencies: dict[str, array[float]] = {kind: array("d") for kind in kinds}
+    unexpected = dict.fromkeys(kinds, 0)
+    lag = array("d")
+    series: list[dict[str, Any]] = []
+    completed = 0
+    signing = 0.0
+    started = time.perf_counter()
+    deadline = None if config.duration is None else started + config.duration
+    remaining = config.requests
+
+    def claim() -> bool:
+        nonlocal remaining
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if remaining is not None:
+            if remaining <= 0:
+                return False
+            remaining -= 1
+        return True
+
+    async def client() -> None:
+        nonlocal completed, signing
+        while claim():
+            # In-memory requests never suspend, so yield between them the way
+            # a socket read would; otherwise one client would run them all.
+            await asyncio.sleep(0)
+            kind = rng.choices(kinds, weights)[0]
+            before = time.perf_counter()
+            body = traffic.body(kind)
+            sent = time.perf_counter()
+            status = await request(app, PATH, body)
+            latencies[kind].append(time.perf_counter() - sent)
+            signing += sent - before
+            completed += 1
+            if status != expected[kind]:
+                unexpected[kind] += 1
+
+    async def monitor_lag() -> None:
+        interval = 0.01
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag.append(max(0.0, time.perf_counter() - before - interval))
+
+    async def sample_rss() -> None:
+        while True:
+            window = lag[-int(config.sample_interval / 0.01) - 1 :]
+            series.append(
+                {
+                    "t": round(time.perf_counter() - started, 3),
+                    "completed": completed,
+                    "rss_bytes": rss_bytes(),
+                    "loop_lag_max_ms": round(max(window, default=0.0) * 1e3, 3),
+                }
+            )
+            await asyncio.sleep(config.sample_interval)
+
+    background = [asyncio.create_task(monitor_lag()), asyncio.create_task(sample_rss())]
+    try:
+        await asyncio.gather(*(client() for _ in range(config.clients)))
+    finally:
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    series.append({"t": round(elapsed, 3), "completed": completed, "rss_bytes": rss_bytes()})
+
+    every = [value for samples in latencies.values() for value in samples]
+    server_time = max(elapsed - signing, 1e-9)
+    return {
+        "ledger": ledger_kind,
+        "clients": config.clients,
+        "size": config.size,
+        "mix": dict(config.mix),
+        "completed": completed,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 1),
+        "server_throughput_rps": round(completed / server_time, 1),
+        "latency_ms": percentiles(every),
+        "kinds": {
+            kind: {
+                "count": len(latencies[kind]),
+                "unexpected_status": unexpected[kind],
+                "latency_ms": percentiles(latencies[kind]),
+            }
+            for kind in kinds
+        },
+        "loop_lag_ms": percentiles(lag),
+        "rss": series,
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    latency = report["latency_ms"]
+    lag = report["loop_lag_ms"]
+    rss = [point["rss_bytes"] for point in report["rss"] if point["rss_bytes"] is not None]
+    print(
+        f"ledger={report['ledger']:<7} {report['completed']} requests in {report['elapsed_s']} s: "
+        f"{report['throughput_rps']} rps ({report['server_throughput_rps']} rps server-side)"
+    )
+    print(
+        f"  latency p50 {latency['p50']} ms  p95 {latency['p95']} ms  p99 {latency['p99']} ms  "
+        f"max {latency['max']} ms"
+    )
+    if lag:
+        print(f"  loop lag p50 {lag['p50']} ms  p99 {lag['p99']} ms  max {lag['max']} ms")
+    if rss:
+        print(f"  rss start {rss[0] / 2**20:.1f} MiB  end {rss[-1] / 2**20:.1f} MiB")
+    for kind, stats in report["kinds"].items():
+        flag = f"  UNEXPECTED {stats['unexpected_status']}" if stats["unexpected_status"] else ""
+        p99 = stats["latency_ms"].get("p99", 0.0)
+        print(f"  {kind:<10} {stats['count']:>8}  p99 {p99} ms{flag}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__)
+    parser.add_argument("--ledger", choices=(*LEDGERS, "all"), default="all")
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=20_000, help="requests per ledger")
+    parser.add_argument(
+        "--duration", type=float, help="soak for this many seconds instead of --requests"
+    )
+    parser.add_argument("--size", type=int, default=1_000, help="signed content bytes")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="kind=weight pairs")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="RSS sample seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write JSON results to this path")
+    args = parser.parse_args(argv)
+
+    config = LoadConfig(
+        clients=args.clients,
+        requests=None if args.duration is not None else args.requests,
+        duration=args.duration,
+        size=args.size,
+        mix=parse_mix(args.mix),
+        sample_interval=args.sample_interval,
+        seed=args.seed,
+    )
+    reports = []
+    for ledger in LEDGERS if args.ledger == "all" else (args.ledger,):
+        report = asyncio.run(run_load(ledger, config))
+        _print_report(report)
+        reports.append(report)
+    if args.output is not None:
+        write_results(args.output, {"environment": environment(), "runs": reports})
+    failed = any(
+        stats["unexpected_status"] for report in reports for stats in report["kinds"].values()
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Peak-memory benchmarks: ``python -m benchmarks.memory``.
+
+Each case is traced with :mod:`tracemalloc` and reported as peak bytes
+allocated per byte of input content, so copies made while signing or parsing
+show up as a ratio that stays comparable across sizes. Allocation counts are
+deterministic, which lets the regression gate be much tighter than the timing
+gate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import tracemalloc
+from collections.abc import Callable, Iterable, Sequence
+from pathlib import Path
+from typing import Any
+
+from .cases import CONTEXT, hmac_crypto, mcp_request_context, text_of_size
+from .harness import (
+    RESULT_SCHEMA,
+    BenchmarkCase,
+    Fixture,
+    compare,
+    environment,
+    load_results,
+    regressions,
+    write_results,
+)
+
+MEMORY_SIZES = (10_000, 100_000, 1_000_000)
+QUICK_MEMORY_SIZES = (10_000, 100_000)
+DEFAULT_MEMORY_THRESHOLD = 0.10
+METRIC = "peak_bytes_per_input_byte"
+BASELINE = Path(__file__).with_name("memory_baseline.json")
+
+
+def measure_peak(case: BenchmarkCase, *, repeat: int = 3) -> dict[str, Any]:
+    """Trace ``repeat`` calls of ``case`` and keep the smallest peak.
+
+    The peak is measured relative to the memory already held when the call
+    starts, so it covers the operation's own copies and its result only.
+    """
+    fixture = case.setup()
+    try:
+        fixture.operation()  # populate caches and lazy imports untraced
+        peaks = []
+        tracemalloc.start()
+        try:
+            for _ in range(repeat):
+                tracemalloc.reset_peak()
+                held, _ = tracemalloc.get_traced_memory()
+                fixture.operation()
+                _, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - held)
+        finally:
+            tracemalloc.stop()
+    finally:
+        fixture.cleanup()
+    peak_bytes = min(peaks)
+    result: dict[str, Any] = {"name": case.name, "size": case.size, "peak_bytes": peak_bytes}
+    if case.size:
+        result[METRIC] = round(peak_bytes / case.size, 3)
+    return result
+
+
+def run_memory_suite(
+    cases: Iterable[BenchmarkCase],
+    *,
+    repeat: int = 3,
+    report: Callable[[str, dict[str, Any]], None] | None = None,
+) -> dict[str, Any]:
+    results: dict[str, Any] = {}
+    for case in cases:
+        results[case.key] = measure_peak(case, repeat=repeat)
+        if report is not None:
+            report(case.key, results[case.key])
+    return {"schema": RESULT_SCHEMA, "environment": environment(), "results": results}
+
+
+def memory_cases(sizes: Sequence[int] = MEMORY_SIZES) -> list[BenchmarkCase]:
+    cases: list[BenchmarkCase] = []
+    for size in sizes:
+        cases.extend(
+            [
+                BenchmarkCase("memory.wrap", _wrap_setup(size), size),
+                BenchmarkCase("memory.verify", _verify_setup(size), size),
+                BenchmarkCase("memory.extract", _extract_setup(size), size),
+                BenchmarkCase("memory.mcp_sign_result", _mcp_sign_result_setup(size), size),
+            ]
+        )
+    return cases
+
+
+def _wrap_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        content = text_of_size(size)
+        return Fixture(lambda: crypto.wrap_content(content, CONTEXT))
+
+    return setup
+
+
+def _verify_setup(size: int) -> Callable[[], Fixture]:
+    def setup() -> Fixture:
+        crypto = hmac_crypto()
+        wrapped = crypto.wrap_content(text_of_size(size), CONTEXT)
+        return Fixture(lambda: crypto.extract_and_verify(wrapped, CONTEXT))
+
+    return setup
+
+
+def _extract_setup(size: int) -> Callable[[], Fixture]:
+    """One band of ``size`` bytes embedded between two paragraphs of prose."""
+
+    def setup() -> Fixture:
+        from guardbands import extract_guard_band_blocks
+
+        crypto = hmac_crypto()
+        prose = text_of_size(256)
+        prompt = "\n".join([prose, crypto.wrap_content(text_of_size(size), CONTEXT), prose])
+        return Fixture(lambda: extract_guard_band_blocks(prompt))
+
+    return setup
+
+
+def _mcp_sign_result_setup(size: int) -> Callable[[], Fixture]:
+    """Server-side signing of one text result, with visible wrapping."""
+
+    def setup() -> Fixture:
+        from mcp.types import CallToolRequestParams, CallToolResult, TextContent
+
+        from guardbands.integrations.mcp import (
+            MCP_GUARD_BAND_ID,
+            MCP_GUARD_BAND_VERSION,
+            GuardBandMCPServerExtension,
+            MCPToolPolicy,
+        )
+
+        extension = GuardBandMCPServerExtension(
+            hmac_crypto(),
+            audience="bench-server",
+            policies={"echo": MCPToolPolicy(guard_outputs=True)},
+            max_payload_bytes=4 * size + 10_000,
+        )
+        params = CallToolRequestParams(
+            name="echo",
+            arguments={},
+            _meta={
+                MCP_GUARD_BAND_ID: {
+                    "version": MCP_GUARD_BAND_VERSION,
+                    "call_id": "call-0000000000000001",
+                }
+            },
+        )
+        result = CallToolResult(content=[TextContent(type="text", text=text_of_size(size))])
+
+        async def call_next(_ctx: Any) -> CallToolResult:
+            return result
+
+        ctx = mcp_request_context()
+        loop = asyncio.new_event_loop()
+
+        def sign() -> object:
+            return loop.run_until_complete(extension.intercept_tool_call(params, ctx, call_next))
+
+        return Fixture(sign, loop.close)
+
+    return setup
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.memory", description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="skip the 1 MB cases")
+    parser.add_argument("--filter", default="", help="only run cases whose key contains this")
+    parser.add_argument("--output", type=Path, help="write JSON results to this path")
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_MEMORY_THRESHOLD,
+        help="fail when peak bytes per input byte grow by more than this fraction",
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="overwrite the baseline with this run"
+    )
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_MEMORY_SIZES if args.quick else MEMORY_SIZES
+    cases = [case for case in memory_cases(sizes) if args.filter in case.key]
+
+    def report(key: str, result: dict[str, Any]) -> None:
+        print(f"{key:<40} {result['peak_bytes']:>12,} B  {result[METRIC]:>8.2f} B/B", flush=True)
+
+    results = run_memory_suite(cases, report=report)
+    if args.output is not None:
+        write_results(args.output, results)
+    if args.update_baseline:
+        write_results(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; skipping regression check")
+        return 0
+
+    comparisons = compare(results, load_results(args.baseline), metric=METRIC)
+    larger = regressions(comparisons, args.threshold)
+    print(f"\nCompared {len(comparisons)} cases with {args.baseline}")
+    for item in larger:
+        print(
+            f"REGRESSION {item.key}: {item.baseline:.2f} -> {item.current:.2f} "
+            f"bytes per input byte ({item.ratio:.2f}x)"
+        )
+    return 1 if larger else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Parallel MCP calls benchmark: ``python -m benchmarks.parallel``.
+
+Runs many concurrent guarded tool calls against an in-memory MCP server and
+reports wall time and event-loop lag while they run. Every call returns a
+large signed result that :class:`GuardBandMCPClient` must canonicalize and
+verify. ``inline`` verifies on the event loop; ``executor`` verifies results
+above a threshold in a thread pool; ``executor_capped`` also caps how many
+results are verified at once. The server shares the event loop, so its own
+signing sets a lag floor that all three modes include.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from .cases import ed25519_peers, text_of_size
+from .harness import environment, format_ns, write_results
+from .load import percentiles
+
+DEFAULT_CALLS = 16
+DEFAULT_SIZE = 1_000_000
+DEFAULT_THRESHOLD = 65_536
+WORKERS = 4
+MODES: dict[str, dict[str, Any]] = {
+    "inline": {"executor": False},
+    "executor": {"executor": True},
+    "executor_capped": {"executor": True, "max_concurrent_verifications": 2},
+}
+
+
+async def _run_calls(mode: str, *, calls: int, size: int, threshold: int) -> dict[str, Any]:
+    from mcp import Client
+    from mcp.server.mcpserver import MCPServer
+
+    from guardbands.integrations.mcp import (
+        GuardBandMCPClient,
+        GuardBandMCPServerExtension,
+        MCPToolPolicy,
+        guard_bands_client_capability,
+    )
+
+    server_crypto, client_crypto = ed25519_peers()
+    policy = MCPToolPolicy(guard_inputs=True, guard_outputs=True)
+    limit = 4 * size + 10_000
+    server = MCPServer(
+        "bench-server",
+        extensions=[
+            GuardBandMCPServerExtension(
+                server_crypto,
+                audience="bench-server",
+                policies={"report": policy},
+                max_payload_bytes=limit,
+            )
+        ],
+    )
+    report = text_of_size(size)
+
+    @server.tool(name="report")
+    def build_report(index: int) -> str:
+        return f"{index} {report}"
+
+    settings = MODES[mode]
+    lag = array("d")
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        async with Client(server, extensions=[guard_bands_client_capability()]) as raw:
+            guarded = GuardBandMCPClient(
+                raw,
+                client_crypto,
+                audience="bench-server",
+                policies={"report": policy},
+                max_payload_bytes=limit,
+                executor=executor if settings["executor"] else None,
+                executor_threshold_bytes=threshold,
+                max_concurrent_verifications=settings.get("max_concurrent_verifications"),
+            )
+            await guarded.call_tool("report", {"index": -1})  # warm up lazy imports
+            running = True
+
+            async def monitor_lag() -> None:
+                while running:
+                    before = time.perf_counter()
+                    await asyncio.sleep(0.001)
+                    lag.append(max(0.0, time.perf_counter() - before - 0.001))
+
+            monitor = asyncio.create_task(monitor_lag())
+            started = time.perf_counter_ns()
+            results = await asyncio.gather(
+                *(guarded.call_tool("report", {"index": index}) for index in range(calls))
+            )
+            elapsed = time.perf_counter_ns() - started
+            running = False
+            await monitor
+    return {
+        "mode": mode,
+        "calls": len(results),
+        "size": size,
+        "total_ns": elapsed,
+        "calls_per_sec": round(calls / (elapsed / 1e9), 2),
+        "loop_lag_ms": percentiles(lag),
+    }
+
+
+def measure_parallel(
+    mode: str,
+    *,
+    calls: int = DEFAULT_CALLS,
+    size: int = DEFAULT_SIZE,
+    threshold: int = DEFAULT_THRESHOLD,
+) -> dict[str, Any]:
+    """Run ``calls`` concurrent guarded calls in ``mode`` on a fresh event loop."""
+    return asyncio.run(_run_calls(mode, calls=calls, size=size, threshold=threshold))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.parallel", description=__doc__)
+    parser.add_argument("--calls", type=int, default=DEFAULT_CALLS, help="concurrent tool calls")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="result text bytes")
+    parser.add_argument("--threshold", type=int, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--mode", choices=sorted(MODES), action="append")
+    parser.add_argument("--output", type=Path, help="write JSON results to this path")
+    args = parser.parse_args(argv)
+
+    results: dict[str, Any] = {}
+    for mode in args.mode or MODES:
+        result = measure_parallel(mode, calls=args.calls, size=args.size, threshold=args.threshold)
+        results[mode] = result
+        lag = result["loop_lag_ms"]
+        print(
+            f"{mode:<16} total {format_ns(result['total_ns']):>10}  "
+            f"{result['calls_per_sec']:>8.2f} calls/s  "
+            f"loop lag p99 {lag['p99']:>8.3f} ms  max {lag['max']:>8.3f} ms",
+            flush=True,
+        )
+    if args.output is not None:
+        write_results(args.output, {"environment": environment(), "results": results})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
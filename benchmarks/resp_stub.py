@@ -0,0 +1,176 @@
+"""Minimal in-process RESP server for the Redis-protocol ledgers.
+
+It implements only the commands the ledgers issue, with Redis semantics for
+``SET ... NX PX`` expiry, so neither the benchmarks nor the test suite need a
+live Redis.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import socket
+import socketserver
+import threading
+import time
+
+
+class RESPStubServer:
+    """With ``cluster=True``, multi-key commands whose keys hash to different
+    Redis Cluster slots fail with ``CROSSSLOT``, as on a sharded server."""
+
+    def __init__(self, password: str | None = None, *, cluster: bool = False) -> None:
+        self.password = password
+        self.cluster = cluster
+        self.data: dict[bytes, float | None] = {}
+        self.commands: list[list[bytes]] = []
+        self._lock = threading.RLock()
+        self._clients: set[socket.socket] = set()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            # Replies are written one per command; without TCP_NODELAY a
+            # pipelined transaction stalls on delayed ACKs.
+            disable_nagle_algorithm = True
+
+            def handle(self) -> None:
+                stub._clients.add(self.connection)
+                authenticated = stub.password is None
+                transaction: list[list[bytes]] | None = None
+                try:
+                    while True:
+                        command = _read_command(self.rfile)
+                        if command is None:
+                            return
+                        if not authenticated and command[0].upper() != b"AUTH":
+                            self.wfile.write(b"-NOAUTH Authentication required.\r\n")
+                            continue
+                        name = command[0].upper()
+                        if name == b"MULTI":
+                            transaction = []
+                            self.wfile.write(b"+OK\r\n")
+                            continue
+                        if name == b"EXEC" and transaction is not None:
+                            self.wfile.write(stub.execute_transaction(transaction))
+                            transaction = None
+                            continue
+                        if transaction is not None:
+                            transaction.append(command)
+                            self.wfile.write(b"+QUEUED\r\n")
+                            continue
+                        reply = stub.execute(command)
+                        if command[0].upper() == b"AUTH" and reply.startswith(b"+"):
+                            authenticated = True
+                        self.wfile.write(reply)
+                except (ConnectionError, OSError):
+                    return
+                finally:
+                    stub._clients.discard(self.connection)
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def port(self) -> int:
+        return int(self._server.server_address[1])
+
+    def __enter__(self) -> RESPStubServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        if self._thread.is_alive():
+            self._server.shutdown()
+        self._server.server_close()
+        self.disconnect_clients()
+
+    def disconnect_clients(self) -> None:
+        for client in list(self._clients):
+            with contextlib.suppress(OSError):
+                client.shutdown(socket.SHUT_RDWR)
+
+    def execute(self, command: list[bytes]) -> bytes:
+        name = command[0].upper()
+        with self._lock:
+            self.commands.append(command)
+            self._expire(time.monotonic())
+            if name == b"PING":
+                return b"+PONG\r\n"
+            if name == b"AUTH":
+                if command[-1].decode() == self.password:
+                    return b"+OK\r\n"
+                return b"-WRONGPASS invalid password\r\n"
+            if name == b"SELECT":
+                return b"+OK\r\n"
+            if name == b"SET":
+                return self._set(command)
+            if name == b"MSETNX":
+                keys = command[1::2]
+                if self.cluster and len({key_slot(key) for key in keys}) > 1:
+                    return b"-CROSSSLOT Keys in request don't hash to the same slot\r\n"
+                if any(key in self.data for key in keys):
+                    return b":0\r\n"
+                self.data.update(dict.fromkeys(keys))
+                return b":1\r\n"
+            if name == b"PEXPIRE":
+                if command[1] not in self.data:
+                    return b":0\r\n"
+                self.data[command[1]] = time.monotonic() + int(command[2]) / 1000
+                return b":1\r\n"
+            if name == b"EXISTS":
+                return b":%d\r\n" % sum(key in self.data for key in command[1:])
+            return b"-ERR unknown command '%s'\r\n" % name
+
+    def execute_transaction(self, commands: list[list[bytes]]) -> bytes:
+        with self._lock:
+            replies = [self.execute(command) for command in commands]
+        return b"*%d\r\n" % len(replies) + b"".join(replies)
+
+    def _set(self, command: list[bytes]) -> bytes:
+        key = command[1]
+        options = [option.upper() for option in command[3:]]
+        if b"NX" in options and key in self.data:
+            return b"$-1\r\n"
+        expires_at = None
+        if b"PX" in options:
+            expires_at = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+        self.data[key] = expires_at
+        return b"+OK\r\n"
+
+    def _expire(self, now: float) -> None:
+        expired = [key for key, at in self.data.items() if at is not None and at <= now]
+        for key in expired:
+            del self.data[key]
+
+
+def key_slot(key: bytes) -> int:
+    """Redis Cluster slot of ``key``: CRC16-XMODEM of its hash tag or itself."""
+    start = key.find(b"{")
+    if start != -1:
+        end = key.find(b"}", start + 1)
+        if end > start + 1:
+            key = key[start + 1 : end]
+    crc = 0
+    for byte in key:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1) & 0xFFFF
+    return crc % 16384
+
+
+def _read_command(stream) -> list[bytes] | None:
+    header = stream.readline()
+    if not header:
+        return None
+    if not header.startswith(b"*"):
+        raise ConnectionError("Inline commands are not supported")
+    arguments = []
+    for _ in range(int(header[1:-2])):
+        length = int(stream.readline()[1:-2])
+        arguments.append(stream.read(length + 2)[:-2])
+    return arguments
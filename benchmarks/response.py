@@ -0,0 +1,157 @@
+"""Response-signing benchmark: ``python -m benchmarks.response``.
+
+Streams a large text response through :class:`GuardBandResponseSigningMiddleware`
+and reports time to first byte, total time, and the peak memory the response
+needed. An HMAC key streams the band chunk by chunk; an Ed25519 key has to
+buffer the whole body before it can sign, which shows up in both numbers,
+unless the band is digest-bound, when only the body's hash is signed and it
+streams too. The unsigned ``passthrough`` row is the floor the others are
+compared with.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from guardbands import DIGEST_TEXT_KIND, TEXT_KIND, GuardBandCrypto
+from guardbands.integrations.fastapi import GuardBandResponseSigningMiddleware
+
+from .asgi import ASGIApp, http_scope
+from .cases import ed25519_crypto, hmac_crypto, text_of_size
+from .harness import environment, format_ns, write_results
+
+DEFAULT_SIZE = 10_000_000
+DEFAULT_CHUNK_SIZE = 65_536
+PATH = "/report"
+MODES: dict[str, Callable[[], GuardBandCrypto] | None] = {
+    "passthrough": None,
+    "hmac_stream": hmac_crypto,
+    "ed25519_buffered": ed25519_crypto,
+    "ed25519_digest_stream": ed25519_crypto,
+}
+BAND_KINDS = {"ed25519_digest_stream": DIGEST_TEXT_KIND}
+
+
+def streaming_app(size: int, chunk_size: int) -> ASGIApp:
+    """An ASGI app that streams ``size`` bytes of prose in ``chunk_size`` pieces."""
+    text = text_of_size(size).encode("ascii")
+    chunks = [text[index : index + chunk_size] for index in range(0, size, chunk_size)]
+
+    async def app(scope: dict[str, Any], receive: Any, send: Any) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+            }
+        )
+        for index, chunk in enumerate(chunks):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": index < len(chunks) - 1,
+                }
+            )
+
+    return app
+
+
+def signing_app(mode: str, size: int, chunk_size: int) -> ASGIApp:
+    app = streaming_app(size, chunk_size)
+    factory = MODES[mode]
+    if factory is None:
+        return app
+    return GuardBandResponseSigningMiddleware(
+        app,
+        factory(),
+        signed_paths=[PATH],
+        max_body_bytes=2 * size,
+        band_kind=BAND_KINDS.get(mode, TEXT_KIND),
+    )
+
+
+async def _get(app: ASGIApp) -> tuple[int, int, int]:
+    """Return (time to first body byte, total time, body bytes) in ns and bytes."""
+    started = time.perf_counter_ns()
+    first_byte = 0
+    received = 0
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal first_byte, received
+        if message["type"] == "http.response.body" and message.get("body"):
+            if not first_byte:
+                first_byte = time.perf_counter_ns() - started
+            received += len(message["body"])
+
+    await app(http_scope(PATH, method="GET"), receive, send)
+    return first_byte, time.perf_counter_ns() - started, received
+
+
+def measure_response(
+    mode: str, *, size: int = DEFAULT_SIZE, chunk_size: int = DEFAULT_CHUNK_SIZE, repeat: int = 3
+) -> dict[str, Any]:
+    """Time ``repeat`` responses, then trace one more for its memory peak."""
+    app = signing_app(mode, size, chunk_size)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_get(app))  # warm up lazy imports untraced
+        samples = [loop.run_until_complete(_get(app)) for _ in range(repeat)]
+        tracemalloc.start()
+        try:
+            held, _ = tracemalloc.get_traced_memory()
+            loop.run_until_complete(_get(app))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        loop.close()
+    return {
+        "mode": mode,
+        "size": size,
+        "chunk_size": chunk_size,
+        "ttfb_ns": min(sample[0] for sample in samples),
+        "total_ns": min(sample[1] for sample in samples),
+        "response_bytes": samples[0][2],
+        "peak_bytes": peak - held,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.response", description=__doc__)
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="response body bytes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--mode", choices=sorted(MODES), action="append")
+    parser.add_argument("--output", type=Path, help="write JSON results to this path")
+    args = parser.parse_args(argv)
+
+    results: dict[str, Any] = {}
+    for mode in args.mode or MODES:
+        result = measure_response(
+            mode, size=args.size, chunk_size=args.chunk_size, repeat=args.repeat
+        )
+        results[mode] = result
+        print(
+            f"{mode:<22} ttfb {format_ns(result['ttfb_ns']):>10}  "
+            f"total {format_ns(result['total_ns']):>10}  "
+            f"peak {result['peak_bytes']:>12,} B",
+            flush=True,
+        )
+    if args.output is not None:
+        write_results(args.output, {"environment": environment(), "results": results})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
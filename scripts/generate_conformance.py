@@ -14,14 +14,20 @@ from typing import Any
 from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 
 from guardbands.crypto import (
+    BAND_KINDS,
+    BYTES_VALUE_KIND,
     CURRENT_PROTOCOL_VERSION,
+    DETACHED_KINDS,
+    DIGEST_TEXT_KIND,
     STRUCTURED_VALUE_KIND,
+    TEXT_KIND,
     GuardBandCrypto,
     StaticKeyResolver,
     _canonical_json_for_version,
     _encode_issuer,
     canonical_json,
     canonical_mac_payload,
+    content_sha256,
     key_algorithm,
 )
 
@@ -77,10 +83,15 @@ def _inline_vector(
     version: str,
     content: str,
     context: dict[str, Any],
+    *,
+    kind: str = TEXT_KIND,
 ) -> dict[str, Any]:
     signer = _signer(key, key_id)
+    # A digest band signs the content's SHA-256 and names its kind.
+    signed_content = content if kind == TEXT_KIND else content_sha256(content)
+    kind_param = "" if kind == TEXT_KIND else f":k:{kind}"
     signature = signer.generate_mac(
-        content,
+        signed_content,
         context,
         NONCE,
         key,
@@ -89,13 +100,14 @@ def _inline_vector(
         issuer=ISSUER,
         issued_at=ISSUED_AT,
         expires_at=EXPIRES_AT,
+        kind=kind,
     )
     wrapped = (
-        f"⟪INERT:START:v:{version}:r:{NONCE}:iat:{ISSUED_AT}:exp:{EXPIRES_AT}⟫\n"
+        f"⟪INERT:START:v:{version}{kind_param}:r:{NONCE}:iat:{ISSUED_AT}:exp:{EXPIRES_AT}⟫\n"
         f"{content}\n"
         f"⟪INERT:END:mac:{signature}:kid:{key_id}:iss:{_encode_issuer(ISSUER)}⟫"
     )
-    return {
+    vector: dict[str, Any] = {
         "id": vector_id,
         "mode": "inline",
         "version": version,
@@ -106,10 +118,14 @@ def _inline_vector(
         "expires_at": EXPIRES_AT,
         "content": content,
         "context": context,
-        "canonical_payload": _payload(content, context, key, key_id, version),
-        "signature_base64": signature,
-        "artifact": wrapped,
     }
+    if kind != TEXT_KIND:
+        vector["kind"] = kind
+        vector["content_sha256"] = signed_content
+    vector["canonical_payload"] = _payload(signed_content, context, key, key_id, version, kind=kind)
+    vector["signature_base64"] = signature
+    vector["artifact"] = wrapped
+    return vector
 
 
 def _detached_vector(
@@ -169,6 +185,54 @@ def _detached_vector(
     }
 
 
+def _bytes_vector(
+    vector_id: str,
+    key: bytes | Ed25519PrivateKey,
+    key_id: str,
+    data: bytes,
+    context: dict[str, Any],
+) -> dict[str, Any]:
+    version = CURRENT_PROTOCOL_VERSION
+    digest = hashlib.sha256(data).hexdigest()
+    signature = _signer(key, key_id).generate_mac(
+        digest,
+        context,
+        NONCE,
+        key,
+        version=version,
+        key_id=key_id,
+        issuer=ISSUER,
+        issued_at=ISSUED_AT,
+        expires_at=EXPIRES_AT,
+        kind=BYTES_VALUE_KIND,
+    )
+    return {
+        "id": vector_id,
+        "mode": "detached-bytes",
+        "version": version,
+        "key_id": key_id,
+        "issuer": ISSUER,
+        "nonce": NONCE,
+        "issued_at": ISSUED_AT,
+        "expires_at": EXPIRES_AT,
+        "bytes_hex": data.hex(),
+        "context": context,
+        "content_sha256": digest,
+        "canonical_payload": _payload(digest, context, key, key_id, version, kind=BYTES_VALUE_KIND),
+        "signature_base64": signature,
+        "artifact": {
+            "version": version,
+            "nonce": NONCE,
+            "issued_at": ISSUED_AT,
+            "expires_at": EXPIRES_AT,
+            "key_id": key_id,
+            "issuer": ISSUER,
+            "algorithm": key_algorithm(key, version=version),
+            "signature": signature,
+        },
+    }
+
+
 def _mcp_context(
     *,
     direction: str,
@@ -301,17 +365,53 @@ def build_vectors() -> dict[str, Any]:
             {"count": 1, "ok": True},
             {"request_id": "legacy-001"},
         ),
+        _inline_vector(
+            "v2-hmac-inline-digest",
+            HMAC_KEY,
+            "test-hmac-01",
+            CURRENT_PROTOCOL_VERSION,
+            "Untrusted café content\nSecond line",
+            portable_context,
+            kind=DIGEST_TEXT_KIND,
+        ),
+        _inline_vector(
+            "v2-ed25519-inline-digest",
+            private,
+            "test-ed25519-01",
+            CURRENT_PROTOCOL_VERSION,
+            'Tool output: {"ok":true}',
+            portable_context,
+            kind=DIGEST_TEXT_KIND,
+        ),
+        _bytes_vector(
+            "v2-hmac-detached-bytes",
+            HMAC_KEY,
+            "test-hmac-01",
+            b"%PDF-1.7\n\x00\xff\xfe binary",
+            portable_context,
+        ),
+        _bytes_vector(
+            "v2-ed25519-detached-bytes",
+            private,
+            "test-ed25519-01",
+            bytes(range(256)),
+            portable_context,
+        ),
     ]
 
     tampered_inline = signatures[0]["artifact"].replace("café", "cafe", 1)
     tampered_envelope = dict(signatures[1]["artifact"])
     tampered_envelope["issuer"] = "attacker.example"
+    digest_inline = signatures[6]["artifact"]
+    bytes_vector = signatures[8]
 
     return {
         "schema": "guard-bands-conformance-v1",
         "protocol": {
             "current": CURRENT_PROTOCOL_VERSION,
             "verification": ["1", CURRENT_PROTOCOL_VERSION],
+            "inline_kinds": {version: sorted(kinds) for version, kinds in BAND_KINDS.items()},
+            "detached_kinds": {version: sorted(kinds) for version, kinds in DETACHED_KINDS.items()},
             "v2_canonicalization": "RFC 8785 (JCS)",
         },
         "warning": "All keys are public test fixtures. Never use them in production.",
@@ -370,6 +470,40 @@ def build_vectors() -> dict[str, Any]:
                 "artifact": tampered_envelope,
                 "valid": False,
             },
+            {
+                "id": "inline-digest-content-tampering",
+                "key_id": "test-hmac-01",
+                "mode": "inline",
+                "context": portable_context,
+                "artifact": digest_inline.replace("café", "cafe", 1),
+                "valid": False,
+            },
+            {
+                "id": "inline-digest-kind-stripped",
+                "key_id": "test-hmac-01",
+                "mode": "inline",
+                "context": portable_context,
+                "artifact": digest_inline.replace(f":k:{DIGEST_TEXT_KIND}", "", 1),
+                "valid": False,
+            },
+            {
+                "id": "detached-bytes-content-tampering",
+                "key_id": "test-hmac-01",
+                "mode": "detached-bytes",
+                "bytes_hex": bytes_vector["bytes_hex"][:-2] + "00",
+                "context": portable_context,
+                "artifact": bytes_vector["artifact"],
+                "valid": False,
+            },
+            {
+                "id": "detached-bytes-as-json-value",
+                "key_id": "test-hmac-01",
+                "mode": "detached-json",
+                "value": bytes_vector["content_sha256"],
+                "context": portable_context,
+                "artifact": bytes_vector["artifact"],
+                "valid": False,
+            },
         ],
     }
 
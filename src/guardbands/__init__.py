@@ -1,49 +1,111 @@
 """Public API for the Guard Bands boundary library."""
 
 from .crypto import (
+    BAND_KINDS,
+    BYTES_VALUE_KIND,
     CURRENT_PROTOCOL_VERSION,
+    DETACHED_KINDS,
+    DIGEST_TEXT_KIND,
     ED25519_ALG,
     LEGACY_ED25519_ALG,
     LEGACY_MAC_ALG,
+    LEGACY_SESSION_MAC_ALG,
     MAC_ALG,
+    SESSION_MAC_ALG,
     SUPPORTED_PROTOCOL_VERSIONS,
+    TEXT_KIND,
     GuardBandCrypto,
     GuardBandKey,
+    GuardBandSigner,
+    GuardBandStreamSigner,
+    GuardBandVerifier,
     KeyResolver,
+    PreparedValue,
+    SessionKey,
     StaticKeyResolver,
     canonical_context,
     canonical_json,
+    canonical_json_size,
+    content_sha256,
     extract_guard_band_blocks,
     generate_ed25519_keypair,
     load_ed25519_private_key,
     load_ed25519_public_key,
+    negotiate_band_kind,
 )
+from .observability import GuardBandEvent, GuardBandObserver, HistogramObserver
+from .prometheus import PrometheusCollector, metrics_endpoint
 from .replay import (
+    AsyncReplayLedger,
     NonceReplayLedger,
     ReplayLedger,
+    ReplayLedgerUnavailableError,
     SQLiteReplayLedger,
+    apply_async_replay_protection,
     apply_replay_protection,
+    apply_replay_protection_many,
+    consume_many,
+)
+from .resp import AsyncRESPReplayLedger, RESPReplayLedger
+from .sessions import (
+    SessionGrant,
+    SessionKeyResolver,
+    issue_session_grant,
+    session_crypto,
+    verify_session_grant,
 )
 
 __all__ = [
+    "BAND_KINDS",
+    "BYTES_VALUE_KIND",
     "CURRENT_PROTOCOL_VERSION",
+    "DETACHED_KINDS",
+    "DIGEST_TEXT_KIND",
     "ED25519_ALG",
     "LEGACY_ED25519_ALG",
     "LEGACY_MAC_ALG",
+    "LEGACY_SESSION_MAC_ALG",
     "MAC_ALG",
+    "SESSION_MAC_ALG",
     "SUPPORTED_PROTOCOL_VERSIONS",
+    "TEXT_KIND",
+    "AsyncRESPReplayLedger",
+    "AsyncReplayLedger",
     "GuardBandCrypto",
+    "GuardBandEvent",
     "GuardBandKey",
+    "GuardBandObserver",
+    "GuardBandSigner",
+    "GuardBandStreamSigner",
+    "GuardBandVerifier",
+    "HistogramObserver",
     "KeyResolver",
     "NonceReplayLedger",
+    "PreparedValue",
+    "PrometheusCollector",
+    "RESPReplayLedger",
     "ReplayLedger",
+    "ReplayLedgerUnavailableError",
     "SQLiteReplayLedger",
+    "SessionGrant",
+    "SessionKey",
+    "SessionKeyResolver",
     "StaticKeyResolver",
+    "apply_async_replay_protection",
     "apply_replay_protection",
+    "apply_replay_protection_many",
     "canonical_context",
     "canonical_json",
+    "canonical_json_size",
+    "consume_many",
+    "content_sha256",
     "extract_guard_band_blocks",
     "generate_ed25519_keypair",
+    "issue_session_grant",
     "load_ed25519_private_key",
     "load_ed25519_public_key",
+    "metrics_endpoint",
+    "negotiate_band_kind",
+    "session_crypto",
+    "verify_session_grant",
 ]
@@ -2,10 +2,16 @@ import base64
 import hashlib
 import hmac
 import json
+import mmap
+import os
 import re
 import secrets
+import stat
 import time
-from typing import Any, Protocol, cast
+import warnings
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import IO, Any, Protocol, cast
 
 import rfc8785
 from cryptography.exceptions import InvalidSignature
@@ -14,12 +20,32 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import (
     Ed25519PublicKey,
 )
 
+from .observability import GuardBandObserver, PhaseTimer
+
 CURRENT_PROTOCOL_VERSION = "2"
 SUPPORTED_PROTOCOL_VERSIONS = frozenset({"1", CURRENT_PROTOCOL_VERSION})
 # Compatibility alias retained for callers that used the original singular
 # constant to discover the version emitted by the signer.
 SUPPORTED_PROTOCOL_VERSION = CURRENT_PROTOCOL_VERSION
 STRUCTURED_VALUE_KIND = "json"
+# Detached envelopes over raw bytes sign the SHA-256 of the bytes, so the
+# input is hashed in place, never encoded into JSON.
+BYTES_VALUE_KIND = "bytes-sha256"
+# The detached envelope kinds each protocol version can carry.
+DETACHED_KINDS = {
+    "1": frozenset({STRUCTURED_VALUE_KIND}),
+    CURRENT_PROTOCOL_VERSION: frozenset({STRUCTURED_VALUE_KIND, BYTES_VALUE_KIND}),
+}
+TEXT_KIND = "text"
+# Inline bands whose signature covers the SHA-256 of the UTF-8 content rather
+# than the content itself. The START marker names the kind, so a verifier that
+# predates it rejects such a band as malformed instead of misreading it.
+DIGEST_TEXT_KIND = "text-sha256"
+# The inline band kinds each protocol version can carry.
+BAND_KINDS = {
+    "1": frozenset({TEXT_KIND}),
+    CURRENT_PROTOCOL_VERSION: frozenset({TEXT_KIND, DIGEST_TEXT_KIND}),
+}
 # Domain-separation / algorithm tags bound into every signature. The tag is
 # derived from the resolved key's type and authenticated inside the payload,
 # so a band signed under one algorithm can never verify under another
@@ -28,15 +54,22 @@ LEGACY_MAC_ALG = "GBv1-HMAC-SHA256"
 LEGACY_ED25519_ALG = "GBv1-Ed25519"
 MAC_ALG = "GBv2-HMAC-SHA256"
 ED25519_ALG = "GBv2-Ed25519"
+# HMAC-SHA256 under a subkey derived from a signed session grant. The
+# distinct tag keeps session tags and ordinary HMAC bands from verifying as
+# one another even if the key bytes were ever shared.
+LEGACY_SESSION_MAC_ALG = "GBv1-Session-HMAC-SHA256"
+SESSION_MAC_ALG = "GBv2-Session-HMAC-SHA256"
 _ALGORITHMS = {
-    "1": {"hmac": LEGACY_MAC_ALG, "ed25519": LEGACY_ED25519_ALG},
-    "2": {"hmac": MAC_ALG, "ed25519": ED25519_ALG},
+    "1": {"hmac": LEGACY_MAC_ALG, "ed25519": LEGACY_ED25519_ALG, "session": LEGACY_SESSION_MAC_ALG},
+    "2": {"hmac": MAC_ALG, "ed25519": ED25519_ALG, "session": SESSION_MAC_ALG},
 }
 _SIGNATURE_LENGTHS = {
     LEGACY_MAC_ALG: 32,
     LEGACY_ED25519_ALG: 64,
+    LEGACY_SESSION_MAC_ALG: 32,
     MAC_ALG: 32,
     ED25519_ALG: 64,
+    SESSION_MAC_ALG: 32,
 }
 
 # Keys accepted by the resolver: raw bytes select HMAC-SHA256 (symmetric —
@@ -45,6 +78,16 @@ _SIGNATURE_LENGTHS = {
 # is what gives the two-channel architecture true cryptographic role
 # separation demonstrated by the guard-bands-reference deployment.
 GuardBandKey = bytes | Ed25519PrivateKey | Ed25519PublicKey
+
+
+class SessionKey(bytes):
+    """An HMAC subkey derived for one session; see :mod:`guardbands.sessions`.
+
+    It signs exactly like a raw bytes key but selects the session algorithm
+    tag, so a tag made with it only verifies against a session key.
+    """
+
+
 GuardBandContext = dict[str, Any]
 GuardBandResult = dict[str, Any]
 
@@ -58,12 +101,14 @@ class KeyResolver(Protocol):
 
 
 DEFAULT_TTL_SECONDS = 900
+DEFAULT_READ_CHUNK_BYTES = 1 << 20
 DEFAULT_ISSUER = "anonymous"
 
 KEY_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
 NONCE_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,128}$")
 ISSUER_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,344}$")  # base64url(no pad) of <=256 bytes
 INT_PATTERN = re.compile(r"^[0-9]{1,19}$")
+SHA256_HEX_PATTERN = re.compile(r"^[0-9a-f]{64}$")
 START_PREFIX = "⟪INERT:START:"
 END_PREFIX = "⟪INERT:END:"
 RESERVED_START_MARKER = "⟪INERT:START"
@@ -75,6 +120,52 @@ def canonical_json(value: Any) -> str:
     return rfc8785.dumps(value).decode("utf-8")
 
 
+class _CanonicalSizeExceededError(Exception):
+    def __init__(self, size: int) -> None:
+        self.size = size
+
+
+def canonical_json_size(value: Any, limit: int | None = None) -> int:
+    """Return the UTF-8 length of ``value``'s RFC 8785 form without building it.
+
+    With ``limit``, counting stops as soon as the running total passes it and
+    that partial total is returned. The caller only learns that the value is
+    too large, but an oversized value costs about ``limit`` bytes of work
+    instead of a full serialization. Values that :func:`canonical_json` would
+    reject may still raise :class:`TypeError` or :class:`ValueError`.
+    """
+    try:
+        return _measure_canonical(value, 0, -1 if limit is None else limit)
+    except _CanonicalSizeExceededError as exc:
+        return exc.size
+
+
+def _measure_canonical(value: Any, size: int, limit: int) -> int:
+    if isinstance(value, str):
+        # Each character is at least one byte; check that before escaping.
+        size += len(value) + 2
+        if 0 <= limit < size:
+            raise _CanonicalSizeExceededError(size)
+        size += len(json.dumps(value, ensure_ascii=False).encode("utf-8")) - len(value) - 2
+    elif value is None or isinstance(value, (bool, int, float)):
+        size += len(rfc8785.dumps(value))
+    elif isinstance(value, dict):
+        size += 2 + max(2 * len(value) - 1, 0)  # braces, colons, and commas
+        for key, member in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"Object keys must be strings: {key!r}")
+            size = _measure_canonical(member, _measure_canonical(key, size, limit), limit)
+    elif isinstance(value, (list, tuple)):
+        size += 2 + max(len(value) - 1, 0)  # brackets and commas
+        for item in value:
+            size = _measure_canonical(item, size, limit)
+    else:
+        raise TypeError(f"Value is not JSON serializable: {type(value).__name__}")
+    if 0 <= limit < size:
+        raise _CanonicalSizeExceededError(size)
+    return size
+
+
 def _canonical_json_v1(value: Any) -> str:
     """Return the legacy Python canonical JSON used by protocol v1."""
     return json.dumps(
@@ -107,6 +198,8 @@ def key_algorithm(key: GuardBandKey, *, version: str = CURRENT_PROTOCOL_VERSION)
         raise ValueError(f"Unsupported guard band version: {version}") from exc
     if isinstance(key, (Ed25519PrivateKey, Ed25519PublicKey)):
         return algorithms["ed25519"]
+    if isinstance(key, SessionKey):
+        return algorithms["session"]
     if isinstance(key, (bytes, bytearray)):
         return algorithms["hmac"]
     raise TypeError(f"Unsupported key type: {type(key).__name__}")
@@ -182,6 +275,200 @@ def canonical_mac_payload(
     return _canonical_json_for_version(payload, version).encode("utf-8")
 
 
+def content_sha256(content: str) -> str:
+    """Hex SHA-256 of the UTF-8 content, as a digest band authenticates it."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def negotiate_band_kind(
+    peer_kinds: Iterable[str], *, version: str = CURRENT_PROTOCOL_VERSION
+) -> str:
+    """Return the inline band kind to send a peer that verifies ``peer_kinds``.
+
+    Digest bands are chosen only when both ``version`` and the peer support
+    them; otherwise plain text bands, which every verifier accepts.
+    """
+    if DIGEST_TEXT_KIND in BAND_KINDS.get(version, ()) and DIGEST_TEXT_KIND in set(peer_kinds):
+        return DIGEST_TEXT_KIND
+    return TEXT_KIND
+
+
+def _check_band_kind(kind: str, version: str) -> None:
+    if kind not in BAND_KINDS.get(version, ()):
+        raise ValueError(f"Band kind {kind} is not supported by protocol version {version}")
+
+
+def _signed_content(content: str, kind: str, content_digest: str | None) -> str:
+    """Return what a band of ``kind`` authenticates in place of ``content``."""
+    if kind == TEXT_KIND:
+        if content_digest is not None:
+            raise ValueError(f"content_digest requires the {DIGEST_TEXT_KIND} band kind")
+        return content
+    if content_digest is None:
+        return content_sha256(content)
+    if not SHA256_HEX_PATTERN.fullmatch(content_digest):
+        raise ValueError("content_digest must be a lowercase hex SHA-256 digest")
+    return content_digest
+
+
+# Stands in for a band's index while the rest of an indexed context is
+# canonicalized. It is random so that no context can contain it by design.
+_INDEX_PLACEHOLDER = f"guard-band-index-{secrets.token_hex(16)}"
+
+
+class _PreparedContext:
+    """A context canonicalized once and shared across many bands.
+
+    With ``index_field``, a band may also carry an index, and its context is
+    ``{**context, index_field: index}``. The shared part is still
+    canonicalized once: each index is spliced into a template where a
+    placeholder stood.
+    """
+
+    __slots__ = ("_encoded", "_templates", "context", "index_field")
+
+    def __init__(self, context: GuardBandContext | None, index_field: str | None = None) -> None:
+        self.context = context or {}
+        self.index_field = index_field
+        self._encoded: dict[str, str] = {}
+        self._templates: dict[str, tuple[str, str] | None] = {}
+
+    def check_index(self, index: int | None) -> None:
+        if index is None:
+            return
+        if self.index_field is None:
+            raise ValueError("A band index requires an index_field")
+        if isinstance(index, bool) or not isinstance(index, int):
+            raise TypeError("A band index must be an int")
+
+    def encoded(self, version: str, index: int | None = None) -> str:
+        """Return the canonical context, with ``index`` added when given."""
+        if index is None or self.index_field is None:
+            context_json = self._encoded.get(version)
+            if context_json is None:
+                context_json = _canonical_json_for_version(self.context, version)
+                self._encoded[version] = context_json
+            return context_json
+        if version not in self._templates:
+            parts = _canonical_json_for_version(
+                {**self.context, self.index_field: _INDEX_PLACEHOLDER}, version
+            ).split(f'"{_INDEX_PLACEHOLDER}"')
+            self._templates[version] = (parts[0], parts[1]) if len(parts) == 2 else None
+        template = self._templates[version]
+        if template is None:
+            return _canonical_json_for_version({**self.context, self.index_field: index}, version)
+        return f"{template[0]}{index}{template[1]}"
+
+    def mac_payload(
+        self,
+        content: str,
+        nonce: str,
+        *,
+        version: str,
+        key_id: str,
+        issuer: str,
+        issued_at: int,
+        expires_at: int,
+        alg: str,
+        index: int | None = None,
+        kind: str = TEXT_KIND,
+    ) -> bytes:
+        """Return exactly what :func:`canonical_mac_payload` would for an inline band."""
+        context_json = self.encoded(version, index)
+        payload = {
+            "alg": alg,
+            "content": content,
+            "exp": expires_at,
+            "iat": issued_at,
+            "iss": issuer,
+            "kid": key_id,
+            "nonce": nonce,
+            "v": version,
+        }
+        if kind != TEXT_KIND:
+            payload["kind"] = kind
+        encoded = _canonical_json_for_version(payload, version)
+        # Both canonical forms sort "context" between "content" and "exp", and
+        # no JSON string can hold an unescaped quote, so the first ',"exp":' is
+        # the member boundary where the context belongs.
+        split = encoded.index(',"exp":')
+        return f'{encoded[:split]},"context":{context_json}{encoded[split:]}'.encode()
+
+
+class PreparedValue:
+    """A JSON value whose canonical form is computed at most once per version.
+
+    Pass it to :meth:`GuardBandCrypto.sign_value` or
+    :meth:`GuardBandCrypto.verify_value` in place of the value when the same
+    value is signed, verified, measured, or hashed several times. The value
+    must not be mutated after its canonical form has been computed.
+    """
+
+    __slots__ = ("_canonical", "value")
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+        self._canonical: dict[str, str] = {}
+
+    def canonical(self, version: str = CURRENT_PROTOCOL_VERSION) -> str:
+        """Return the value's canonical JSON for a protocol version."""
+        encoded = self._canonical.get(version)
+        if encoded is None:
+            encoded = self._canonical[version] = _canonical_json_for_version(self.value, version)
+        return encoded
+
+
+def _hash_bytes(data: bytes | bytearray | memoryview) -> tuple[str, int]:
+    return hashlib.sha256(data).hexdigest(), memoryview(data).nbytes
+
+
+def _hash_stream(stream: IO[bytes], chunk_size: int) -> tuple[str, int]:
+    """Hash the rest of ``stream`` in ``chunk_size`` reads."""
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := stream.read(chunk_size):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _hash_file(path: str | os.PathLike[str], chunk_size: int) -> tuple[str, int]:
+    """Hash a file through a read-only memory map.
+
+    The map is hashed one ``chunk_size`` window at a time, and each update
+    releases the GIL. Where the platform allows, each window's pages are then
+    dropped from the process, which keeps resident memory flat however large
+    the file is. Empty files and anything that is not a regular file, such
+    as a pipe, are read in chunks instead.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive")
+    with open(path, "rb") as file:
+        info = os.fstat(file.fileno())
+        if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+            return _hash_stream(file, chunk_size)
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            size = len(mapped)
+            # Dropped ranges must start on a page boundary.
+            window = -(-chunk_size // mmap.PAGESIZE) * mmap.PAGESIZE
+            drop = getattr(mmap, "MADV_DONTNEED", None) if hasattr(mapped, "madvise") else None
+            digest = hashlib.sha256()
+            with memoryview(mapped) as view:
+                for start in range(0, size, window):
+                    digest.update(view[start : start + window])
+                    if drop is not None:
+                        mapped.madvise(drop, start, min(window, size - start))
+            return digest.hexdigest(), size
+
+
+def _canonical_value(value: Any, version: str) -> str:
+    if isinstance(value, PreparedValue):
+        return value.canonical(version)
+    return _canonical_json_for_version(value, version)
+
+
 def _encode_issuer(issuer: str) -> str:
     return base64.urlsafe_b64encode(issuer.encode("utf-8")).decode("ascii").rstrip("=")
 
@@ -283,7 +570,9 @@ def _decode_base64_field(value: str, expected_bytes: int, field_name: str) -> st
     return None
 
 
-def _parse_params(raw_params: str, expected_keys: set[str]) -> tuple[dict[str, str], str | None]:
+def _parse_params(
+    raw_params: str, expected_keys: set[str], optional_keys: frozenset[str] = frozenset()
+) -> tuple[dict[str, str], str | None]:
     parts = raw_params.split(":")
     if len(parts) % 2 != 0:
         return {}, "Malformed marker parameters"
@@ -296,7 +585,7 @@ def _parse_params(raw_params: str, expected_keys: set[str]) -> tuple[dict[str, s
             return {}, "Malformed marker parameters"
         if key in params:
             return {}, f"Duplicate marker parameter: {key}"
-        if key not in expected_keys:
+        if key not in expected_keys and key not in optional_keys:
             return {}, f"Unsupported marker parameter: {key}"
         params[key] = value
 
@@ -320,7 +609,9 @@ def _parse_guard_band(
     if RESERVED_START_MARKER in content or RESERVED_END_MARKER in content:
         return None, "Nested guard band markers are not allowed"
 
-    start_dict, start_error = _parse_params(start_params, {"v", "r", "iat", "exp"})
+    start_dict, start_error = _parse_params(
+        start_params, {"v", "r", "iat", "exp"}, optional_keys=frozenset({"k"})
+    )
     if start_error:
         return None, start_error
 
@@ -332,6 +623,11 @@ def _parse_guard_band(
     if version not in SUPPORTED_PROTOCOL_VERSIONS:
         return None, f"Unsupported guard band version: {version}"
 
+    # Plain text bands never name their kind, so each band has one spelling.
+    kind = start_dict.get("k", TEXT_KIND)
+    if "k" in start_dict and (kind == TEXT_KIND or kind not in BAND_KINDS[version]):
+        return None, f"Unsupported guard band kind: {kind}"
+
     nonce = start_dict["r"]
     if not NONCE_PATTERN.fullmatch(nonce):
         return None, "Invalid nonce format"
@@ -366,6 +662,7 @@ def _parse_guard_band(
     return {
         "content": content,
         "version": version,
+        "kind": kind,
         "nonce": nonce,
         "issued_at": issued_at,
         "expires_at": expires_at,
@@ -411,12 +708,24 @@ class StaticKeyResolver:
 
 
 class GuardBandCrypto:
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        for name in ("generate_mac", "verify_mac"):
+            if name in cls.__dict__:
+                warnings.warn(
+                    f"{cls.__name__}.{name} is no longer called when signing or verifying; "
+                    "override sign_message and verify_message instead",
+                    DeprecationWarning,
+                    stacklevel=2,
+                )
+
     def __init__(
         self,
         secret_key: bytes | None = None,
         key_resolver: KeyResolver | None = None,
         default_key_id: str = "key001",
         signing_version: str = CURRENT_PROTOCOL_VERSION,
+        observer: GuardBandObserver | None = None,
     ):
         if signing_version not in SUPPORTED_PROTOCOL_VERSIONS:
             raise ValueError(f"Unsupported signing version: {signing_version}")
@@ -426,6 +735,7 @@ class GuardBandCrypto:
             key_resolver = StaticKeyResolver({default_key_id: secret_key}, default_key_id)
         self.key_resolver = key_resolver
         self.signing_version = signing_version
+        self.observer = observer
 
     def generate_nonce(self) -> str:
         """Generate a random nonce"""
@@ -440,6 +750,25 @@ class GuardBandCrypto:
         h = hashlib.sha256(content.encode("utf-8")).digest()
         return base64.b64encode(h).decode("utf-8")
 
+    def sign_message(self, message: bytes, signing_key: GuardBandKey) -> str:
+        """Sign one canonical payload and return the Base64 signature.
+
+        Every signing path calls this, so a subclass can override it to sign
+        elsewhere, for example in a KMS or HSM. Streaming text bands hash the
+        payload incrementally and are refused when it is overridden.
+        """
+        return _sign_message(message, signing_key)
+
+    def verify_message(
+        self, message: bytes, signature: str, verification_key: GuardBandKey
+    ) -> bool:
+        """Check a Base64 signature over one canonical payload.
+
+        Every verification path calls this, after parsing and key lookup and
+        before the freshness check.
+        """
+        return _verify_message(message, signature, verification_key)
+
     def generate_mac(
         self,
         content: str,
@@ -458,9 +787,9 @@ class GuardBandCrypto:
 
         The algorithm follows the key type: bytes → HMAC-SHA256, Ed25519
         private key → Ed25519 signature. A verification-only public key
-        cannot sign and raises.
+        cannot sign and raises. Overriding this method is deprecated: the
+        library signs through :meth:`sign_message`.
         """
-        alg = key_algorithm(secret_key, version=version)
         message = canonical_mac_payload(
             content,
             context,
@@ -470,16 +799,10 @@ class GuardBandCrypto:
             issuer=issuer,
             issued_at=issued_at,
             expires_at=expires_at,
-            alg=alg,
+            alg=key_algorithm(secret_key, version=version),
             kind=kind,
         )
-        if isinstance(secret_key, Ed25519PublicKey):
-            raise ValueError("Ed25519 public key is verification-only and cannot sign")
-        if isinstance(secret_key, Ed25519PrivateKey):
-            signature = secret_key.sign(message)
-        else:
-            signature = hmac.new(secret_key, message, hashlib.sha256).digest()
-        return base64.b64encode(signature).decode("utf-8")
+        return self.sign_message(message, secret_key)
 
     def verify_mac(
         self,
@@ -496,43 +819,24 @@ class GuardBandCrypto:
         expires_at: int,
         kind: str = "text",
     ) -> bool:
-        """Verify the signature over the recomputed authenticated payload."""
-        alg = key_algorithm(secret_key, version=version)
-        if isinstance(secret_key, (Ed25519PrivateKey, Ed25519PublicKey)):
-            message = canonical_mac_payload(
-                content,
-                context,
-                nonce,
-                version=version,
-                key_id=key_id,
-                issuer=issuer,
-                issued_at=issued_at,
-                expires_at=expires_at,
-                alg=alg,
-                kind=kind,
-            )
-            public_key = (
-                secret_key.public_key() if isinstance(secret_key, Ed25519PrivateKey) else secret_key
-            )
-            try:
-                public_key.verify(base64.b64decode(provided_mac), message)
-                return True
-            except (InvalidSignature, ValueError):
-                return False
+        """Verify the signature over the recomputed authenticated payload.
 
-        expected_mac = self.generate_mac(
+        Overriding this method is deprecated: the library verifies through
+        :meth:`verify_message`.
+        """
+        message = canonical_mac_payload(
             content,
             context,
             nonce,
-            secret_key,
             version=version,
             key_id=key_id,
             issuer=issuer,
             issued_at=issued_at,
             expires_at=expires_at,
+            alg=key_algorithm(secret_key, version=version),
             kind=kind,
         )
-        return hmac.compare_digest(expected_mac, provided_mac)
+        return self.verify_message(message, provided_mac, secret_key)
 
     def sign_value(
         self,
@@ -547,9 +851,142 @@ class GuardBandCrypto:
 
         Detached envelopes are intended for structured protocols such as MCP,
         where changing the application's JSON value would violate its schema.
-        The value itself is not included in the envelope.
+        The value itself is not included in the envelope. ``value`` may be a
+        :class:`PreparedValue` to reuse its canonical form.
         """
-        value_json = _canonical_json_for_version(value, self.signing_version)
+        observer = self.observer
+        if observer is None:
+            return self._sign_value(value, context, key_id, issuer, ttl_seconds, now, None)
+        return _observed(
+            observer,
+            "sign_value",
+            lambda timer: self._sign_value(value, context, key_id, issuer, ttl_seconds, now, timer),
+        )
+
+    def _sign_value(
+        self,
+        value: Any,
+        context: GuardBandContext,
+        key_id: str | None,
+        issuer: str | None,
+        ttl_seconds: int | None,
+        now: float | None,
+        timer: PhaseTimer | None,
+    ) -> GuardBandResult:
+        value_json = _canonical_value(value, self.signing_version)
+        return self._sign_detached(
+            value_json,
+            STRUCTURED_VALUE_KIND,
+            "canonicalize",
+            context,
+            key_id,
+            issuer,
+            ttl_seconds,
+            now,
+            timer,
+        )
+
+    def sign_bytes(
+        self,
+        data: bytes | bytearray | memoryview,
+        context: GuardBandContext,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        now: float | None = None,
+    ) -> GuardBandResult:
+        """Sign raw bytes and return a detached envelope.
+
+        The signature covers the SHA-256 of the bytes, so a PDF or an
+        embedding blob is signed without encoding it into JSON. The envelope
+        has the same fields as one from :meth:`sign_value`, but it only
+        verifies through :meth:`verify_bytes` and its file and stream
+        variants.
+        """
+        return self._sign_hashed(
+            lambda: _hash_bytes(data), context, key_id, issuer, ttl_seconds, now
+        )
+
+    def sign_file(
+        self,
+        path: str | os.PathLike[str],
+        context: GuardBandContext,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        now: float | None = None,
+        *,
+        chunk_size: int = DEFAULT_READ_CHUNK_BYTES,
+    ) -> GuardBandResult:
+        """Sign a file's bytes like :meth:`sign_bytes`, hashing it in place.
+
+        Regular files are memory-mapped, so memory use does not grow with the
+        file. Anything else is read in ``chunk_size`` pieces.
+        """
+        return self._sign_hashed(
+            lambda: _hash_file(path, chunk_size), context, key_id, issuer, ttl_seconds, now
+        )
+
+    def sign_stream(
+        self,
+        stream: IO[bytes],
+        context: GuardBandContext,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        now: float | None = None,
+        *,
+        chunk_size: int = DEFAULT_READ_CHUNK_BYTES,
+    ) -> GuardBandResult:
+        """Sign the rest of a binary stream like :meth:`sign_bytes`.
+
+        The stream is read to its end in ``chunk_size`` pieces, so at most one
+        piece is held at a time.
+        """
+        return self._sign_hashed(
+            lambda: _hash_stream(stream, chunk_size), context, key_id, issuer, ttl_seconds, now
+        )
+
+    def _sign_hashed(
+        self,
+        hash_content: Callable[[], tuple[str, int]],
+        context: GuardBandContext,
+        key_id: str | None,
+        issuer: str | None,
+        ttl_seconds: int | None,
+        now: float | None,
+    ) -> GuardBandResult:
+        if BYTES_VALUE_KIND not in DETACHED_KINDS[self.signing_version]:
+            raise ValueError(
+                f"Byte envelopes are not supported by protocol version {self.signing_version}"
+            )
+
+        def sign(timer: PhaseTimer | None) -> GuardBandResult:
+            digest, size = hash_content()
+            if timer is not None:
+                timer.payload_bytes = size
+            return self._sign_detached(
+                digest, BYTES_VALUE_KIND, "hash", context, key_id, issuer, ttl_seconds, now, timer
+            )
+
+        observer = self.observer
+        if observer is None:
+            return sign(None)
+        return _observed(observer, "sign_bytes", sign)
+
+    def _sign_detached(
+        self,
+        signed_content: str,
+        kind: str,
+        phase: str,
+        context: GuardBandContext,
+        key_id: str | None,
+        issuer: str | None,
+        ttl_seconds: int | None,
+        now: float | None,
+        timer: PhaseTimer | None,
+    ) -> GuardBandResult:
+        """Sign ``signed_content``, which the caller prepared in ``phase``."""
         issuer = issuer or DEFAULT_ISSUER
         if len(issuer.encode("utf-8")) > 256:
             raise ValueError("Issuer must be at most 256 bytes")
@@ -557,24 +994,37 @@ class GuardBandCrypto:
         ttl = DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
         if ttl < 0:
             raise ValueError("ttl_seconds must not be negative")
+        if timer is not None:
+            timer.mark(phase)
 
         nonce = self.generate_nonce()
         signing_key_id, signing_key = self.key_resolver.get_signing_key(key_id)
         issued_at = int(time.time() if now is None else now)
         expires_at = issued_at + ttl
         algorithm = key_algorithm(signing_key, version=self.signing_version)
-        signature = self.generate_mac(
-            value_json,
+        if timer is not None:
+            timer.algorithm = algorithm
+            timer.mark("resolve")
+
+        message = canonical_mac_payload(
+            signed_content,
             context,
             nonce,
-            signing_key,
             version=self.signing_version,
             key_id=signing_key_id,
             issuer=issuer,
             issued_at=issued_at,
             expires_at=expires_at,
-            kind=STRUCTURED_VALUE_KIND,
+            alg=algorithm,
+            kind=kind,
         )
+        if timer is not None:
+            if kind == STRUCTURED_VALUE_KIND:
+                timer.payload_bytes = len(message)
+            timer.mark("canonicalize")
+        signature = self.sign_message(message, signing_key)
+        if timer is not None:
+            timer.mark("sign")
         return {
             "version": self.signing_version,
             "nonce": nonce,
@@ -593,7 +1043,117 @@ class GuardBandCrypto:
         context: GuardBandContext,
         now: float | None = None,
     ) -> GuardBandResult:
-        """Verify a detached envelope for a JSON-compatible value."""
+        """Verify a detached envelope for a JSON-compatible value or :class:`PreparedValue`."""
+        observer = self.observer
+        if observer is None:
+            return self._verify_value(value, envelope, context, now, None)
+        return _observed(
+            observer,
+            "verify_value",
+            lambda timer: self._verify_value(value, envelope, context, now, timer),
+        )
+
+    def _verify_value(
+        self,
+        value: Any,
+        envelope: GuardBandResult,
+        context: GuardBandContext,
+        now: float | None,
+        timer: PhaseTimer | None,
+    ) -> GuardBandResult:
+        result = self._verify_detached(
+            lambda version: _canonical_value(value, version),
+            STRUCTURED_VALUE_KIND,
+            envelope,
+            context,
+            now,
+            timer,
+        )
+        if result["valid"]:
+            result["value"] = value.value if isinstance(value, PreparedValue) else value
+        return result
+
+    def verify_bytes(
+        self,
+        data: bytes | bytearray | memoryview,
+        envelope: GuardBandResult,
+        context: GuardBandContext,
+        now: float | None = None,
+    ) -> GuardBandResult:
+        """Verify a detached envelope from :meth:`sign_bytes` for raw bytes.
+
+        A valid result reports the bytes' ``content_sha256``.
+        """
+        return self._verify_hashed(lambda: _hash_bytes(data), envelope, context, now)
+
+    def verify_file(
+        self,
+        path: str | os.PathLike[str],
+        envelope: GuardBandResult,
+        context: GuardBandContext,
+        now: float | None = None,
+        *,
+        chunk_size: int = DEFAULT_READ_CHUNK_BYTES,
+    ) -> GuardBandResult:
+        """Verify a file's bytes like :meth:`verify_bytes`, hashing it in place.
+
+        The envelope is checked and its key resolved before the file is
+        read, so a malformed or unknown envelope costs no hashing. Raises
+        :class:`OSError` when the file cannot be read.
+        """
+        return self._verify_hashed(lambda: _hash_file(path, chunk_size), envelope, context, now)
+
+    def verify_stream(
+        self,
+        stream: IO[bytes],
+        envelope: GuardBandResult,
+        context: GuardBandContext,
+        now: float | None = None,
+        *,
+        chunk_size: int = DEFAULT_READ_CHUNK_BYTES,
+    ) -> GuardBandResult:
+        """Verify the rest of a binary stream like :meth:`verify_bytes`.
+
+        The stream is only read once the envelope has been checked.
+        """
+        return self._verify_hashed(lambda: _hash_stream(stream, chunk_size), envelope, context, now)
+
+    def _verify_hashed(
+        self,
+        hash_content: Callable[[], tuple[str, int]],
+        envelope: GuardBandResult,
+        context: GuardBandContext,
+        now: float | None,
+    ) -> GuardBandResult:
+        def verify(timer: PhaseTimer | None) -> GuardBandResult:
+            def digest(_version: str) -> str:
+                content_digest, size = hash_content()
+                if timer is not None:
+                    timer.payload_bytes = size
+                    timer.mark("hash")
+                return content_digest
+
+            return self._verify_detached(digest, BYTES_VALUE_KIND, envelope, context, now, timer)
+
+        observer = self.observer
+        if observer is None:
+            return verify(None)
+        return _observed(observer, "verify_bytes", verify)
+
+    def _verify_detached(
+        self,
+        signed_content: Callable[[str], str],
+        kind: str,
+        envelope: GuardBandResult,
+        context: GuardBandContext,
+        now: float | None,
+        timer: PhaseTimer | None,
+    ) -> GuardBandResult:
+        """Verify ``envelope`` over what ``signed_content`` returns for its version.
+
+        ``signed_content`` runs only once the envelope is well formed and its
+        key resolved.
+        """
         try:
             expected_fields = {
                 "version",
@@ -619,6 +1179,8 @@ class GuardBandCrypto:
 
             if not isinstance(version, str) or version not in SUPPORTED_PROTOCOL_VERSIONS:
                 return {"valid": False, "error": f"Unsupported guard band version: {version}"}
+            if kind not in DETACHED_KINDS[version]:
+                return {"valid": False, "error": f"Unsupported envelope kind: {kind}"}
             if not isinstance(nonce, str) or not NONCE_PATTERN.fullmatch(nonce):
                 return {"valid": False, "error": "Invalid nonce format"}
             if type(issued_at) is not int or type(expires_at) is not int:
@@ -631,6 +1193,8 @@ class GuardBandCrypto:
                 return {"valid": False, "error": "Invalid issuer format"}
             if not isinstance(signature, str):
                 return {"valid": False, "error": "Invalid signature format"}
+            if timer is not None:
+                timer.mark("parse")
 
             verification_key = self.key_resolver.get_verification_key(key_id)
             if verification_key is None:
@@ -643,24 +1207,36 @@ class GuardBandCrypto:
             )
             if signature_error:
                 return {"valid": False, "error": signature_error}
+            if timer is not None:
+                timer.algorithm = expected_algorithm
+                timer.mark("resolve")
 
-            value_json = _canonical_json_for_version(value, version)
-            if not self.verify_mac(
-                value_json,
+            content = signed_content(version)
+            message = canonical_mac_payload(
+                content,
                 context,
                 nonce,
-                signature,
-                verification_key,
                 version=version,
                 key_id=key_id,
                 issuer=issuer,
                 issued_at=issued_at,
                 expires_at=expires_at,
-                kind=STRUCTURED_VALUE_KIND,
-            ):
+                alg=expected_algorithm,
+                kind=kind,
+            )
+            if timer is not None:
+                if kind == STRUCTURED_VALUE_KIND:
+                    timer.payload_bytes = len(message)
+                timer.mark("canonicalize")
+            verified = self.verify_message(message, signature, verification_key)
+            if timer is not None:
+                timer.mark("verify")
+            if not verified:
                 return {"valid": False, "error": "Signature verification failed"}
 
             current_time = int(time.time() if now is None else now)
+            if timer is not None:
+                timer.mark("freshness")
             if current_time > expires_at:
                 return {
                     "valid": False,
@@ -669,9 +1245,8 @@ class GuardBandCrypto:
                     "key_id": key_id,
                 }
 
-            return {
+            result: GuardBandResult = {
                 "valid": True,
-                "value": value,
                 "nonce": nonce,
                 "key_id": key_id,
                 "version": version,
@@ -680,6 +1255,9 @@ class GuardBandCrypto:
                 "expires_at": expires_at,
                 "algorithm": algorithm,
             }
+            if kind == BYTES_VALUE_KIND:
+                result["content_sha256"] = content
+            return result
         except (TypeError, ValueError, RecursionError) as exc:
             return {"valid": False, "error": f"Value verification error: {exc}"}
 
@@ -691,10 +1269,45 @@ class GuardBandCrypto:
         issuer: str | None = None,
         ttl_seconds: int | None = None,
         now: float | None = None,
+        *,
+        kind: str = TEXT_KIND,
+        content_digest: str | None = None,
+    ) -> GuardBandResult:
+        """Wrap content and return the band plus its authenticated metadata.
+
+        With ``kind=DIGEST_TEXT_KIND`` the signature covers the content's
+        SHA-256 instead of the content; pass ``content_digest`` to reuse a
+        digest the caller already computed rather than hashing again.
+        """
+        observer = self.observer
+        if observer is None:
+            return self._wrap_with_metadata(
+                content, context, key_id, issuer, ttl_seconds, now, None, kind, content_digest
+            )
+        return _observed(
+            observer,
+            "wrap",
+            lambda timer: self._wrap_with_metadata(
+                content, context, key_id, issuer, ttl_seconds, now, timer, kind, content_digest
+            ),
+        )
+
+    def _wrap_with_metadata(
+        self,
+        content: str,
+        context: GuardBandContext,
+        key_id: str | None,
+        issuer: str | None,
+        ttl_seconds: int | None,
+        now: float | None,
+        timer: PhaseTimer | None,
+        kind: str = TEXT_KIND,
+        content_digest: str | None = None,
     ) -> GuardBandResult:
-        """Wrap content and return the band plus its authenticated metadata."""
         if RESERVED_START_MARKER in content or RESERVED_END_MARKER in content:
             raise ValueError("Content contains reserved Guard Band markers")
+        _check_band_kind(kind, self.signing_version)
+        signed_content = _signed_content(content, kind, content_digest)
 
         issuer = issuer or DEFAULT_ISSUER
         if len(issuer.encode("utf-8")) > 256:
@@ -703,38 +1316,58 @@ class GuardBandCrypto:
         ttl = DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
         if ttl < 0:
             raise ValueError("ttl_seconds must not be negative")
+        if timer is not None:
+            timer.mark("parse")
 
         nonce = self.generate_nonce()
         signing_key_id, signing_key = self.key_resolver.get_signing_key(key_id)
         issued_at = int(time.time() if now is None else now)
         expires_at = issued_at + ttl
+        algorithm = key_algorithm(signing_key, version=self.signing_version)
+        if timer is not None:
+            timer.algorithm = algorithm
+            timer.mark("resolve")
 
-        mac = self.generate_mac(
-            content,
+        message = canonical_mac_payload(
+            signed_content,
             context,
             nonce,
-            signing_key,
             version=self.signing_version,
             key_id=signing_key_id,
             issuer=issuer,
             issued_at=issued_at,
             expires_at=expires_at,
+            alg=algorithm,
+            kind=kind,
         )
-
-        wrapped = (
-            f"⟪INERT:START:v:{self.signing_version}"
-            f":r:{nonce}:iat:{issued_at}:exp:{expires_at}⟫\n"
-            f"{content}\n"
-            f"⟪INERT:END:mac:{mac}:kid:{signing_key_id}:iss:{_encode_issuer(issuer)}⟫"
-        )
-        return {
-            "wrapped": wrapped,
+        if timer is not None:
+            timer.payload_bytes = len(message)
+            timer.mark("canonicalize")
+        mac = self.sign_message(message, signing_key)
+        if timer is not None:
+            timer.mark("sign")
+
+        result: GuardBandResult = {
+            "wrapped": _format_band(
+                content,
+                mac,
+                version=self.signing_version,
+                nonce=nonce,
+                key_id=signing_key_id,
+                issuer=issuer,
+                issued_at=issued_at,
+                expires_at=expires_at,
+                kind=kind,
+            ),
             "nonce": nonce,
             "key_id": signing_key_id,
             "issuer": issuer,
             "issued_at": issued_at,
             "expires_at": expires_at,
         }
+        if kind != TEXT_KIND:
+            result["content_sha256"] = signed_content
+        return result
 
     def wrap_content(
         self,
@@ -744,6 +1377,9 @@ class GuardBandCrypto:
         issuer: str | None = None,
         ttl_seconds: int | None = None,
         now: float | None = None,
+        *,
+        kind: str = TEXT_KIND,
+        content_digest: str | None = None,
     ) -> str:
         """Wrap content with guard bands and return the band string."""
         metadata = self.wrap_with_metadata(
@@ -753,9 +1389,102 @@ class GuardBandCrypto:
             issuer=issuer,
             ttl_seconds=ttl_seconds,
             now=now,
+            kind=kind,
+            content_digest=content_digest,
         )
         return cast(str, metadata["wrapped"])
 
+    def stream_wrap(
+        self,
+        context: GuardBandContext,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        now: float | None = None,
+        *,
+        kind: str = TEXT_KIND,
+    ) -> "GuardBandStreamSigner":
+        """Start one band whose content arrives in pieces.
+
+        Emit :meth:`GuardBandStreamSigner.start`, pass every piece of content
+        through :meth:`~GuardBandStreamSigner.update`, then emit
+        :meth:`~GuardBandStreamSigner.finish`. The concatenation is exactly
+        the band :meth:`wrap_content` would produce for the joined content,
+        but the content is never held in memory. A text band streams only
+        under an HMAC key, since an Ed25519 signature needs the whole message
+        at once; a ``DIGEST_TEXT_KIND`` band streams under any key, because
+        only the content's hash is fed incrementally.
+        """
+        _check_band_kind(kind, self.signing_version)
+        issuer = issuer or DEFAULT_ISSUER
+        if len(issuer.encode("utf-8")) > 256:
+            raise ValueError("Issuer must be at most 256 bytes")
+        ttl = DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        if ttl < 0:
+            raise ValueError("ttl_seconds must not be negative")
+
+        signing_key_id, signing_key = self.key_resolver.get_signing_key(key_id)
+        nonce = self.generate_nonce()
+        issued_at = int(time.time() if now is None else now)
+        expires_at = issued_at + ttl
+        version = self.signing_version
+        algorithm = key_algorithm(signing_key, version=version)
+        header = f"{_start_marker(version, kind, nonce, issued_at, expires_at)}\n"
+        trailer_params = f":kid:{signing_key_id}:iss:{_encode_issuer(issuer)}⟫"
+        metadata: GuardBandResult = {
+            "nonce": nonce,
+            "key_id": signing_key_id,
+            "issuer": issuer,
+            "issued_at": issued_at,
+            "expires_at": expires_at,
+        }
+
+        def payload(content: str) -> bytes:
+            return canonical_mac_payload(
+                content,
+                context,
+                nonce,
+                version=version,
+                key_id=signing_key_id,
+                issuer=issuer,
+                issued_at=issued_at,
+                expires_at=expires_at,
+                alg=algorithm,
+                kind=kind,
+            )
+
+        if kind != TEXT_KIND:
+            return GuardBandStreamSigner(
+                hashlib.sha256(),
+                lambda digest: self.sign_message(payload(digest.hexdigest()), signing_key),
+                escape=False,
+                header=header,
+                trailer_params=trailer_params,
+                metadata=metadata,
+            )
+        if not isinstance(signing_key, (bytes, bytearray)):
+            raise ValueError("Streaming text Guard Bands require an HMAC signing key")
+        if type(self).sign_message is not GuardBandCrypto.sign_message:
+            raise ValueError("Streaming text Guard Bands cannot use an overridden sign_message")
+        # The empty content serializes as '"content":""'; the streamed,
+        # escaped content goes between those two quotes.
+        message = payload("")
+        split = message.index(b',"content":"') + len(b',"content":"')
+        suffix = message[split:]
+
+        def seal(mac: "_StreamHash") -> str:
+            mac.update(suffix)
+            return base64.b64encode(mac.digest()).decode("utf-8")
+
+        return GuardBandStreamSigner(
+            hmac.new(signing_key, message[:split], hashlib.sha256),
+            seal,
+            escape=True,
+            header=header,
+            trailer_params=trailer_params,
+            metadata=metadata,
+        )
+
     def extract_and_verify(
         self,
         wrapped: str,
@@ -763,6 +1492,82 @@ class GuardBandCrypto:
         now: float | None = None,
     ) -> GuardBandResult:
         """Extract content and verify guard bands"""
+        observer = self.observer
+        if observer is None:
+            return self._extract_and_verify(wrapped, context, now, None)
+        return _observed(
+            observer,
+            "extract_and_verify",
+            lambda timer: self._extract_and_verify(wrapped, context, now, timer),
+        )
+
+    def extract_and_verify_many(
+        self,
+        wrapped_blocks: Iterable[str],
+        context: GuardBandContext,
+        now: float | None = None,
+    ) -> list[GuardBandResult]:
+        """Verify several bands bound to the same context.
+
+        Results are in input order and identical to calling
+        :meth:`extract_and_verify` on each band, but the context is
+        canonicalized once and each key id is resolved once for the batch.
+        """
+        return self.verifier(context).verify_many(wrapped_blocks, now)
+
+    def verifier(
+        self,
+        context: GuardBandContext,
+        *,
+        cache_size: int = 0,
+        index_field: str | None = None,
+    ) -> "GuardBandVerifier":
+        """Return a verifier that prepares ``context`` and its keys once.
+
+        Use it when many bands arrive over time against one context, such as
+        the messages of one WebSocket connection. ``cache_size`` keeps that
+        many recent results; see :class:`GuardBandVerifier`. With
+        ``index_field``, each band may be verified against its own index;
+        see :class:`GuardBandSigner`.
+        """
+        return GuardBandVerifier(self, context, cache_size=cache_size, index_field=index_field)
+
+    def signer(
+        self,
+        context: GuardBandContext,
+        *,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        index_field: str | None = None,
+        kind: str = TEXT_KIND,
+    ) -> "GuardBandSigner":
+        """Return a signer that resolves its key and prepares ``context`` once.
+
+        Use it to wrap many pieces of content against one context, such as
+        the text blocks of one tool result. Every band it makes is of
+        ``kind``.
+        """
+        return GuardBandSigner(
+            self,
+            context,
+            key_id=key_id,
+            issuer=issuer,
+            ttl_seconds=ttl_seconds,
+            index_field=index_field,
+            kind=kind,
+        )
+
+    def _extract_and_verify(
+        self,
+        wrapped: str,
+        context: GuardBandContext,
+        now: float | None,
+        timer: PhaseTimer | None,
+        prepared: _PreparedContext | None = None,
+        keys: dict[str, GuardBandKey | None] | None = None,
+        index: int | None = None,
+    ) -> GuardBandResult:
         try:
             if "⟪INERT:START" not in wrapped:
                 return {"valid": False, "error": "Missing start marker"}
@@ -777,43 +1582,79 @@ class GuardBandCrypto:
 
             content = parsed["content"]
             version = parsed["version"]
+            kind = parsed["kind"]
             nonce = parsed["nonce"]
             issued_at = parsed["issued_at"]
             expires_at = parsed["expires_at"]
             key_id = parsed["key_id"]
             issuer = parsed["issuer"]
             provided_mac = parsed["provided_mac"]
-
-            verification_key = self.key_resolver.get_verification_key(key_id)
+            if timer is not None:
+                timer.mark("parse")
+
+            if keys is None:
+                verification_key = self.key_resolver.get_verification_key(key_id)
+            elif key_id in keys:
+                verification_key = keys[key_id]
+            else:
+                verification_key = keys[key_id] = self.key_resolver.get_verification_key(key_id)
             if verification_key is None:
                 return {"valid": False, "error": f"Unknown key id: {key_id}"}
 
-            expected_length = _SIGNATURE_LENGTHS[key_algorithm(verification_key, version=version)]
-            mac_error = _decode_base64_field(provided_mac, expected_length, "MAC")
+            algorithm = key_algorithm(verification_key, version=version)
+            mac_error = _decode_base64_field(provided_mac, _SIGNATURE_LENGTHS[algorithm], "MAC")
             if mac_error:
                 return {"valid": False, "error": mac_error}
+            if timer is not None:
+                timer.algorithm = algorithm
+                timer.mark("resolve")
 
             # Verify the signature — the sole integrity and authenticity check.
             # It binds content, context, nonce, version, key id, issuer,
             # lifetime, and the algorithm tag (derived from the key type, so
-            # cross-algorithm confusion fails closed).
-            if not self.verify_mac(
-                content,
-                context,
-                nonce,
-                provided_mac,
-                verification_key,
-                version=version,
-                key_id=key_id,
-                issuer=issuer,
-                issued_at=issued_at,
-                expires_at=expires_at,
-            ):
+            # cross-algorithm confusion fails closed). A digest band binds the
+            # content's SHA-256 and its kind in place of the content.
+            signed_content = content if kind == TEXT_KIND else content_sha256(content)
+            if prepared is None:
+                message = canonical_mac_payload(
+                    signed_content,
+                    context,
+                    nonce,
+                    version=version,
+                    key_id=key_id,
+                    issuer=issuer,
+                    issued_at=issued_at,
+                    expires_at=expires_at,
+                    alg=algorithm,
+                    kind=kind,
+                )
+            else:
+                message = prepared.mac_payload(
+                    signed_content,
+                    nonce,
+                    version=version,
+                    key_id=key_id,
+                    issuer=issuer,
+                    issued_at=issued_at,
+                    expires_at=expires_at,
+                    alg=algorithm,
+                    index=index,
+                    kind=kind,
+                )
+            if timer is not None:
+                timer.payload_bytes = len(message)
+                timer.mark("canonicalize")
+            verified = self.verify_message(message, provided_mac, verification_key)
+            if timer is not None:
+                timer.mark("verify")
+            if not verified:
                 return {"valid": False, "error": "MAC verification failed"}
 
             # Freshness is enforced only after the MAC proves iat/exp authentic,
             # so a tampered expiry cannot extend a band's lifetime (fail closed).
             current_time = int(time.time() if now is None else now)
+            if timer is not None:
+                timer.mark("freshness")
             if current_time > expires_at:
                 return {
                     "valid": False,
@@ -822,7 +1663,7 @@ class GuardBandCrypto:
                     "key_id": key_id,
                 }
 
-            return {
+            result: GuardBandResult = {
                 "valid": True,
                 "content": content,
                 "nonce": nonce,
@@ -832,6 +1673,373 @@ class GuardBandCrypto:
                 "issued_at": issued_at,
                 "expires_at": expires_at,
             }
+            if kind != TEXT_KIND:
+                result["content_sha256"] = signed_content
+            return result
 
         except Exception as e:
             return {"valid": False, "error": f"Parse error: {str(e)}"}
+
+
+class GuardBandVerifier:
+    """Verify bands against one context, canonicalized once.
+
+    Each key id is resolved on first use and kept for the verifier's
+    lifetime, so a key revoked meanwhile stays usable until the verifier is
+    discarded. With ``cache_size`` the verifier also keeps an LRU of results
+    by band, and a repeated band costs a lookup instead of a parse and
+    signature check. Cached successes are checked for expiry again on every
+    hit, so caching never extends a band's lifetime.
+
+    With ``index_field``, :meth:`verify` accepts the index a band was signed
+    with by :meth:`GuardBandSigner.wrap`.
+    """
+
+    def __init__(
+        self,
+        crypto: GuardBandCrypto,
+        context: GuardBandContext,
+        *,
+        cache_size: int = 0,
+        index_field: str | None = None,
+    ) -> None:
+        if cache_size < 0:
+            raise ValueError("cache_size must not be negative")
+        self.crypto = crypto
+        self.context = context
+        self.cache_size = cache_size
+        self._prepared = _PreparedContext(context, index_field)
+        self._keys: dict[str, GuardBandKey | None] = {}
+        self._cache: OrderedDict[tuple[str, int | None], GuardBandResult] = OrderedDict()
+
+    def verify(
+        self, wrapped: str, now: float | None = None, *, index: int | None = None
+    ) -> GuardBandResult:
+        """Return what :meth:`GuardBandCrypto.extract_and_verify` would."""
+        self._prepared.check_index(index)
+        observer = self.crypto.observer
+        if observer is None:
+            return self._verify(wrapped, now, index, None)
+        return _observed(
+            observer,
+            "extract_and_verify",
+            lambda timer: self._verify(wrapped, now, index, timer),
+        )
+
+    def verify_many(
+        self,
+        wrapped_blocks: Iterable[str],
+        now: float | None = None,
+        *,
+        indexes: Iterable[int] | None = None,
+    ) -> list[GuardBandResult]:
+        if indexes is None:
+            return [self.verify(wrapped, now) for wrapped in wrapped_blocks]
+        return [
+            self.verify(wrapped, now, index=index)
+            for wrapped, index in zip(wrapped_blocks, indexes, strict=True)
+        ]
+
+    def _verify(
+        self, wrapped: str, now: float | None, index: int | None, timer: PhaseTimer | None
+    ) -> GuardBandResult:
+        if not self.cache_size:
+            return self.crypto._extract_and_verify(
+                wrapped, self.context, now, timer, self._prepared, self._keys, index
+            )
+        key = (wrapped, index)
+        cached = self._cache.get(key)
+        if cached is None:
+            cached = self.crypto._extract_and_verify(
+                wrapped, self.context, now, timer, self._prepared, self._keys, index
+            )
+            self._cache[key] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return dict(cached)
+        self._cache.move_to_end(key)
+        if cached.get("valid") and int(time.time() if now is None else now) > cached["expires_at"]:
+            return {
+                "valid": False,
+                "error": "Guard band expired",
+                "nonce": cached["nonce"],
+                "key_id": cached["key_id"],
+            }
+        return dict(cached)
+
+
+class GuardBandSigner:
+    """Wrap content against one context, with the signing key resolved once.
+
+    Bands are exactly what :meth:`GuardBandCrypto.wrap_content` would return
+    for the same context and settings. With ``index_field``, :meth:`wrap`
+    accepts an index and the band is bound to ``{**context, index_field:
+    index}``, while the rest of the context is still canonicalized only once.
+    A signer may be shared across threads.
+    """
+
+    def __init__(
+        self,
+        crypto: GuardBandCrypto,
+        context: GuardBandContext,
+        *,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        index_field: str | None = None,
+        kind: str = TEXT_KIND,
+    ) -> None:
+        _check_band_kind(kind, crypto.signing_version)
+        issuer = issuer or DEFAULT_ISSUER
+        if len(issuer.encode("utf-8")) > 256:
+            raise ValueError("Issuer must be at most 256 bytes")
+        ttl = DEFAULT_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        if ttl < 0:
+            raise ValueError("ttl_seconds must not be negative")
+        self.crypto = crypto
+        self.context = context
+        self.issuer = issuer
+        self.ttl_seconds = ttl
+        self.kind = kind
+        self.key_id, self._key = crypto.key_resolver.get_signing_key(key_id)
+        self.algorithm = key_algorithm(self._key, version=crypto.signing_version)
+        self._prepared = _PreparedContext(context, index_field)
+
+    def wrap(
+        self,
+        content: str,
+        now: float | None = None,
+        *,
+        index: int | None = None,
+        content_digest: str | None = None,
+    ) -> str:
+        """Wrap ``content`` and return the band string.
+
+        ``content_digest`` supplies a digest band's SHA-256 when the caller
+        already has it.
+        """
+        self._prepared.check_index(index)
+        observer = self.crypto.observer
+        if observer is None:
+            metadata = self._wrap(content, now, index, None, content_digest)
+        else:
+            metadata = _observed(
+                observer,
+                "wrap",
+                lambda timer: self._wrap(content, now, index, timer, content_digest),
+            )
+        return cast(str, metadata["wrapped"])
+
+    def wrap_many(
+        self,
+        contents: Iterable[str],
+        now: float | None = None,
+        *,
+        indexes: Iterable[int] | None = None,
+    ) -> list[str]:
+        if indexes is None:
+            return [self.wrap(content, now) for content in contents]
+        return [
+            self.wrap(content, now, index=index)
+            for content, index in zip(contents, indexes, strict=True)
+        ]
+
+    def _wrap(
+        self,
+        content: str,
+        now: float | None,
+        index: int | None,
+        timer: PhaseTimer | None,
+        content_digest: str | None = None,
+    ) -> GuardBandResult:
+        if RESERVED_START_MARKER in content or RESERVED_END_MARKER in content:
+            raise ValueError("Content contains reserved Guard Band markers")
+        signed_content = _signed_content(content, self.kind, content_digest)
+        if timer is not None:
+            timer.algorithm = self.algorithm
+            timer.mark("parse")
+
+        version = self.crypto.signing_version
+        nonce = self.crypto.generate_nonce()
+        issued_at = int(time.time() if now is None else now)
+        expires_at = issued_at + self.ttl_seconds
+        message = self._prepared.mac_payload(
+            signed_content,
+            nonce,
+            version=version,
+            key_id=self.key_id,
+            issuer=self.issuer,
+            issued_at=issued_at,
+            expires_at=expires_at,
+            alg=self.algorithm,
+            index=index,
+            kind=self.kind,
+        )
+        if timer is not None:
+            timer.payload_bytes = len(message)
+            timer.mark("canonicalize")
+        mac = self.crypto.sign_message(message, self._key)
+        if timer is not None:
+            timer.mark("sign")
+        result: GuardBandResult = {
+            "wrapped": _format_band(
+                content,
+                mac,
+                version=version,
+                nonce=nonce,
+                key_id=self.key_id,
+                issuer=self.issuer,
+                issued_at=issued_at,
+                expires_at=expires_at,
+                kind=self.kind,
+            ),
+            "nonce": nonce,
+            "key_id": self.key_id,
+            "issuer": self.issuer,
+            "issued_at": issued_at,
+            "expires_at": expires_at,
+        }
+        if self.kind != TEXT_KIND:
+            result["content_sha256"] = signed_content
+        return result
+
+
+class _StreamHash(Protocol):
+    def update(self, data: bytes, /) -> None: ...
+
+    def digest(self) -> bytes: ...
+
+    def hexdigest(self) -> str: ...
+
+
+class GuardBandStreamSigner:
+    """Incremental signing of one band's content; see :meth:`GuardBandCrypto.stream_wrap`.
+
+    Both canonical JSON forms escape a string the same way whether it is
+    serialized whole or piece by piece, so for a text band each piece is
+    escaped on its own and fed to the MAC between the payload's fixed prefix
+    and suffix. For a digest band the raw UTF-8 pieces feed a SHA-256, and
+    the payload is signed once at :meth:`finish`.
+    """
+
+    # A marker split across two pieces is caught by keeping this many
+    # trailing characters of the previous piece.
+    _CARRY = max(len(RESERVED_START_MARKER), len(RESERVED_END_MARKER)) - 1
+
+    def __init__(
+        self,
+        content_hash: _StreamHash,
+        seal: Callable[[_StreamHash], str],
+        *,
+        escape: bool,
+        header: str,
+        trailer_params: str,
+        metadata: GuardBandResult,
+    ) -> None:
+        self._hash = content_hash
+        self._seal = seal
+        self._escape = escape
+        self._header = header
+        self._trailer_params = trailer_params
+        self._tail = ""
+        self._finished = False
+        self.metadata = metadata
+
+    def start(self) -> str:
+        """Return the START marker line that opens the band."""
+        return self._header
+
+    def update(self, piece: str) -> str:
+        """Authenticate the next piece of content and return it unchanged.
+
+        Raises :class:`ValueError` when the content so far contains a
+        reserved marker; the band must then be abandoned, never finished.
+        """
+        if self._finished:
+            raise ValueError("Guard Band stream is already finished")
+        if not piece:
+            return piece
+        window = self._tail + piece
+        if RESERVED_START_MARKER in window or RESERVED_END_MARKER in window:
+            self._finished = True
+            raise ValueError("Content contains reserved Guard Band markers")
+        self._tail = window[-self._CARRY :]
+        if self._escape:
+            piece_bytes = json.dumps(piece, ensure_ascii=False)[1:-1].encode("utf-8")
+        else:
+            piece_bytes = piece.encode("utf-8")
+        self._hash.update(piece_bytes)
+        return piece
+
+    def finish(self) -> str:
+        """Return the END marker line that closes and authenticates the band."""
+        if self._finished:
+            raise ValueError("Guard Band stream is already finished")
+        self._finished = True
+        mac = self._seal(self._hash)
+        return f"\n⟪INERT:END:mac:{mac}{self._trailer_params}"
+
+
+def _format_band(
+    content: str,
+    mac: str,
+    *,
+    version: str,
+    nonce: str,
+    key_id: str,
+    issuer: str,
+    issued_at: int,
+    expires_at: int,
+    kind: str = TEXT_KIND,
+) -> str:
+    return (
+        f"{_start_marker(version, kind, nonce, issued_at, expires_at)}\n"
+        f"{content}\n"
+        f"⟪INERT:END:mac:{mac}:kid:{key_id}:iss:{_encode_issuer(issuer)}⟫"
+    )
+
+
+def _start_marker(version: str, kind: str, nonce: str, issued_at: int, expires_at: int) -> str:
+    kind_param = "" if kind == TEXT_KIND else f":k:{kind}"
+    return f"⟪INERT:START:v:{version}{kind_param}:r:{nonce}:iat:{issued_at}:exp:{expires_at}⟫"
+
+
+def _sign_message(message: bytes, secret_key: GuardBandKey) -> str:
+    if isinstance(secret_key, Ed25519PublicKey):
+        raise ValueError("Ed25519 public key is verification-only and cannot sign")
+    if isinstance(secret_key, Ed25519PrivateKey):
+        signature = secret_key.sign(message)
+    else:
+        signature = hmac.new(secret_key, message, hashlib.sha256).digest()
+    return base64.b64encode(signature).decode("utf-8")
+
+
+def _verify_message(message: bytes, provided_mac: str, secret_key: GuardBandKey) -> bool:
+    if isinstance(secret_key, (Ed25519PrivateKey, Ed25519PublicKey)):
+        public_key = (
+            secret_key.public_key() if isinstance(secret_key, Ed25519PrivateKey) else secret_key
+        )
+        try:
+            public_key.verify(base64.b64decode(provided_mac), message)
+            return True
+        except (InvalidSignature, ValueError):
+            return False
+    return hmac.compare_digest(_sign_message(message, secret_key), provided_mac)
+
+
+def _observed(
+    observer: GuardBandObserver,
+    operation: str,
+    run: Callable[[PhaseTimer], GuardBandResult],
+) -> GuardBandResult:
+    timer = PhaseTimer()
+    try:
+        result = run(timer)
+    except Exception:
+        observer.observe(timer.finish(operation, False))
+        raise
+    if "valid" in result:
+        observer.observe(timer.finish_result(operation, result))
+    else:
+        observer.observe(timer.finish(operation, True))
+    return result
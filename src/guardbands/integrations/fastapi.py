@@ -1,84 +1,551 @@
+import codecs
 import json
-from collections.abc import Iterable
-from typing import Any
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
 
-from starlette.datastructures import Headers
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.requests import Request
 from starlette.responses import JSONResponse
 from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from ..crypto import GuardBandCrypto
-from ..replay import ReplayLedger, apply_replay_protection
+from ..crypto import (
+    BAND_KINDS,
+    DEFAULT_TTL_SECONDS,
+    TEXT_KIND,
+    GuardBandContext,
+    GuardBandCrypto,
+    GuardBandStreamSigner,
+    GuardBandVerifier,
+    canonical_json_size,
+)
+from ..observability import GuardBandObserver, PhaseTimer
+from ..replay import (
+    NonceReplayLedger,
+    ReplayLedger,
+    apply_replay_protection,
+    apply_replay_protection_many,
+)
 
 DEFAULT_MAX_BODY_BYTES = 50_000
+# Rejected requests with at most this much unread body are drained so the
+# connection can be reused; larger ones are answered with Connection: close.
+DEFAULT_MAX_DRAIN_BYTES = 65_536
+# Responses are only buffered when fields are signed or the key cannot stream.
+DEFAULT_MAX_RESPONSE_BYTES = 1_000_000
+DEFAULT_MAX_CONTEXT_BYTES = 4_096
+SIGNED_CONTENT_TYPE_HEADER = "x-guard-band-content-type"
+# json.loads raises RecursionError on nesting that fits well inside any body
+# limit, and UnicodeDecodeError, a ValueError, on bytes that are not UTF-8.
+_JSON_ERRORS = (ValueError, RecursionError)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+PolicyT = TypeVar("PolicyT")
+
+
+@dataclass(frozen=True, slots=True)
+class GuardBandRoute:
+    """A guarded path and the verification policy that applies to it.
+
+    ``path`` is an exact path (``/tool-input``), a template with ``{name}`` or
+    ``{name:int}`` segments (``/docs/{doc_id}/summarize``), or a prefix whose
+    last segment is ``*`` or ``{name:path}`` (``/admin/*``). Fields left as
+    ``None`` fall back to the middleware-wide settings.
+
+    ``wrapped_fields`` switches the route to multi-band verification: each
+    entry is a JSON Pointer whose ``*`` tokens match every array item or
+    object member, such as ``/documents/*/wrapped``.
+    """
+
+    path: str
+    wrapped_content_field: str | None = None
+    context_field: str | None = None
+    max_body_bytes: int | None = None
+    replay_ledger: ReplayLedger | None = None
+    wrapped_fields: tuple[str, ...] | None = None
+
+    def __post_init__(self) -> None:
+        if not self.path.startswith("/"):
+            raise ValueError("Route paths must start with /")
+        if self.wrapped_fields is not None:
+            object.__setattr__(self, "wrapped_fields", tuple(self.wrapped_fields))
+        if self.max_body_bytes is not None and self.max_body_bytes <= 0:
+            raise ValueError("Body size limits must be positive")
+
+
+@dataclass(frozen=True, slots=True)
+class GuardBandResponseRoute:
+    """A signed path and how its responses are signed.
+
+    ``path`` accepts the same templates and prefixes as
+    :class:`GuardBandRoute`. Fields left as ``None`` fall back to the
+    middleware-wide settings.
+    """
+
+    path: str
+    wrapped_fields: tuple[str, ...] | None = None
+    detached: bool | None = None
+    max_body_bytes: int | None = None
+
+    def __post_init__(self) -> None:
+        if not self.path.startswith("/"):
+            raise ValueError("Route paths must start with /")
+        if self.wrapped_fields is not None:
+            object.__setattr__(self, "wrapped_fields", tuple(self.wrapped_fields))
+        if self.max_body_bytes is not None and self.max_body_bytes <= 0:
+            raise ValueError("Body size limits must be positive")
+
+
+@dataclass(frozen=True, slots=True)
+class GuardBandWebSocketPolicy:
+    """How WebSocket connections on guarded paths are verified.
+
+    The context comes from ``context_resolver`` once per connection (by
+    default :func:`default_websocket_context`); a ``context`` field inside a
+    message is ignored. Each connection gets a :class:`GuardBandVerifier`
+    with ``cache_size`` cached results and, unless the route has a shared
+    replay ledger, an in-memory ledger holding nonces for
+    ``replay_ttl_seconds`` (``None`` disables it).
+
+    An invalid message is dropped and, with ``send_errors``, answered with a
+    ``{"type": "guard_band_error", "detail": ...}`` frame. The connection
+    stays open unless ``close_on_invalid`` is set, in which case it is
+    closed with ``close_code``.
+    """
+
+    context_resolver: Callable[[Scope], GuardBandContext] | None = None
+    cache_size: int = 128
+    replay_ttl_seconds: int | None = DEFAULT_TTL_SECONDS
+    send_errors: bool = True
+    close_on_invalid: bool = False
+    close_code: int = 1008
+
+    def __post_init__(self) -> None:
+        if self.cache_size < 0:
+            raise ValueError("cache_size must not be negative")
+        if self.replay_ttl_seconds is not None and self.replay_ttl_seconds <= 0:
+            raise ValueError("replay_ttl_seconds must be positive")
+
+
+@dataclass(frozen=True, slots=True)
+class _RoutePolicy:
+    path: str
+    wrapped_content_field: str
+    context_field: str
+    max_body_bytes: int
+    replay_ledger: ReplayLedger | None
+    selectors: tuple[tuple[str, ...], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class _ResponsePolicy:
+    selectors: tuple[tuple[str, ...], ...]
+    detached: bool
+    max_body_bytes: int
+
+
+def _compile_selector(selector: str) -> tuple[str, ...]:
+    if not selector.startswith("/"):
+        raise ValueError(f"Field selectors must be JSON Pointers: {selector}")
+    return tuple(token.replace("~1", "/").replace("~0", "~") for token in selector[1:].split("/"))
+
+
+def _escape_pointer(token: str) -> str:
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def _assign(value: Any, pointer: str, replacement: Any) -> None:
+    """Replace the value at a concrete pointer produced by :func:`_select`."""
+    *parents, last = _compile_selector(pointer)
+    for token in parents:
+        value = value[int(token)] if isinstance(value, list) else value[token]
+    value[int(last) if isinstance(value, list) else last] = replacement
+
+
+def _select(value: Any, tokens: tuple[str, ...], pointer: str, found: dict[str, Any]) -> None:
+    """Collect every location matching ``tokens`` into ``found`` by pointer."""
+    if not tokens:
+        found.setdefault(pointer, value)
+        return
+    token, rest = tokens[0], tokens[1:]
+    if isinstance(value, dict):
+        if token == "*":
+            members = list(value.items())
+        else:
+            members = [(token, value[token])] if token in value else []
+    elif isinstance(value, list):
+        if token == "*":
+            members = [(str(index), item) for index, item in enumerate(value)]
+        elif token.isdigit() and str(int(token)) == token and int(token) < len(value):
+            members = [(token, value[int(token)])]
+        else:
+            members = []
+    else:
+        return
+    for key, child in members:
+        _select(child, rest, f"{pointer}/{_escape_pointer(key)}", found)
+
+
+class _RouteNode(Generic[PolicyT]):
+    __slots__ = ("integer", "parameter", "policy", "prefix", "static")
+
+    def __init__(self) -> None:
+        self.static: dict[str, _RouteNode[PolicyT]] = {}
+        self.integer: _RouteNode[PolicyT] | None = None
+        self.parameter: _RouteNode[PolicyT] | None = None
+        self.policy: PolicyT | None = None
+        self.prefix: PolicyT | None = None
+
+
+class _RouteMatcher(Generic[PolicyT]):
+    """Segment trie over route templates.
+
+    Literal segments take precedence over ``{name:int}``, then ``{name}``,
+    then prefixes; a more specific branch that dead-ends falls back to the
+    next candidate. A lookup therefore follows one node per path segment
+    when nothing dead-ends, and backtracking visits each trie node at most
+    once, so its cost is bounded by the size of the trie rather than by a
+    scan of every route.
+    """
+
+    def __init__(self) -> None:
+        self._root: _RouteNode[PolicyT] = _RouteNode()
+
+    def add(self, path: str, policy: PolicyT) -> None:
+        segments = path.split("/")[1:]
+        node = self._root
+        for index, segment in enumerate(segments):
+            if segment == "*" or (segment.startswith("{") and segment.endswith(":path}")):
+                if index != len(segments) - 1:
+                    raise ValueError(f"Path wildcards must be the last segment: {path}")
+                if node.prefix is not None:
+                    raise ValueError(f"Duplicate guarded route: {path}")
+                node.prefix = policy
+                return
+            if segment.startswith("{") and segment.endswith("}"):
+                name, _, converter = segment[1:-1].partition(":")
+                if not name or converter not in {"", "str", "int"}:
+                    raise ValueError(f"Unsupported path parameter: {segment}")
+                if converter == "int":
+                    node.integer = node = node.integer or _RouteNode()
+                else:
+                    node.parameter = node = node.parameter or _RouteNode()
+            else:
+                node = node.static.setdefault(segment, _RouteNode())
+        if node.policy is not None:
+            raise ValueError(f"Duplicate guarded route: {path}")
+        node.policy = policy
+
+    def match(self, path: str) -> PolicyT | None:
+        return self._match(self._root, path.split("/"), 1)
+
+    def _match(self, node: _RouteNode[PolicyT], segments: list[str], index: int) -> PolicyT | None:
+        if index == len(segments):
+            return node.policy
+        segment = segments[index]
+        child = node.static.get(segment)
+        if child is not None:
+            found = self._match(child, segments, index + 1)
+            if found is not None:
+                return found
+        if segment:
+            # Like Starlette's int converter, accept ASCII digits only.
+            if node.integer is not None and segment.isascii() and segment.isdigit():
+                found = self._match(node.integer, segments, index + 1)
+                if found is not None:
+                    return found
+            if node.parameter is not None:
+                found = self._match(node.parameter, segments, index + 1)
+                if found is not None:
+                    return found
+        return node.prefix
 
 
 class GuardBandVerificationMiddleware:
-    """Verify Guard Band request bodies before FastAPI route handlers run."""
+    """Verify Guard Band request bodies before FastAPI route handlers run.
+
+    WebSocket connections to guarded paths are verified message by message
+    according to ``websocket_policy``; see :class:`GuardBandWebSocketPolicy`.
+
+    With ``publish_payload=True`` the parsed JSON body is also stored on
+    ``request.state``, so routes that read it through
+    :func:`guard_band_payload` or :func:`guard_band_body` skip a second parse.
+
+    ``required_paths`` accepts exact paths, path templates, and prefixes, as
+    strings or as :class:`GuardBandRoute` entries carrying per-route field
+    names, body limits, and replay ledgers.
+
+    The ``content-type`` and ``content-length`` headers are checked before any
+    body is read, so non-JSON and declared-oversized requests are rejected
+    without buffering.
+    """
 
     def __init__(
         self,
         app: ASGIApp,
         crypto: GuardBandCrypto,
-        required_paths: Iterable[str],
+        required_paths: Iterable[str | GuardBandRoute],
         methods: Iterable[str] = ("POST", "PUT", "PATCH"),
         wrapped_content_field: str = "wrapped_content",
         context_field: str = "context",
         replay_ledger: ReplayLedger | None = None,
         max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+        observer: GuardBandObserver | None = None,
+        publish_payload: bool = False,
+        wrapped_fields: Iterable[str] = (),
+        max_drain_bytes: int = DEFAULT_MAX_DRAIN_BYTES,
+        websocket_policy: GuardBandWebSocketPolicy | None = None,
     ) -> None:
+        if max_body_bytes <= 0:
+            raise ValueError("Body size limits must be positive")
+        if max_drain_bytes < 0:
+            raise ValueError("max_drain_bytes must not be negative")
+        routes: dict[str, GuardBandRoute] = {}
+        for entry in required_paths:
+            route = entry if isinstance(entry, GuardBandRoute) else GuardBandRoute(entry)
+            if routes.setdefault(route.path, route) != route:
+                raise ValueError(f"Conflicting policies for guarded route: {route.path}")
         self.app = app
         self.crypto = crypto
-        self.required_paths = set(required_paths)
+        self.required_paths = set(routes)
         self.methods = {method.upper() for method in methods}
         self.wrapped_content_field = wrapped_content_field
         self.context_field = context_field
         self.replay_ledger = replay_ledger
         self.max_body_bytes = max_body_bytes
+        self.observer = observer
+        self.publish_payload = publish_payload
+        self.max_drain_bytes = max_drain_bytes
+        self.wrapped_fields = tuple(wrapped_fields)
+        self.websocket_policy = websocket_policy or GuardBandWebSocketPolicy()
+        self._routes: _RouteMatcher[_RoutePolicy] = _RouteMatcher()
+        for route in routes.values():
+            self._routes.add(route.path, self._policy(route))
+
+    def _policy(self, route: GuardBandRoute) -> _RoutePolicy:
+        def pick(value: Any, default: Any) -> Any:
+            return default if value is None else value
+
+        return _RoutePolicy(
+            path=route.path,
+            wrapped_content_field=pick(route.wrapped_content_field, self.wrapped_content_field),
+            context_field=pick(route.context_field, self.context_field),
+            max_body_bytes=pick(route.max_body_bytes, self.max_body_bytes),
+            replay_ledger=pick(route.replay_ledger, self.replay_ledger),
+            selectors=tuple(
+                _compile_selector(selector)
+                for selector in pick(route.wrapped_fields, self.wrapped_fields)
+            ),
+        )
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        if not self._should_verify(scope):
+        if scope["type"] == "websocket":
+            websocket_route = self._routes.match(scope["path"])
+            if websocket_route is None:
+                await self.app(scope, receive, send)
+            else:
+                connection = _GuardedWebSocket(self, websocket_route, scope, receive, send)
+                await self.app(scope, connection.receive, send)
+            return
+
+        route = self._route_for(scope)
+        if route is None:
             await self.app(scope, receive, send)
             return
 
-        body, body_error = await self._read_body(receive)
+        timer = None if self.observer is None else PhaseTimer()
+        limit = route.max_body_bytes
+        header_error, declared_length = self._check_headers(scope, limit)
+        if header_error:
+            reusable = await self._drain(receive, declared_length, 0)
+            await self._reject(scope, send, header_error, timer, close=not reusable)
+            return
+
+        body, body_error, reusable = await self._read_body(receive, limit, declared_length)
+        if timer is not None:
+            timer.payload_bytes = len(body)
+            timer.mark("read_body")
         if body_error:
-            await self._reject(scope, send, body_error)
+            await self._reject(scope, send, body_error, timer, close=not reusable)
             return
 
-        payload, error = self._parse_json_body(scope, body)
+        payload, error = self._parse_json_body(body)
         if error:
-            await self._reject(scope, send, error)
+            await self._reject(scope, send, error, timer)
             return
 
-        wrapped_content = payload.get(self.wrapped_content_field)
-        context = payload.get(self.context_field, {})
+        if route.selectors:
+            await self._verify_fields(scope, send, body, payload, route, timer)
+            return
+
+        wrapped_content = payload.get(route.wrapped_content_field)
+        context = payload.get(route.context_field, {})
         if not isinstance(wrapped_content, str):
-            await self._reject(scope, send, f"Missing string field: {self.wrapped_content_field}")
+            await self._reject(
+                scope, send, f"Missing string field: {route.wrapped_content_field}", timer
+            )
             return
         if not isinstance(context, dict):
-            await self._reject(scope, send, f"Field must be an object: {self.context_field}")
+            await self._reject(
+                scope, send, f"Field must be an object: {route.context_field}", timer
+            )
             return
+        if timer is not None:
+            timer.mark("parse")
 
         result = self.crypto.extract_and_verify(wrapped_content, context)
-        result = apply_replay_protection(result, context, self.replay_ledger)
+        if timer is not None:
+            timer.mark("verify")
+        consumes_nonce = route.replay_ledger is not None and bool(result.get("valid"))
+        result = apply_replay_protection(result, context, route.replay_ledger)
+        if timer is not None:
+            if consumes_nonce:
+                timer.mark("ledger_consume")
+            timer.error = result.get("error")
         if not result.get("valid"):
             await self._reject(
-                scope, send, f"Guard Band verification failed: {result.get('error')}"
+                scope, send, f"Guard Band verification failed: {result.get('error')}", timer
             )
             return
 
-        scope.setdefault("state", {})["guard_band_verification"] = result
-        await self.app(scope, self._replay_body(body), send)
+        await self._accept(scope, send, body, payload, "guard_band_verification", result, timer)
+
+    async def _verify_fields(
+        self,
+        scope: Scope,
+        send: Send,
+        body: bytes,
+        payload: dict[str, Any],
+        route: _RoutePolicy,
+        timer: PhaseTimer | None,
+    ) -> None:
+        """Verify every band the route's selectors match, as one unit.
+
+        All bands share the request context, so they are verified with one
+        prepared context and key cache, and their nonces are consumed in a
+        single all-or-nothing batch. Any failure rejects the whole request.
+        """
+        context = payload.get(route.context_field, {})
+        if not isinstance(context, dict):
+            await self._reject(
+                scope, send, f"Field must be an object: {route.context_field}", timer
+            )
+            return
+        found: dict[str, Any] = {}
+        for tokens in route.selectors:
+            _select(payload, tokens, "", found)
+        if not found:
+            await self._reject(scope, send, "No Guard Band fields matched", timer)
+            return
+        for pointer, value in found.items():
+            if not isinstance(value, str):
+                await self._reject(scope, send, f"Field must be a string: {pointer}", timer)
+                return
+        if timer is not None:
+            timer.mark("parse")
+
+        pointers = list(found)
+        results = self.crypto.extract_and_verify_many(found.values(), context)
+        if timer is not None:
+            timer.mark("verify")
+        for pointer, result in zip(pointers, results, strict=True):
+            if not result.get("valid"):
+                if timer is not None:
+                    timer.error = result.get("error")
+                await self._reject(
+                    scope,
+                    send,
+                    f"Guard Band verification failed at {pointer}: {result.get('error')}",
+                    timer,
+                )
+                return
 
-    def _should_verify(self, scope: Scope) -> bool:
-        return (
-            scope["type"] == "http"
-            and scope["method"].upper() in self.methods
-            and scope["path"] in self.required_paths
+        results = apply_replay_protection_many(results, context, route.replay_ledger)
+        if timer is not None and route.replay_ledger is not None:
+            timer.mark("ledger_consume")
+        if not results[0].get("valid"):
+            if timer is not None:
+                timer.error = results[0].get("error")
+            await self._reject(
+                scope, send, f"Guard Band verification failed: {results[0].get('error')}", timer
+            )
+            return
+        verifications = dict(zip(pointers, results, strict=True))
+        await self._accept(
+            scope, send, body, payload, "guard_band_verifications", verifications, timer
         )
 
-    async def _read_body(self, receive: Receive) -> tuple[bytes, str | None]:
+    async def _accept(
+        self,
+        scope: Scope,
+        send: Send,
+        body: bytes,
+        payload: dict[str, Any],
+        state_key: str,
+        verification: Any,
+        timer: PhaseTimer | None,
+    ) -> None:
+        if timer is not None and self.observer is not None:
+            self.observer.observe(timer.finish("fastapi.request", True))
+        state = scope.setdefault("state", {})
+        state[state_key] = verification
+        if self.publish_payload:
+            state["guard_band_payload"] = payload
+        await self.app(scope, self._replay_body(body), send)
+
+    def _route_for(self, scope: Scope) -> _RoutePolicy | None:
+        if scope["type"] != "http" or scope["method"].upper() not in self.methods:
+            return None
+        return self._routes.match(scope["path"])
+
+    def _check_headers(self, scope: Scope, limit: int) -> tuple[str | None, int | None]:
+        """Validate request headers; also return the declared body length."""
+        headers = Headers(scope=scope)
+        declared = headers.get("content-length")
+        length = None
+        if declared is not None:
+            # str.isdigit also accepts non-ASCII digits such as "²".
+            if not (declared.isascii() and declared.isdigit()):
+                return "Invalid Content-Length header", None
+            length = int(declared)
+        if "application/json" not in headers.get("content-type", ""):
+            return "Guard Band verification requires application/json", length
+        if length is not None and length > limit:
+            return f"Request body exceeds {limit} bytes", length
+        return None, length
+
+    async def _drain(self, receive: Receive, declared_length: int | None, received: int) -> bool:
+        """Discard a rejected request's unread body when it is small enough.
+
+        ``received`` bytes were already read. Returns whether the whole body
+        was consumed, which lets the server keep the connection open.
+        """
+        if declared_length is not None and declared_length - received > self.max_drain_bytes:
+            return False
+        discarded = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return False
+            if message["type"] != "http.request":
+                continue
+            discarded += len(message.get("body", b""))
+            if discarded > self.max_drain_bytes:
+                return False
+            if not message.get("more_body", False):
+                return True
+
+    async def _read_body(
+        self, receive: Receive, limit: int, declared_length: int | None
+    ) -> tuple[bytes, str | None, bool]:
+        """Buffer the body up to ``limit`` bytes.
+
+        Also returns whether the connection is still reusable, which is only
+        in doubt when the body overflows ``limit`` and has to be drained.
+        """
         chunks = []
         total_size = 0
         more_body = True
@@ -90,19 +557,17 @@ class GuardBandVerificationMiddleware:
                 continue
             chunk = message.get("body", b"")
             total_size += len(chunk)
-            if total_size > self.max_body_bytes:
-                return b"", f"Request body exceeds {self.max_body_bytes} bytes"
-            chunks.append(chunk)
             more_body = message.get("more_body", False)
-        return b"".join(chunks), None
+            if total_size > limit:
+                reusable = not more_body or await self._drain(receive, declared_length, total_size)
+                return b"", f"Request body exceeds {limit} bytes", reusable
+            chunks.append(chunk)
+        return b"".join(chunks), None, True
 
-    def _parse_json_body(self, scope: Scope, body: bytes) -> tuple[dict[str, Any], str | None]:
-        content_type = Headers(scope=scope).get("content-type", "")
-        if "application/json" not in content_type:
-            return {}, "Guard Band verification requires application/json"
+    def _parse_json_body(self, body: bytes) -> tuple[dict[str, Any], str | None]:
         try:
             payload = json.loads(body or b"{}")
-        except json.JSONDecodeError:
+        except _JSON_ERRORS:
             return {}, "Malformed JSON request body"
         if not isinstance(payload, dict):
             return {}, "JSON request body must be an object"
@@ -120,14 +585,482 @@ class GuardBandVerificationMiddleware:
 
         return receive
 
-    async def _reject(self, scope: Scope, send: Send, error: str) -> None:
-        response = JSONResponse({"detail": error}, status_code=400)
+    async def _reject(
+        self,
+        scope: Scope,
+        send: Send,
+        error: str,
+        timer: PhaseTimer | None = None,
+        *,
+        close: bool = False,
+    ) -> None:
+        if timer is not None and self.observer is not None:
+            self.observer.observe(timer.finish("fastapi.request", False, error))
+        headers = {"connection": "close"} if close else None
+        response = JSONResponse({"detail": error}, status_code=400, headers=headers)
         await response(scope, self._empty_receive, send)
 
     async def _empty_receive(self) -> Message:
         return {"type": "http.request", "body": b"", "more_body": False}
 
 
+def default_websocket_context(scope: Scope) -> GuardBandContext:
+    """Return the context bound to a WebSocket connection: its path and query."""
+    return {
+        "path": scope["path"],
+        "query": scope.get("query_string", b"").decode("latin-1"),
+    }
+
+
+class _GuardedWebSocket:
+    """Per-connection verification state, prepared once at the handshake.
+
+    ``receive`` hands the application only messages whose bands verified,
+    with the results attached to the message under ``guard_band_verification``
+    (or ``guard_band_verifications`` for ``wrapped_fields`` routes).
+    """
+
+    def __init__(
+        self,
+        middleware: GuardBandVerificationMiddleware,
+        route: _RoutePolicy,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        policy = middleware.websocket_policy
+        self.middleware = middleware
+        self.route = route
+        self.policy = policy
+        self._receive = receive
+        self._send = send
+        resolver = policy.context_resolver or default_websocket_context
+        self.context = resolver(scope)
+        self.verifier: GuardBandVerifier = middleware.crypto.verifier(
+            self.context, cache_size=policy.cache_size
+        )
+        self.replay_ledger: ReplayLedger | None = route.replay_ledger
+        if self.replay_ledger is None and policy.replay_ttl_seconds is not None:
+            self.replay_ledger = NonceReplayLedger(policy.replay_ttl_seconds)
+
+    async def receive(self) -> Message:
+        while True:
+            message = await self._receive()
+            if message["type"] != "websocket.receive":
+                return message
+            timer = None if self.middleware.observer is None else PhaseTimer()
+            error, state_key, verification = self._verify(message, timer)
+            observer = self.middleware.observer
+            if timer is not None and observer is not None:
+                observer.observe(timer.finish("fastapi.websocket", error is None, error))
+            if error is None:
+                return {**message, state_key: verification}
+            if self.policy.send_errors:
+                detail = json.dumps({"type": "guard_band_error", "detail": error})
+                await self._send({"type": "websocket.send", "text": detail})
+            if self.policy.close_on_invalid:
+                # Close reasons are limited to 123 bytes.
+                reason = error.encode("utf-8")[:123].decode("utf-8", "ignore")
+                await self._send(
+                    {"type": "websocket.close", "code": self.policy.close_code, "reason": reason}
+                )
+                return {"type": "websocket.disconnect", "code": self.policy.close_code}
+
+    def _verify(self, message: Message, timer: PhaseTimer | None) -> tuple[str | None, str, Any]:
+        route = self.route
+        raw = message.get("text")
+        data = raw.encode("utf-8") if raw is not None else message.get("bytes") or b""
+        if timer is not None:
+            timer.payload_bytes = len(data)
+        if len(data) > route.max_body_bytes:
+            return f"Message exceeds {route.max_body_bytes} bytes", "", None
+        try:
+            payload = json.loads(data)
+        except _JSON_ERRORS:
+            return "Malformed JSON message", "", None
+        if not isinstance(payload, dict):
+            return "JSON message must be an object", "", None
+        if timer is not None:
+            timer.mark("parse")
+
+        if not route.selectors:
+            wrapped = payload.get(route.wrapped_content_field)
+            if not isinstance(wrapped, str):
+                return f"Missing string field: {route.wrapped_content_field}", "", None
+            result = self.verifier.verify(wrapped)
+            if timer is not None:
+                timer.mark("verify")
+            result = apply_replay_protection(result, self.context, self.replay_ledger)
+            if not result.get("valid"):
+                return f"Guard Band verification failed: {result.get('error')}", "", None
+            return None, "guard_band_verification", result
+
+        found: dict[str, Any] = {}
+        for tokens in route.selectors:
+            _select(payload, tokens, "", found)
+        if not found:
+            return "No Guard Band fields matched", "", None
+        for pointer, value in found.items():
+            if not isinstance(value, str):
+                return f"Field must be a string: {pointer}", "", None
+        results = self.verifier.verify_many(found.values())
+        if timer is not None:
+            timer.mark("verify")
+        for pointer, result in zip(found, results, strict=True):
+            if not result.get("valid"):
+                return (
+                    f"Guard Band verification failed at {pointer}: {result.get('error')}",
+                    "",
+                    None,
+                )
+        results = apply_replay_protection_many(results, self.context, self.replay_ledger)
+        if not results[0].get("valid"):
+            return f"Guard Band verification failed: {results[0].get('error')}", "", None
+        return None, "guard_band_verifications", dict(zip(found, results, strict=True))
+
+
+def default_response_context(scope: Scope) -> GuardBandContext:
+    """Return the context bound into signed responses: the request line.
+
+    Clients verify a response against the method, path, and query string of
+    the request they sent, so a signed response cannot be replayed as the
+    answer to a different request.
+    """
+    return {
+        "method": scope["method"],
+        "path": scope["path"],
+        "query": scope.get("query_string", b"").decode("latin-1"),
+    }
+
+
+class GuardBandResponseSigningMiddleware:
+    """Sign the responses of selected routes with Guard Bands.
+
+    By default the whole body becomes one inline band. With an HMAC signing
+    key the band is streamed: each body chunk is authenticated and forwarded
+    as it arrives, so memory use does not grow with the response. Ed25519
+    signatures need the whole message, so those bodies are buffered up to
+    ``max_body_bytes``, unless ``band_kind`` is ``DIGEST_TEXT_KIND``: a digest
+    band signs only the body's SHA-256, so it streams under any key. Signed
+    bodies are served as ``text/plain`` and the original content type moves
+    to the ``x-guard-band-content-type`` header.
+
+    With ``wrapped_fields`` the JSON body is buffered and each selected string
+    is replaced by its own band. With ``detached=True`` the selected values
+    are left unchanged and their detached envelopes are added under
+    ``envelope_field``, keyed by JSON Pointer.
+
+    The context comes from ``context_resolver`` (by default
+    :func:`default_response_context`) and is refused before the route runs
+    when its canonical JSON exceeds ``max_context_bytes``. Signing fails
+    closed: a failure before the response starts becomes a 500, and one after
+    it aborts the response with the band left unterminated.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        crypto: GuardBandCrypto,
+        signed_paths: Iterable[str | GuardBandResponseRoute],
+        methods: Iterable[str] = ("GET", "POST", "PUT", "PATCH", "DELETE"),
+        wrapped_fields: Iterable[str] = (),
+        detached: bool = False,
+        envelope_field: str = "guard_bands",
+        context_resolver: Callable[[Scope], GuardBandContext] | None = None,
+        max_context_bytes: int = DEFAULT_MAX_CONTEXT_BYTES,
+        max_body_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+        key_id: str | None = None,
+        issuer: str | None = None,
+        ttl_seconds: int | None = None,
+        band_kind: str = TEXT_KIND,
+    ) -> None:
+        if max_body_bytes <= 0 or max_context_bytes <= 0:
+            raise ValueError("Size limits must be positive")
+        if band_kind not in BAND_KINDS[crypto.signing_version]:
+            raise ValueError(f"Unsupported band kind: {band_kind}")
+        self.app = app
+        self.crypto = crypto
+        self.methods = {method.upper() for method in methods}
+        self.wrapped_fields = tuple(wrapped_fields)
+        self.detached = detached
+        self.envelope_field = envelope_field
+        self.context_resolver = context_resolver or default_response_context
+        self.max_context_bytes = max_context_bytes
+        self.max_body_bytes = max_body_bytes
+        self.key_id = key_id
+        self.issuer = issuer
+        self.ttl_seconds = ttl_seconds
+        self.band_kind = band_kind
+        _, signing_key = crypto.key_resolver.get_signing_key(key_id)
+        self.streaming = band_kind != TEXT_KIND or isinstance(signing_key, (bytes, bytearray))
+        self._routes: _RouteMatcher[_ResponsePolicy] = _RouteMatcher()
+        for entry in signed_paths:
+            route = (
+                entry
+                if isinstance(entry, GuardBandResponseRoute)
+                else GuardBandResponseRoute(entry)
+            )
+            fields = self.wrapped_fields if route.wrapped_fields is None else route.wrapped_fields
+            policy = _ResponsePolicy(
+                selectors=tuple(_compile_selector(selector) for selector in fields),
+                detached=self.detached if route.detached is None else route.detached,
+                max_body_bytes=(
+                    self.max_body_bytes if route.max_body_bytes is None else route.max_body_bytes
+                ),
+            )
+            self._routes.add(route.path, policy)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"].upper() not in self.methods:
+            await self.app(scope, receive, send)
+            return
+        policy = self._routes.match(scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            context = self.context_resolver(scope)
+            context_bytes = canonical_json_size(context or {}, self.max_context_bytes)
+        except (TypeError, ValueError) as exc:
+            await _fail(scope, send, f"Invalid Guard Band response context: {exc}")
+            return
+        if context_bytes > self.max_context_bytes:
+            await _fail(
+                scope,
+                send,
+                f"Guard Band response context exceeds {self.max_context_bytes} bytes",
+            )
+            return
+
+        response = _SignedResponse(self, policy, context, scope, send)
+        await self.app(scope, receive, response.send)
+
+
+class _SignedResponse:
+    """Signing state for one response passing through the middleware."""
+
+    def __init__(
+        self,
+        middleware: GuardBandResponseSigningMiddleware,
+        policy: _ResponsePolicy,
+        context: GuardBandContext,
+        scope: Scope,
+        send: Send,
+    ) -> None:
+        self.middleware = middleware
+        self.policy = policy
+        self.context = context
+        self.scope = scope
+        self._send = send
+        self.start: Message | None = None
+        self.started = False
+        self.passthrough = False
+        self.failed = False
+        self.chunks: list[bytes] = []
+        self.size = 0
+        self.signer: GuardBandStreamSigner | None = None
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+
+    async def send(self, message: Message) -> None:
+        if self.failed:
+            return
+        if self.passthrough or message["type"] not in {
+            "http.response.start",
+            "http.response.body",
+        }:
+            await self._send(message)
+            return
+        if message["type"] == "http.response.start":
+            # Informational and empty-body statuses carry nothing to sign.
+            if message["status"] < 200 or message["status"] in {204, 304}:
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.policy.selectors or not self.middleware.streaming:
+            await self._buffer(body, more_body)
+        else:
+            await self._stream(body, more_body)
+
+    async def _stream(self, body: bytes, more_body: bool) -> None:
+        middleware = self.middleware
+        try:
+            if self.signer is None:
+                self._require_content_type(json_only=False)
+                self.signer = middleware.crypto.stream_wrap(
+                    self.context,
+                    key_id=middleware.key_id,
+                    issuer=middleware.issuer,
+                    ttl_seconds=middleware.ttl_seconds,
+                    kind=middleware.band_kind,
+                )
+                text = self.signer.start()
+            else:
+                text = ""
+            text += self.signer.update(self.decoder.decode(body, final=not more_body))
+            if not more_body:
+                text += self.signer.finish()
+        except ValueError as exc:
+            if not self.started:
+                await self._fail(f"Guard Band response signing failed: {exc}")
+                return
+            # Headers are gone; abort without ever closing the band.
+            raise RuntimeError(f"Guard Band response signing failed: {exc}") from exc
+
+        if not self.started:
+            await self._send_start(signed=True, length=None)
+        await self._send(
+            {"type": "http.response.body", "body": text.encode(), "more_body": more_body}
+        )
+
+    async def _buffer(self, body: bytes, more_body: bool) -> None:
+        limit = self.policy.max_body_bytes
+        self.size += len(body)
+        if self.size > limit:
+            await self._fail(f"Response body exceeds {limit} bytes")
+            return
+        self.chunks.append(body)
+        if more_body:
+            return
+
+        raw = b"".join(self.chunks)
+        self.chunks = []
+        try:
+            if self.policy.selectors:
+                self._require_content_type(json_only=True)
+                signed = self._sign_fields(raw)
+            else:
+                self._require_content_type(json_only=False)
+                signed = self._sign_body(raw)
+        except (TypeError, *_JSON_ERRORS) as exc:
+            await self._fail(f"Guard Band response signing failed: {exc}")
+            return
+        await self._send_start(signed=not self.policy.selectors, length=len(signed))
+        await self._send({"type": "http.response.body", "body": signed, "more_body": False})
+
+    def _sign_body(self, raw: bytes) -> bytes:
+        middleware = self.middleware
+        return middleware.crypto.wrap_content(
+            raw.decode("utf-8"),
+            self.context,
+            key_id=middleware.key_id,
+            issuer=middleware.issuer,
+            ttl_seconds=middleware.ttl_seconds,
+            kind=middleware.band_kind,
+        ).encode("utf-8")
+
+    def _sign_fields(self, raw: bytes) -> bytes:
+        middleware = self.middleware
+        payload = json.loads(raw)
+        found: dict[str, Any] = {}
+        for tokens in self.policy.selectors:
+            _select(payload, tokens, "", found)
+        if not found:
+            return raw
+        options = {
+            "key_id": middleware.key_id,
+            "issuer": middleware.issuer,
+            "ttl_seconds": middleware.ttl_seconds,
+        }
+        if self.policy.detached:
+            if not isinstance(payload, dict) or middleware.envelope_field in payload:
+                raise ValueError(f"Cannot add envelope field: {middleware.envelope_field}")
+            payload[middleware.envelope_field] = {
+                pointer: middleware.crypto.sign_value(value, self.context, **options)
+                for pointer, value in found.items()
+            }
+        else:
+            for pointer, value in found.items():
+                if not isinstance(value, str):
+                    raise ValueError(f"Field must be a string: {pointer}")
+                wrapped = middleware.crypto.wrap_content(
+                    value, self.context, kind=middleware.band_kind, **options
+                )
+                _assign(payload, pointer, wrapped)
+        return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def _require_content_type(self, *, json_only: bool) -> None:
+        assert self.start is not None
+        content_type = Headers(raw=self.start.get("headers", [])).get("content-type", "")
+        if "json" in content_type or (not json_only and content_type.startswith("text/")):
+            return
+        expected = "a JSON" if json_only else "a text or JSON"
+        raise ValueError(f"Guard Band response signing requires {expected} body")
+
+    async def _send_start(self, *, signed: bool, length: int | None) -> None:
+        assert self.start is not None
+        headers = MutableHeaders(raw=list(self.start.get("headers", [])))
+        if signed:
+            headers[SIGNED_CONTENT_TYPE_HEADER] = headers.get("content-type", "")
+            headers["content-type"] = "text/plain; charset=utf-8"
+        if length is None:
+            del headers["content-length"]
+        else:
+            headers["content-length"] = str(length)
+        self.started = True
+        await self._send({**self.start, "headers": headers.raw})
+
+    async def _fail(self, error: str) -> None:
+        self.failed = True
+        await _fail(self.scope, self._send, error)
+
+
+async def _fail(scope: Scope, send: Send, error: str) -> None:
+    async def empty_receive() -> Message:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    response = JSONResponse({"detail": error}, status_code=500)
+    await response(scope, empty_receive, send)
+
+
 def guard_band_verification(request: Request) -> dict[str, Any] | None:
     """Return middleware verification details attached to request.state."""
     return getattr(request.state, "guard_band_verification", None)
+
+
+def guard_band_verifications(request: Request) -> dict[str, dict[str, Any]] | None:
+    """Return per-field results for routes verified with ``wrapped_fields``.
+
+    Keys are the concrete JSON Pointers of each verified band, for example
+    ``/documents/0/wrapped``.
+    """
+    return getattr(request.state, "guard_band_verifications", None)
+
+
+def guard_band_payload(request: Request) -> dict[str, Any]:
+    """FastAPI dependency returning the body the middleware already parsed.
+
+    Requires ``publish_payload=True``. Routes that use it must not also
+    declare a body parameter, or FastAPI parses the body a second time.
+    Requests that did not pass through verification are rejected, so the
+    dependency never hands an unverified body to a route.
+    """
+    payload = getattr(request.state, "guard_band_payload", None)
+    if payload is None:
+        raise HTTPException(status_code=500, detail="Guard Band payload is not available")
+    return payload
+
+
+def guard_band_body(model: type[ModelT]) -> Callable[[Request], ModelT]:
+    """Build a dependency that validates the published payload as ``model``.
+
+    Validation errors become FastAPI's usual 422 response, matching a
+    declared body parameter without re-parsing the JSON.
+    """
+
+    def dependency(request: Request) -> ModelT:
+        payload = guard_band_payload(request)
+        try:
+            return model.model_validate(payload)
+        except ValidationError as exc:
+            errors = [
+                {**error, "loc": ("body", *error["loc"])} for error in exc.errors(include_url=False)
+            ]
+            raise RequestValidationError(errors) from exc
+
+    return dependency
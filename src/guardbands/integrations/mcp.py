@@ -8,31 +8,67 @@ model.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import functools
 import hashlib
 import re
 import secrets
-from collections.abc import Callable, Mapping
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Any
+from datetime import UTC, datetime
+from typing import Any, Literal, Protocol, TypeVar
 
 import mcp.types as mcp_types
 from mcp.client import advertise
+from mcp.client.extension import ClaimContext, ClientExtension, ResultClaim
 from mcp.server.context import CallNext, HandlerResult, ServerRequestContext
-from mcp.server.extension import Extension
+from mcp.server.extension import Extension, MethodBinding
 from mcp.shared.exceptions import MCPError
 from mcp.types import CallToolRequestParams, CallToolResult, TextContent
+from mcp_types.version import MODERN_PROTOCOL_VERSIONS
 
-from ..crypto import GuardBandCrypto, canonical_json
+from ..crypto import (
+    BAND_KINDS,
+    CURRENT_PROTOCOL_VERSION,
+    TEXT_KIND,
+    GuardBandCrypto,
+    PreparedValue,
+    canonical_json_size,
+    negotiate_band_kind,
+)
+from ..observability import GuardBandObserver, PhaseTimer, observe_consume
+from ..replay import ReplayLedgerUnavailableError
+from ..sessions import (
+    SessionGrant,
+    SessionKeyResolver,
+    issue_session_grant,
+    session_crypto,
+    verify_session_grant,
+)
 
 MCP_GUARD_BAND_ID = "com.guardbands/guard-band"
 MCP_GUARD_BAND_VERSION = 1
 DEFAULT_MAX_MCP_PAYLOAD_BYTES = 1_000_000
+DEFAULT_MAX_MCP_SESSIONS = 10_000
+DEFAULT_MAX_MCP_TASKS = 1024
 _CALL_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,128}$")
+_UNKNOWN_SESSION = "Unknown or expired Guard Band session"
+_UNKNOWN_TASK = "Unknown or expired Guard Band task"
 
 ServerContextResolver = Callable[
     [str, dict[str, Any], ServerRequestContext[Any, Any]], dict[str, Any]
 ]
+AsyncServerContextResolver = Callable[
+    [str, dict[str, Any], ServerRequestContext[Any, Any]], Awaitable[dict[str, Any]]
+]
+TenantResolver = Callable[[str, dict[str, Any], ServerRequestContext[Any, Any]], Hashable | None]
 ClientAuthorizer = Callable[[str, dict[str, Any], dict[str, Any]], None]
+_T = TypeVar("_T")
 
 
 class MCPGuardBandError(ValueError):
@@ -41,12 +77,17 @@ class MCPGuardBandError(ValueError):
 
 @dataclass(frozen=True, slots=True)
 class MCPToolPolicy:
-    """Select which sides of a tool call require Guard Bands."""
+    """Select which sides of a tool call require Guard Bands.
+
+    ``deferred`` runs the tool as an MCP task when the server has a task
+    store and the client accepts task results.
+    """
 
     guard_inputs: bool = False
     guard_outputs: bool = False
     wrap_text_outputs: bool = True
     ttl_seconds: int | None = None
+    deferred: bool = False
 
     def __post_init__(self) -> None:
         if self.wrap_text_outputs and not self.guard_outputs:
@@ -59,46 +100,544 @@ class MCPToolPolicy:
         return self.guard_inputs or self.guard_outputs
 
 
-def guard_bands_client_capability():
-    """Return the MCP client capability advertisement for Guard Bands."""
-    return advertise(MCP_GUARD_BAND_ID, {"envelopeVersion": MCP_GUARD_BAND_VERSION})
+class MCPReplayLedger(Protocol):
+    """Storage contract for retry-aware consumption of guarded MCP inputs."""
+
+    def consume(
+        self,
+        call_id: str,
+        input_sha256: str,
+        nonce: str,
+        expires_at: int,
+        now: float | None = None,
+    ) -> bool:
+        """Return whether this delivery of a signed input may run the tool."""
+        ...
+
+
+_InputKey = tuple[str, str, str]
+
+
+class _InputDelivery:
+    __slots__ = ("first_seen", "retries")
+
+    def __init__(self, first_seen: float) -> None:
+        self.first_seen = first_seen
+        self.retries = 0
+
+
+class MCPInputReplayLedger:
+    """In-memory replay ledger for signed MCP tool arguments.
+
+    Multi-round-trip calls resend the same signed arguments under one Guard
+    Band call id, so a generic single-use nonce ledger would reject them. This
+    ledger records ``(call_id, input_sha256, nonce)`` and accepts at most
+    ``max_retries`` repeats within ``retry_window_seconds`` of the first
+    delivery. Entries are kept until the envelope's ``expires_at``; after that
+    the envelope no longer verifies and the entry can be dropped.
+
+    Expiry uses a wheel of per-second buckets keyed by ``expires_at``, so
+    recording and pruning cost O(1) per entry regardless of ledger size.
+    """
+
+    def __init__(
+        self,
+        *,
+        retry_window_seconds: float = 300.0,
+        max_retries: int = 5,
+        observer: GuardBandObserver | None = None,
+    ) -> None:
+        if retry_window_seconds < 0:
+            raise ValueError("retry_window_seconds must not be negative")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        self.retry_window_seconds = retry_window_seconds
+        self.max_retries = max_retries
+        self.observer = observer
+        self._deliveries: dict[_InputKey, _InputDelivery] = {}
+        self._wheel: dict[int, list[_InputKey]] = {}
+        # Every bucket below the cursor has already been pruned.
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._deliveries)
+
+    def consume(
+        self,
+        call_id: str,
+        input_sha256: str,
+        nonce: str,
+        expires_at: int,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume(call_id, input_sha256, nonce, expires_at, now)
+        return observe_consume(
+            observer,
+            "ledger.consume",
+            lambda: self._consume(call_id, input_sha256, nonce, expires_at, now),
+        )
+
+    def _consume(
+        self,
+        call_id: str,
+        input_sha256: str,
+        nonce: str,
+        expires_at: int,
+        now: float | None,
+    ) -> bool:
+        current_time = time.time() if now is None else now
+        key = (call_id, input_sha256, nonce)
+        with self._lock:
+            self._prune(int(current_time))
+            delivery = self._deliveries.get(key)
+            if delivery is None:
+                if int(current_time) > expires_at:
+                    return False
+                self._deliveries[key] = _InputDelivery(current_time)
+                self._wheel.setdefault(max(expires_at, self._cursor), []).append(key)
+                return True
+            if (
+                delivery.retries >= self.max_retries
+                or current_time - delivery.first_seen > self.retry_window_seconds
+            ):
+                return False
+            delivery.retries += 1
+            return True
+
+    def _prune(self, second: int) -> None:
+        # Envelopes verify through their ``expires_at`` second, so a bucket is
+        # only released once the clock has moved past it.
+        if second <= self._cursor:
+            return
+        if second - self._cursor > len(self._wheel):
+            # After an idle gap, walking the populated buckets is cheaper than
+            # walking every elapsed second.
+            due: Iterable[int] = [bucket for bucket in self._wheel if bucket < second]
+        else:
+            due = range(self._cursor, second)
+        for bucket in due:
+            for key in self._wheel.pop(bucket, ()):
+                del self._deliveries[key]
+        self._cursor = second
+
+
+class MCPContextCache:
+    """TTL cache of resolved application contexts, keyed by (tool, tenant).
+
+    ``tenant`` maps a call to the tenant its context depends on, or to
+    ``None`` to resolve that call uncached. A cached context is reused for
+    every call of the same tool and tenant for ``ttl_seconds``, so the
+    resolver must not depend on anything else, such as the arguments.
+    Concurrent misses for one key share a single resolution; failed
+    resolutions are not cached. The cache belongs to one event loop.
+    """
+
+    def __init__(
+        self,
+        tenant: TenantResolver,
+        *,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.tenant = tenant
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._pending: dict[tuple[str, Hashable], asyncio.Future[dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get(
+        self,
+        tool_name: str,
+        arguments: dict[str, Any],
+        ctx: ServerRequestContext[Any, Any],
+        resolve: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """Return the cached context for this call, or ``await resolve()``."""
+        tenant = self.tenant(tool_name, arguments, ctx)
+        if tenant is None:
+            return await resolve()
+        key = (tool_name, tenant)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if self.clock() < entry[0]:
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(resolve())
+            self._pending[key] = pending
+            pending.add_done_callback(functools.partial(self._settle, key))
+        # Shielded so that one cancelled caller does not cancel the others.
+        return await asyncio.shield(pending)
+
+    def _settle(self, key: tuple[str, Hashable], pending: asyncio.Future[dict[str, Any]]) -> None:
+        del self._pending[key]
+        if pending.cancelled() or pending.exception() is not None:
+            return
+        context = pending.result()
+        if not isinstance(context, dict):
+            return
+        self._entries[key] = (self.clock() + self.ttl_seconds, context)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class _TaskRecord:
+    __slots__ = ("created_at", "expires_at", "response", "runner", "task_id")
+
+    def __init__(
+        self, task_id: str, created_at: float, expires_at: float, response: dict[str, Any]
+    ) -> None:
+        self.task_id = task_id
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.response = response
+        self.runner: asyncio.Task[None] | None = None
+
+
+_TaskRunner = Callable[[], Awaitable[tuple[dict[str, Any], float | None]]]
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, UTC).isoformat().replace("+00:00", "Z")
+
+
+class MCPTaskStore:
+    """Deferred results of guarded tool calls that run as MCP tasks.
+
+    A task's final result is guarded once, when its tool finishes, and kept
+    in wire form together with its envelopes. Every ``tasks/get`` poll after
+    that returns the same signed result without signing or canonicalizing it
+    again. Tasks expire ``ttl_seconds`` after they were created, and a running
+    task that expires is cancelled. A completed result is also dropped once
+    its signature expires, because no poll after that could verify it. Once
+    ``max_tasks`` are live, new tasks are rejected rather than evicting older
+    ones. Task ids are unguessable and
+    are the only capability needed to poll a task. The store belongs to one
+    event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float = 3600.0,
+        max_tasks: int = DEFAULT_MAX_MCP_TASKS,
+        poll_interval_ms: int = 1000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if max_tasks <= 0:
+            raise ValueError("max_tasks must be positive")
+        if poll_interval_ms <= 0:
+            raise ValueError("poll_interval_ms must be positive")
+        self.ttl_seconds = ttl_seconds
+        self.max_tasks = max_tasks
+        self.poll_interval_ms = poll_interval_ms
+        self.clock = clock
+        self._tasks: OrderedDict[str, _TaskRecord] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def create(self, run: _TaskRunner) -> dict[str, Any]:
+        """Start ``run`` as a task and return the task in wire form.
+
+        ``run`` returns the final result in wire form, which is stored as is,
+        and the Unix time its signature expires, or ``None`` when it carries
+        no signature.
+        """
+        now = self.clock()
+        self._prune(now)
+        if len(self._tasks) >= self.max_tasks:
+            # Results whose signatures expired early may sit behind older tasks.
+            self._prune(now, sweep=True)
+        if len(self._tasks) >= self.max_tasks:
+            raise MCPError(mcp_types.INTERNAL_ERROR, "Too many Guard Band tasks")
+        task_id = secrets.token_urlsafe(16)
+        record = _TaskRecord(
+            task_id,
+            now,
+            now + self.ttl_seconds,
+            {
+                "taskId": task_id,
+                "status": "working",
+                "createdAt": _timestamp(now),
+                "lastUpdatedAt": _timestamp(now),
+                "ttl": int(self.ttl_seconds * 1000),
+                "pollInterval": self.poll_interval_ms,
+            },
+        )
+        self._tasks[task_id] = record
+        record.runner = asyncio.ensure_future(self._run(record, run))
+        return dict(record.response)
+
+    def get(self, task_id: str) -> dict[str, Any]:
+        """Return the task in wire form, with its result once it completed."""
+        now = self.clock()
+        self._prune(now)
+        record = self._tasks.get(task_id)
+        if record is not None and record.expires_at < now:
+            self._drop(record)
+            record = None
+        if record is None:
+            raise MCPError(mcp_types.INVALID_PARAMS, _UNKNOWN_TASK)
+        return record.response
+
+    async def _run(self, record: _TaskRecord, run: _TaskRunner) -> None:
+        response: dict[str, Any]
+        try:
+            result, result_expires_at = await run()
+        except MCPError as exc:
+            response = {"status": "failed", "statusMessage": exc.message}
+        except Exception:
+            response = {"status": "failed", "statusMessage": "Tool call failed"}
+        else:
+            response = {"status": "completed", "result": result}
+            if result_expires_at is not None and result_expires_at < record.expires_at:
+                record.expires_at = result_expires_at
+                # The wire ttl is the retention from creation, so clients
+                # stop polling for a result that could no longer verify.
+                response["ttl"] = max(0, int((result_expires_at - record.created_at) * 1000))
+        # Replaced, never mutated, so a poll in flight keeps a consistent view.
+        record.response = {
+            **record.response,
+            **response,
+            "lastUpdatedAt": _timestamp(self.clock()),
+        }
+
+    def _prune(self, now: float, *, sweep: bool = False) -> None:
+        """Drop expired tasks, oldest first or, with ``sweep``, all of them."""
+        if sweep:
+            for record in [r for r in self._tasks.values() if r.expires_at < now]:
+                self._drop(record)
+            return
+        while self._tasks:
+            oldest = next(iter(self._tasks.values()))
+            if oldest.expires_at >= now:
+                break
+            self._drop(oldest)
+
+    def _drop(self, record: _TaskRecord) -> None:
+        del self._tasks[record.task_id]
+        if record.runner is not None:
+            record.runner.cancel()
+
+
+class _TaskHandle(mcp_types.Result):
+    """The ``tools/call`` result that stands in for a deferred result."""
+
+    result_type: Literal["task"] = "task"
+    task: mcp_types.Task
+
+
+class _TaskStatus(mcp_types.GetTaskResult):
+    result: dict[str, Any] | None = None
+
+
+def _client_settings(ctx: ServerRequestContext[Any, Any]) -> dict[str, Any]:
+    capabilities = ctx.session.client_capabilities
+    extensions = capabilities.extensions if capabilities else None
+    settings = extensions.get(MCP_GUARD_BAND_ID) if extensions else None
+    return settings if isinstance(settings, dict) else {}
+
+
+def _accepts_tasks(ctx: ServerRequestContext[Any, Any]) -> bool:
+    if ctx.protocol_version not in MODERN_PROTOCOL_VERSIONS:
+        return False
+    return _client_settings(ctx).get("tasks") is True
+
+
+def _band_kind(ctx: ServerRequestContext[Any, Any], crypto: GuardBandCrypto) -> str:
+    """Return the band kind for result text, from the kinds the client verifies.
+
+    A client that does not list its kinds predates digest bands, so it gets
+    plain text bands.
+    """
+    kinds = _client_settings(ctx).get("bandKinds")
+    if not isinstance(kinds, list):
+        return TEXT_KIND
+    return negotiate_band_kind(
+        [kind for kind in kinds if isinstance(kind, str)], version=crypto.signing_version
+    )
+
+
+# Every inline band kind this library verifies, advertised by MCP clients.
+_CLIENT_BAND_KINDS = sorted(BAND_KINDS[CURRENT_PROTOCOL_VERSION])
+
+
+async def _await_task(handle: _TaskHandle, ctx: ClaimContext) -> CallToolResult:
+    """Poll ``tasks/get`` until the task ends and return its final result.
+
+    The result is returned unverified: :class:`GuardBandMCPClient` verifies
+    it against the call that started the task, like any other result.
+    """
+    request = mcp_types.GetTaskRequest(
+        params=mcp_types.GetTaskRequestParams(task_id=handle.task.task_id)
+    )
+    poll_interval = handle.task.poll_interval or 1000
+    while True:
+        await asyncio.sleep(poll_interval / 1000)
+        status = await ctx.session.send_request(request, _TaskStatus, ctx.read_timeout_seconds)
+        if status.status == "completed":
+            if status.result is None:
+                raise MCPGuardBandError("Guard Band task completed without a result")
+            return CallToolResult.model_validate(status.result)
+        if status.status in ("failed", "cancelled"):
+            message = status.status_message or f"Guard Band task {status.status}"
+            raise MCPError(mcp_types.INTERNAL_ERROR, message)
+        poll_interval = status.poll_interval or poll_interval
+
+
+class _GuardBandTaskExtension(ClientExtension):
+    identifier = MCP_GUARD_BAND_ID
+
+    def settings(self) -> dict[str, Any]:
+        return {
+            "bandKinds": _CLIENT_BAND_KINDS,
+            "envelopeVersion": MCP_GUARD_BAND_VERSION,
+            "tasks": True,
+        }
+
+    def claims(self) -> list[ResultClaim[Any]]:
+        return [ResultClaim(result_type="task", model=_TaskHandle, resolve=_await_task)]
+
+
+def guard_bands_client_capability(*, tasks: bool = False) -> ClientExtension:
+    """Return the MCP client capability advertisement for Guard Bands.
+
+    With ``tasks`` the client also accepts deferred results: it polls the
+    task a ``tools/call`` returned and hands back its final result. Either
+    way the client lists the band kinds it verifies, so a server may send
+    digest-bound bands.
+    """
+    if tasks:
+        return _GuardBandTaskExtension()
+    return advertise(
+        MCP_GUARD_BAND_ID,
+        {"bandKinds": _CLIENT_BAND_KINDS, "envelopeVersion": MCP_GUARD_BAND_VERSION},
+    )
 
 
 def _policy_for(policies: Mapping[str, MCPToolPolicy], tool_name: str) -> MCPToolPolicy:
     return policies.get(tool_name, policies.get("*", MCPToolPolicy()))
 
 
-def _input_digest(arguments: dict[str, Any]) -> str:
-    return hashlib.sha256(canonical_json(arguments).encode("utf-8")).hexdigest()
+class _CallContext:
+    """The Guard Band contexts of one tool call.
 
+    The arguments are canonicalized once, after their size has been checked.
+    Their digest and the canonical form reused by ``sign_value`` and
+    ``verify_value`` come from that one pass, however many contexts the call
+    builds. ``call_id`` and ``application_context`` are filled in once they
+    are known. ``crypto`` and ``key_id`` sign and verify the call: the
+    adapter's own, or those of the session the call belongs to.
+    ``band_kind`` is the kind of band the result text is wrapped in.
+    """
 
-def _mcp_context(
-    *,
-    audience: str,
-    direction: str,
-    tool_name: str,
-    call_id: str,
-    application_context: dict[str, Any],
-    arguments: dict[str, Any],
-    content_index: int | None = None,
-) -> dict[str, Any]:
-    context: dict[str, Any] = {
-        "application": application_context,
-        "audience": audience,
-        "call_id": call_id,
-        "direction": direction,
-        "input_sha256": _input_digest(arguments),
-        "integration": "mcp",
-        "method": "tools/call",
-        "tool": tool_name,
-    }
-    if content_index is not None:
-        context["content_index"] = content_index
-    return context
+    __slots__ = (
+        "application_context",
+        "arguments",
+        "audience",
+        "band_kind",
+        "call_id",
+        "crypto",
+        "input_sha256",
+        "key_id",
+        "tool_name",
+    )
+
+    def __init__(
+        self,
+        arguments: dict[str, Any],
+        *,
+        audience: str,
+        tool_name: str,
+        crypto: GuardBandCrypto,
+        key_id: str | None,
+    ) -> None:
+        self.arguments = PreparedValue(arguments)
+        encoded = self.arguments.canonical().encode("utf-8")
+        self.input_sha256 = hashlib.sha256(encoded).hexdigest()
+        self.audience = audience
+        self.tool_name = tool_name
+        self.crypto = crypto
+        self.key_id = key_id
+        self.call_id = ""
+        self.application_context: dict[str, Any] = {}
+        self.band_kind = TEXT_KIND
+
+    def context(self, direction: str, content_index: int | None = None) -> dict[str, Any]:
+        context: dict[str, Any] = {
+            "application": self.application_context,
+            "audience": self.audience,
+            "call_id": self.call_id,
+            "direction": direction,
+            "input_sha256": self.input_sha256,
+            "integration": "mcp",
+            "method": "tools/call",
+            "tool": self.tool_name,
+        }
+        if content_index is not None:
+            context["content_index"] = content_index
+        return context
 
 
-def _payload_size(value: Any) -> int:
-    return len(canonical_json(value).encode("utf-8"))
+def _text_blocks(result: CallToolResult) -> tuple[list[int], list[str]]:
+    """Return the content indexes and texts of a result's text blocks."""
+    indexes: list[int] = []
+    texts: list[str] = []
+    for index, block in enumerate(result.content):
+        if isinstance(block, TextContent):
+            indexes.append(index)
+            texts.append(block.text)
+    return indexes, texts
+
+
+async def _per_block(
+    executor: Executor | None,
+    function: Callable[..., _T],
+    texts: list[str],
+    indexes: list[int],
+) -> list[_T]:
+    """Apply ``function(text, index=index)`` to every block, in block order.
+
+    Without an executor the blocks are processed inline. With one, each
+    block is a separate task there, so the event loop stays free and blocks
+    run in parallel as far as the executor and the GIL allow.
+    """
+    if executor is None:
+        return [function(text, index=index) for text, index in zip(texts, indexes, strict=True)]
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(
+            loop.run_in_executor(executor, functools.partial(function, text, index=index))
+            for text, index in zip(texts, indexes, strict=True)
+        )
+    )
+
+
+def _text_length(result: CallToolResult) -> int:
+    return sum(len(block.text) for block in result.content if isinstance(block, TextContent))
 
 
 def _result_payload(result: CallToolResult) -> dict[str, Any]:
@@ -127,6 +666,35 @@ def _call_id(meta: dict[str, Any] | None) -> str | None:
     return value
 
 
+def _session_id(guard_meta: dict[str, Any] | None) -> str | None:
+    value = (guard_meta or {}).get("session_id")
+    if value is not None and not isinstance(value, str):
+        raise MCPError(mcp_types.INVALID_PARAMS, _UNKNOWN_SESSION)
+    return value
+
+
+def _with_guard_meta(result: CallToolResult, guard_meta: dict[str, Any]) -> CallToolResult:
+    result_meta = dict(result.meta or {})
+    result_meta[MCP_GUARD_BAND_ID] = guard_meta
+    return result.model_copy(update={"meta": result_meta})
+
+
+def _consume_input(
+    ledger: MCPReplayLedger,
+    call_id: str,
+    input_sha256: str,
+    verification: dict[str, Any],
+) -> None:
+    try:
+        fresh = ledger.consume(
+            call_id, input_sha256, verification["nonce"], verification["expires_at"]
+        )
+    except ReplayLedgerUnavailableError:
+        raise MCPError(mcp_types.INTERNAL_ERROR, "Replay ledger unavailable") from None
+    if not fresh:
+        raise MCPError(mcp_types.INVALID_PARAMS, "Guard Band input replay detected")
+
+
 class GuardBandMCPServerExtension(Extension):
     """Verify guarded tool arguments and sign guarded tool results."""
 
@@ -142,21 +710,55 @@ class GuardBandMCPServerExtension(Extension):
         signing_key_id: str | None = None,
         issuer: str = "mcp-server",
         max_payload_bytes: int = DEFAULT_MAX_MCP_PAYLOAD_BYTES,
+        replay_ledger: MCPReplayLedger | None = None,
+        observer: GuardBandObserver | None = None,
+        executor: Executor | None = None,
+        async_context_resolver: AsyncServerContextResolver | None = None,
+        context_cache: MCPContextCache | None = None,
+        session_ttl_seconds: int | None = None,
+        max_sessions: int = DEFAULT_MAX_MCP_SESSIONS,
+        task_store: MCPTaskStore | None = None,
     ) -> None:
         if not audience:
             raise ValueError("audience is required")
         if max_payload_bytes <= 0:
             raise ValueError("max_payload_bytes must be positive")
+        if context_resolver is not None and async_context_resolver is not None:
+            raise ValueError("Pass context_resolver or async_context_resolver, not both")
+        if session_ttl_seconds is not None and session_ttl_seconds <= 0:
+            raise ValueError("session_ttl_seconds must be positive")
+        if max_sessions <= 0:
+            raise ValueError("max_sessions must be positive")
         self.crypto = crypto
         self.audience = audience
         self.policies = dict(policies)
+        self.replay_ledger = replay_ledger
+        self.observer = observer
+        self.executor = executor
         self.context_resolver = context_resolver or (lambda _name, _args, _ctx: {})
+        self.async_context_resolver = async_context_resolver
+        self.context_cache = context_cache
+        self.session_ttl_seconds = session_ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, tuple[SessionGrant, GuardBandCrypto]] = OrderedDict()
+        self.task_store = task_store
         self.signing_key_id = signing_key_id
         self.issuer = issuer
         self.max_payload_bytes = max_payload_bytes
 
     def settings(self) -> dict[str, Any]:
-        return {"envelopeVersion": MCP_GUARD_BAND_VERSION, "method": "tools/call"}
+        settings: dict[str, Any] = {
+            "envelopeVersion": MCP_GUARD_BAND_VERSION,
+            "method": "tools/call",
+        }
+        if self.task_store is not None:
+            settings["tasks"] = True
+        return settings
+
+    def methods(self) -> list[MethodBinding]:
+        if self.task_store is None:
+            return []
+        return [MethodBinding("tasks/get", mcp_types.GetTaskRequestParams, self._get_task)]
 
     async def intercept_tool_call(
         self,
@@ -167,116 +769,244 @@ class GuardBandMCPServerExtension(Extension):
         policy = _policy_for(self.policies, params.name)
         if not policy.enabled:
             return await call_next(ctx)
+        observer = self.observer
+        if observer is None:
+            return await self._intercept(params, ctx, call_next, policy, None)
+        timer = PhaseTimer()
+        try:
+            result = await self._intercept(params, ctx, call_next, policy, timer)
+        except Exception as exc:
+            error = exc.message if isinstance(exc, MCPError) else None
+            observer.observe(timer.finish("mcp.tool_call", False, error))
+            raise
+        observer.observe(timer.finish("mcp.tool_call", True))
+        return result
 
+    async def _intercept(
+        self,
+        params: CallToolRequestParams,
+        ctx: ServerRequestContext[Any, Any],
+        call_next: CallNext,
+        policy: MCPToolPolicy,
+        timer: PhaseTimer | None,
+    ) -> HandlerResult:
         arguments = params.arguments or {}
-        if _payload_size(arguments) > self.max_payload_bytes:
+        # Oversized arguments are rejected after about max_payload_bytes of
+        # counting, never after a full serialization.
+        argument_bytes = canonical_json_size(arguments, self.max_payload_bytes)
+        if timer is not None:
+            timer.payload_bytes = argument_bytes
+        if argument_bytes > self.max_payload_bytes:
             raise MCPError(mcp_types.INVALID_PARAMS, "Guarded MCP payload is too large")
-
         call_id = _call_id(params.meta)
         if call_id is None:
             raise MCPError(mcp_types.INVALID_PARAMS, "Valid Guard Band call metadata is required")
+        guard_meta = _guard_meta(params.meta)
+        session_id = _session_id(guard_meta)
+        if session_id is None:
+            crypto, key_id = self.crypto, self.signing_key_id
+        else:
+            crypto, key_id = self._session_crypto(session_id), None
+        call = _CallContext(
+            arguments, audience=self.audience, tool_name=params.name, crypto=crypto, key_id=key_id
+        )
+        call.band_kind = _band_kind(ctx, crypto)
+        if timer is not None:
+            timer.mark("parse")
 
-        application_context = self.context_resolver(params.name, arguments, ctx)
+        if self.context_cache is None:
+            application_context = await self._resolve_context(params.name, arguments, ctx)
+        else:
+            application_context = await self.context_cache.get(
+                params.name,
+                arguments,
+                ctx,
+                lambda: self._resolve_context(params.name, arguments, ctx),
+            )
         if not isinstance(application_context, dict):
             raise MCPError(mcp_types.INTERNAL_ERROR, "Guard Band context resolution failed")
+        call.call_id = call_id
+        call.application_context = application_context
+        if timer is not None:
+            timer.mark("resolve_context")
 
+        result_guard_meta: dict[str, Any] = {"version": MCP_GUARD_BAND_VERSION, "call_id": call_id}
         if policy.guard_inputs:
-            guard_meta = _guard_meta(params.meta)
             envelope = guard_meta.get("input") if guard_meta else None
-            verification = self.crypto.verify_value(
-                arguments,
-                envelope,
-                _mcp_context(
-                    audience=self.audience,
-                    direction="input",
-                    tool_name=params.name,
-                    call_id=call_id,
-                    application_context=application_context,
-                    arguments=arguments,
-                ),
-            )
+            verification = crypto.verify_value(call.arguments, envelope, call.context("input"))
+            if timer is not None:
+                timer.mark("verify_input")
+                timer.error = verification.get("error")
             if not verification.get("valid"):
                 raise MCPError(mcp_types.INVALID_PARAMS, "Guard Band input verification failed")
+            if self.replay_ledger is not None:
+                _consume_input(self.replay_ledger, call_id, call.input_sha256, verification)
+                if timer is not None:
+                    timer.mark("ledger_consume")
+            # Only a caller whose input verified under an ordinary key may
+            # open a session, and the grant names that key as its subject.
+            if (
+                session_id is None
+                and self.session_ttl_seconds is not None
+                and guard_meta is not None
+                and guard_meta.get("session") == "request"
+            ):
+                result_guard_meta["session"] = self._open_session(verification["key_id"])
+
+        if policy.deferred and self.task_store is not None and _accepts_tasks(ctx):
+            task = self.task_store.create(
+                functools.partial(self._run_task, call_next, ctx, policy, call, result_guard_meta)
+            )
+            if timer is not None:
+                timer.mark("create_task")
+            return {"resultType": "task", "task": task}
 
         result = await call_next(ctx)
-        if not policy.guard_outputs or not isinstance(result, CallToolResult):
+        if timer is not None:
+            timer.mark("handler")
+        if not isinstance(result, CallToolResult):
             # Multi-round-trip ``input_required`` results are not final tool
             # output. The SDK retries with the same signed arguments and this
             # interceptor signs the eventual complete CallToolResult.
             return result
+        return await self._guard_output(result, policy, call, result_guard_meta, timer)
 
-        if _payload_size(_result_payload(result)) > self.max_payload_bytes:
-            raise MCPError(mcp_types.INTERNAL_ERROR, "Guarded MCP result is too large")
-        if policy.wrap_text_outputs:
-            result = self._wrap_text_blocks(
-                result,
-                policy,
-                params.name,
-                call_id,
-                application_context,
-                arguments,
+    async def _run_task(
+        self,
+        call_next: CallNext,
+        ctx: ServerRequestContext[Any, Any],
+        policy: MCPToolPolicy,
+        call: _CallContext,
+        result_guard_meta: dict[str, Any],
+    ) -> tuple[dict[str, Any], float | None]:
+        result = await call_next(ctx)
+        if not isinstance(result, CallToolResult):
+            raise MCPError(
+                mcp_types.INTERNAL_ERROR, "Deferred MCP tools must return a final tool result"
             )
+        result = await self._guard_output(result, policy, call, result_guard_meta, None)
+        # A session-signed result verifies only while its session lasts.
+        expires_at: float | None = None
+        output = result_guard_meta.get("output")
+        if output is not None:
+            expires_at = output["expires_at"]
+            resolver = call.crypto.key_resolver
+            if isinstance(resolver, SessionKeyResolver):
+                expires_at = min(expires_at, resolver.grant.expires_at)
+        return result.model_dump(by_alias=True, mode="json", exclude_none=True), expires_at
+
+    async def _get_task(
+        self, ctx: ServerRequestContext[Any, Any], params: mcp_types.GetTaskRequestParams
+    ) -> dict[str, Any]:
+        assert self.task_store is not None
+        return self.task_store.get(params.task_id)
+
+    async def _guard_output(
+        self,
+        result: CallToolResult,
+        policy: MCPToolPolicy,
+        call: _CallContext,
+        result_guard_meta: dict[str, Any],
+        timer: PhaseTimer | None,
+    ) -> CallToolResult:
+        crypto = call.crypto
+        if not policy.guard_outputs:
+            if "session" in result_guard_meta:
+                return _with_guard_meta(result, result_guard_meta)
+            return result
 
-        payload = _result_payload(result)
-        if _payload_size(payload) > self.max_payload_bytes:
+        # Every character of text is at least one byte of the canonical
+        # payload, so this rejects oversized text before any wrapping work.
+        if _text_length(result) > self.max_payload_bytes:
             raise MCPError(mcp_types.INTERNAL_ERROR, "Guarded MCP result is too large")
-        envelope = self.crypto.sign_value(
+        # The result is dumped once and wrapping patches the dumped text blocks
+        # in place. The dump is measured against the limit and canonicalized
+        # once for signing.
+        dumped = _result_payload(result)
+        if policy.wrap_text_outputs:
+            result = await self._wrap_text_blocks(result, policy, call, dumped["content"])
+        if canonical_json_size(dumped, self.max_payload_bytes) > self.max_payload_bytes:
+            raise MCPError(mcp_types.INTERNAL_ERROR, "Guarded MCP result is too large")
+        payload = PreparedValue(dumped)
+        result_guard_meta["output"] = crypto.sign_value(
             payload,
-            _mcp_context(
-                audience=self.audience,
-                direction="output",
-                tool_name=params.name,
-                call_id=call_id,
-                application_context=application_context,
-                arguments=arguments,
-            ),
-            key_id=self.signing_key_id,
+            call.context("output"),
+            key_id=call.key_id,
             issuer=self.issuer,
             ttl_seconds=policy.ttl_seconds,
         )
-        result_meta = dict(result.meta or {})
-        result_meta[MCP_GUARD_BAND_ID] = {
-            "version": MCP_GUARD_BAND_VERSION,
-            "call_id": call_id,
-            "output": envelope,
-        }
-        return result.model_copy(update={"meta": result_meta})
+        if timer is not None:
+            timer.mark("sign_output")
+        return _with_guard_meta(result, result_guard_meta)
+
+    def _open_session(self, subject: str) -> dict[str, Any]:
+        assert self.session_ttl_seconds is not None
+        grant, envelope = issue_session_grant(
+            self.crypto,
+            audience=self.audience,
+            subject=subject,
+            ttl_seconds=self.session_ttl_seconds,
+            key_id=self.signing_key_id,
+            issuer=self.issuer,
+        )
+        self._sessions[grant.session_id] = (
+            grant,
+            session_crypto(
+                grant,
+                "server",
+                signing_version=self.crypto.signing_version,
+                observer=self.crypto.observer,
+            ),
+        )
+        now = time.time()
+        while self._sessions:
+            oldest, (oldest_grant, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and oldest_grant.expires_at >= now:
+                break
+            del self._sessions[oldest]
+        return {"grant": grant.to_value(), "envelope": envelope}
+
+    def _session_crypto(self, session_id: str) -> GuardBandCrypto:
+        session = self._sessions.get(session_id)
+        if session is None or int(time.time()) > session[0].expires_at:
+            raise MCPError(mcp_types.INVALID_PARAMS, _UNKNOWN_SESSION)
+        return session[1]
+
+    async def _resolve_context(
+        self, name: str, arguments: dict[str, Any], ctx: ServerRequestContext[Any, Any]
+    ) -> dict[str, Any]:
+        if self.async_context_resolver is not None:
+            return await self.async_context_resolver(name, arguments, ctx)
+        return self.context_resolver(name, arguments, ctx)
 
-    def _wrap_text_blocks(
+    async def _wrap_text_blocks(
         self,
         result: CallToolResult,
         policy: MCPToolPolicy,
-        tool_name: str,
-        call_id: str,
-        application_context: dict[str, Any],
-        arguments: dict[str, Any],
+        call: _CallContext,
+        dumped_blocks: list[dict[str, Any]],
     ) -> CallToolResult:
-        blocks = []
-        for index, block in enumerate(result.content):
-            if not isinstance(block, TextContent):
-                blocks.append(block)
-                continue
-            if "⟪INERT:START" in block.text or "⟪INERT:END" in block.text:
-                raise MCPError(
-                    mcp_types.INTERNAL_ERROR,
-                    "Tool output contains reserved Guard Band markers",
-                )
-            wrapped = self.crypto.wrap_content(
-                block.text,
-                _mcp_context(
-                    audience=self.audience,
-                    direction="output-text",
-                    tool_name=tool_name,
-                    call_id=call_id,
-                    application_context=application_context,
-                    arguments=arguments,
-                    content_index=index,
-                ),
-                key_id=self.signing_key_id,
-                issuer=self.issuer,
-                ttl_seconds=policy.ttl_seconds,
+        indexes, texts = _text_blocks(result)
+        if any("⟪INERT:START" in text or "⟪INERT:END" in text for text in texts):
+            raise MCPError(
+                mcp_types.INTERNAL_ERROR,
+                "Tool output contains reserved Guard Band markers",
             )
-            blocks.append(block.model_copy(update={"text": wrapped}))
+        # One signer for the batch: the key is resolved and the block context
+        # canonicalized once, with each block's content_index spliced in.
+        signer = call.crypto.signer(
+            call.context("output-text"),
+            key_id=call.key_id,
+            issuer=self.issuer,
+            ttl_seconds=policy.ttl_seconds,
+            index_field="content_index",
+            kind=call.band_kind,
+        )
+        wrapped_texts = await _per_block(self.executor, signer.wrap, texts, indexes)
+        blocks = list(result.content)
+        for index, wrapped in zip(indexes, wrapped_texts, strict=True):
+            blocks[index] = blocks[index].model_copy(update={"text": wrapped})
+            dumped_blocks[index]["text"] = wrapped
         return result.model_copy(update={"content": blocks})
 
 
@@ -294,11 +1024,23 @@ class GuardBandMCPClient:
         issuer: str = "mcp-client",
         authorizer: ClientAuthorizer | None = None,
         max_payload_bytes: int = DEFAULT_MAX_MCP_PAYLOAD_BYTES,
+        observer: GuardBandObserver | None = None,
+        executor: Executor | None = None,
+        use_sessions: bool = False,
+        session_renew_seconds: int = 60,
+        executor_threshold_bytes: int = 0,
+        max_concurrent_verifications: int | None = None,
     ) -> None:
         if not audience:
             raise ValueError("audience is required")
         if max_payload_bytes <= 0:
             raise ValueError("max_payload_bytes must be positive")
+        if session_renew_seconds < 0:
+            raise ValueError("session_renew_seconds must not be negative")
+        if executor_threshold_bytes < 0:
+            raise ValueError("executor_threshold_bytes must not be negative")
+        if max_concurrent_verifications is not None and max_concurrent_verifications <= 0:
+            raise ValueError("max_concurrent_verifications must be positive")
         self.client = client
         self.crypto = crypto
         self.audience = audience
@@ -307,6 +1049,18 @@ class GuardBandMCPClient:
         self.issuer = issuer
         self.authorizer = authorizer
         self.max_payload_bytes = max_payload_bytes
+        self.observer = observer
+        self.executor = executor
+        self.use_sessions = use_sessions
+        self.session_renew_seconds = session_renew_seconds
+        self.executor_threshold_bytes = executor_threshold_bytes
+        self.max_concurrent_verifications = max_concurrent_verifications
+        self._verification_slots = (
+            None
+            if max_concurrent_verifications is None
+            else asyncio.Semaphore(max_concurrent_verifications)
+        )
+        self._session: tuple[SessionGrant, GuardBandCrypto] | None = None
 
     async def call_tool(
         self,
@@ -324,110 +1078,213 @@ class GuardBandMCPClient:
             raise TypeError("guard_context must be a dict")
         if not policy.enabled:
             return await self.client.call_tool(name, arguments, meta=meta, **kwargs)
-        if _payload_size(arguments) > self.max_payload_bytes:
+        observer = self.observer
+        if observer is None:
+            return await self._call_guarded(
+                name, arguments, policy, application_context, meta, None, kwargs
+            )
+        timer = PhaseTimer()
+        try:
+            result = await self._call_guarded(
+                name, arguments, policy, application_context, meta, timer, kwargs
+            )
+        except Exception as exc:
+            error = str(exc) if isinstance(exc, (MCPError, MCPGuardBandError)) else None
+            observer.observe(timer.finish("mcp.client_call", False, error))
+            raise
+        observer.observe(timer.finish("mcp.client_call", True))
+        return result
+
+    async def _call_guarded(
+        self,
+        name: str,
+        arguments: dict[str, Any],
+        policy: MCPToolPolicy,
+        application_context: dict[str, Any],
+        meta: dict[str, Any] | None,
+        timer: PhaseTimer | None,
+        kwargs: dict[str, Any],
+    ) -> CallToolResult:
+        argument_bytes = canonical_json_size(arguments, self.max_payload_bytes)
+        if timer is not None:
+            timer.payload_bytes = argument_bytes
+        if argument_bytes > self.max_payload_bytes:
             raise MCPGuardBandError("Guarded MCP payload is too large")
+        session = self._current_session()
+        if session is None:
+            crypto, key_id = self.crypto, self.signing_key_id
+        else:
+            crypto, key_id = session[1], None
+        call = _CallContext(
+            arguments, audience=self.audience, tool_name=name, crypto=crypto, key_id=key_id
+        )
         if self.authorizer is not None:
             self.authorizer(name, arguments, application_context)
 
         outgoing_meta = dict(meta or {})
         if MCP_GUARD_BAND_ID in outgoing_meta:
             raise MCPGuardBandError(f"{MCP_GUARD_BAND_ID} metadata is reserved")
-        call_id = secrets.token_urlsafe(16)
+        call_id = call.call_id = secrets.token_urlsafe(16)
+        call.application_context = application_context
         guard_meta: dict[str, Any] = {
             "version": MCP_GUARD_BAND_VERSION,
             "call_id": call_id,
         }
+        requests_session = session is None and self.use_sessions and policy.guard_inputs
+        if session is not None:
+            guard_meta["session_id"] = session[0].session_id
+        elif requests_session:
+            guard_meta["session"] = "request"
         if policy.guard_inputs:
-            guard_meta["input"] = self.crypto.sign_value(
-                arguments,
-                _mcp_context(
-                    audience=self.audience,
-                    direction="input",
-                    tool_name=name,
-                    call_id=call_id,
-                    application_context=application_context,
-                    arguments=arguments,
-                ),
-                key_id=self.signing_key_id,
+            guard_meta["input"] = crypto.sign_value(
+                call.arguments,
+                call.context("input"),
+                key_id=key_id,
                 issuer=self.issuer,
                 ttl_seconds=policy.ttl_seconds,
             )
         outgoing_meta[MCP_GUARD_BAND_ID] = guard_meta
+        if timer is not None:
+            timer.mark("sign_input")
 
-        result = await self.client.call_tool(name, arguments, meta=outgoing_meta, **kwargs)
-        if policy.guard_outputs:
-            self._verify_result(
-                result,
-                policy,
-                name,
-                call_id,
-                application_context,
-                arguments,
+        try:
+            result = await self.client.call_tool(name, arguments, meta=outgoing_meta, **kwargs)
+        except MCPError as exc:
+            if session is None or exc.message != _UNKNOWN_SESSION:
+                raise
+            # The server no longer knows the session, for example after a
+            # restart. It rejected the call before the tool ran, so retrying
+            # without the session is safe.
+            if self._session is session:
+                self._session = None
+            return await self._call_guarded(
+                name, arguments, policy, application_context, meta, timer, kwargs
             )
+        if timer is not None:
+            timer.mark("call")
+        if policy.guard_outputs:
+            await self._verify_result(result, policy, call, timer)
+            if timer is not None:
+                timer.mark("verify_output")
+        if requests_session:
+            self._accept_session(result, call, guard_meta["input"]["key_id"])
         return result
 
-    def _verify_result(
+    def _current_session(self) -> tuple[SessionGrant, GuardBandCrypto] | None:
+        session = self._session
+        if session is None:
+            return None
+        # Renew early so that no call outlives the keys that must verify it.
+        if time.time() + self.session_renew_seconds >= session[0].expires_at:
+            self._session = None
+            return None
+        return session
+
+    def _accept_session(self, result: CallToolResult, call: _CallContext, subject: str) -> None:
+        guard_meta = _guard_meta(result.meta)
+        if guard_meta is None or guard_meta.get("call_id") != call.call_id:
+            return
+        offer = guard_meta.get("session")
+        if offer is None:
+            return  # the server does not offer sessions
+        try:
+            if not isinstance(offer, dict):
+                raise ValueError("Malformed session grant")
+            grant = verify_session_grant(
+                self.crypto, offer.get("grant"), offer.get("envelope"), audience=self.audience
+            )
+            if grant.subject != subject:
+                raise ValueError("Session grant names another subject")
+        except ValueError:
+            raise MCPGuardBandError("Guard Band session grant verification failed") from None
+        self._session = (
+            grant,
+            session_crypto(
+                grant,
+                "client",
+                signing_version=self.crypto.signing_version,
+                observer=self.crypto.observer,
+            ),
+        )
+
+    async def _verify_result(
         self,
         result: CallToolResult,
         policy: MCPToolPolicy,
-        tool_name: str,
-        call_id: str,
-        application_context: dict[str, Any],
-        arguments: dict[str, Any],
+        call: _CallContext,
+        timer: PhaseTimer | None = None,
+    ) -> None:
+        # Large results are verified in the executor, so that canonicalizing
+        # and verifying them does not stall other calls on the event loop.
+        # The text length is a cheap lower bound on the canonical size.
+        executor = self.executor
+        if executor is None or _text_length(result) < self.executor_threshold_bytes:
+            self._verify_output(result, call, timer)
+            if policy.wrap_text_outputs:
+                await self._verify_text_blocks(result, call, timer, None)
+            return
+        slots = self._verification_slots
+        async with contextlib.nullcontext() if slots is None else slots:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(executor, self._verify_output, result, call, timer)
+            if policy.wrap_text_outputs:
+                await self._verify_text_blocks(result, call, timer, executor)
+
+    def _verify_output(
+        self, result: CallToolResult, call: _CallContext, timer: PhaseTimer | None
     ) -> None:
-        payload = _result_payload(result)
-        if _payload_size(payload) > self.max_payload_bytes:
+        dumped = _result_payload(result)
+        if canonical_json_size(dumped, self.max_payload_bytes) > self.max_payload_bytes:
             raise MCPGuardBandError("Guarded MCP result is too large")
+        payload = PreparedValue(dumped)
         guard_meta = _guard_meta(result.meta)
         if (
             guard_meta is None
             or guard_meta.get("version") != MCP_GUARD_BAND_VERSION
-            or guard_meta.get("call_id") != call_id
+            or guard_meta.get("call_id") != call.call_id
         ):
             raise MCPGuardBandError("Valid Guard Band result metadata is required")
-        verification = self.crypto.verify_value(
+        verification = call.crypto.verify_value(
             payload,
             guard_meta.get("output"),
-            _mcp_context(
-                audience=self.audience,
-                direction="output",
-                tool_name=tool_name,
-                call_id=call_id,
-                application_context=application_context,
-                arguments=arguments,
-            ),
+            call.context("output"),
         )
         if not verification.get("valid"):
+            if timer is not None:
+                timer.error = verification.get("error")
             raise MCPGuardBandError("Guard Band output verification failed")
 
-        if not policy.wrap_text_outputs:
-            return
-        for index, block in enumerate(result.content):
-            if not isinstance(block, TextContent):
-                continue
-            text_verification = self.crypto.extract_and_verify(
-                block.text,
-                _mcp_context(
-                    audience=self.audience,
-                    direction="output-text",
-                    tool_name=tool_name,
-                    call_id=call_id,
-                    application_context=application_context,
-                    arguments=arguments,
-                    content_index=index,
-                ),
-            )
+    async def _verify_text_blocks(
+        self,
+        result: CallToolResult,
+        call: _CallContext,
+        timer: PhaseTimer | None,
+        executor: Executor | None,
+    ) -> None:
+        indexes, texts = _text_blocks(result)
+        verifier = call.crypto.verifier(call.context("output-text"), index_field="content_index")
+        verifications = await _per_block(executor, verifier.verify, texts, indexes)
+        # Report the first failing block, as verifying them one by one would.
+        for text_verification in verifications:
             if not text_verification.get("valid"):
+                if timer is not None:
+                    timer.error = text_verification.get("error")
                 raise MCPGuardBandError("Guard Band text output verification failed")
 
 
 __all__ = [
     "DEFAULT_MAX_MCP_PAYLOAD_BYTES",
+    "DEFAULT_MAX_MCP_SESSIONS",
+    "DEFAULT_MAX_MCP_TASKS",
     "MCP_GUARD_BAND_ID",
     "MCP_GUARD_BAND_VERSION",
     "GuardBandMCPClient",
     "GuardBandMCPServerExtension",
+    "MCPContextCache",
     "MCPGuardBandError",
+    "MCPInputReplayLedger",
+    "MCPReplayLedger",
+    "MCPTaskStore",
     "MCPToolPolicy",
     "guard_bands_client_capability",
 ]
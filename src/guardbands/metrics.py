@@ -0,0 +1,88 @@
+"""Dependency-free latency aggregation shared by ledgers and integrations.
+
+Histograms keep fixed, per-bucket counts so recording is a single list
+increment and snapshots can be merged or exported without retaining individual
+samples.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+
+# Upper bounds in seconds, spanning sub-100µs MAC checks to multi-second
+# datastore stalls. The implicit final bucket is +Inf.
+DEFAULT_LATENCY_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations in seconds."""
+
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.bounds = tuple(bounds)
+        if list(self.bounds) != sorted(set(self.bounds)):
+            raise ValueError("Histogram bounds must be strictly increasing")
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: LatencyHistogram) -> None:
+        if other.bounds != self.bounds:
+            raise ValueError("Cannot merge histograms with different bounds")
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q: float) -> float:
+        """Return the bucket upper bound containing quantile ``q``.
+
+        Observations above the last bound report ``inf``. An empty histogram
+        reports ``0.0``.
+        """
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("Quantile must be between 0 and 1")
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if seen >= rank and value:
+                return self.bounds[index] if index < len(self.bounds) else float("inf")
+        return float("inf")
+
+    def snapshot(self) -> dict[str, object]:
+        """Return a JSON-compatible summary for logs and benchmark output."""
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "buckets": {
+                ("+Inf" if index == len(self.bounds) else repr(self.bounds[index])): value
+                for index, value in enumerate(self.counts)
+            },
+        }
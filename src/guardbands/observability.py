@@ -0,0 +1,248 @@
+"""Optional per-phase instrumentation for Guard Band verification paths.
+
+Components accept an ``observer`` and check it once per operation. With no
+observer attached the only cost is that attribute check; with one attached,
+each operation reports a single :class:`GuardBandEvent` after it finishes.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Protocol
+
+from .metrics import LatencyHistogram
+
+# Payload size bounds in bytes, from short text bands to the 1 MB MCP limit.
+# The implicit final bucket is +Inf.
+DEFAULT_SIZE_BUCKETS = (
+    100.0,
+    1_000.0,
+    10_000.0,
+    50_000.0,
+    100_000.0,
+    1_000_000.0,
+    10_000_000.0,
+)
+
+_FAILURE_PREFIXES = (
+    ("Guard band expired", "expired"),
+    ("Replay detected", "replay"),
+    ("Guard Band input replay detected", "replay"),
+    ("Replay ledger unavailable", "ledger_unavailable"),
+    ("Replay snapshot failed", "snapshot_failed"),
+    ("Unknown key id", "unknown_key"),
+    ("Signature algorithm mismatch", "algorithm_mismatch"),
+    ("MAC verification failed", "signature"),
+    ("Signature verification failed", "signature"),
+    ("Parse error", "error"),
+    ("Value verification error", "error"),
+)
+
+
+def failure_category(error: str | None) -> str:
+    """Collapse a verification error message into a low-cardinality category.
+
+    Messages that describe malformed input fall into ``malformed``, so
+    attacker-chosen text can never create new metric labels.
+    """
+    if not error:
+        return "error"
+    for prefix, category in _FAILURE_PREFIXES:
+        if error.startswith(prefix):
+            return category
+    if "exceeds" in error or "too large" in error:
+        return "too_large"
+    return "malformed"
+
+
+@dataclass(frozen=True, slots=True)
+class GuardBandEvent:
+    """Timings and outcome of one instrumented operation.
+
+    ``phases`` maps phase names (``parse``, ``resolve``, ``canonicalize``,
+    ``sign``, ``verify``, ``freshness``, ``ledger_consume``, and
+    integration-specific phases) to seconds, in the order they ran.
+    ``failure`` is a :func:`failure_category` value when ``valid`` is false.
+    """
+
+    operation: str
+    valid: bool
+    duration: float
+    phases: dict[str, float] = field(default_factory=dict)
+    failure: str | None = None
+    payload_bytes: int | None = None
+    algorithm: str | None = None
+
+
+class GuardBandObserver(Protocol):
+    """Receiver for instrumentation events.
+
+    Observers run synchronously on the caller's thread, so implementations
+    should only aggregate and must not block.
+    """
+
+    def observe(self, event: GuardBandEvent) -> None: ...
+
+
+class PhaseTimer:
+    """Accumulate consecutive phase durations for one operation."""
+
+    __slots__ = ("algorithm", "error", "payload_bytes", "phases", "_last", "_started")
+
+    def __init__(self) -> None:
+        self._started = self._last = perf_counter()
+        self.phases: dict[str, float] = {}
+        self.algorithm: str | None = None
+        self.payload_bytes: int | None = None
+        # The most specific failure seen so far. Integrations set it before
+        # raising or responding with a generic message.
+        self.error: str | None = None
+
+    def mark(self, phase: str) -> None:
+        """Attribute the time since the previous mark to ``phase``."""
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last)
+        self._last = now
+
+    def finish(
+        self,
+        operation: str,
+        valid: bool,
+        error: str | None = None,
+    ) -> GuardBandEvent:
+        return GuardBandEvent(
+            operation=operation,
+            valid=valid,
+            duration=perf_counter() - self._started,
+            phases=self.phases,
+            failure=None if valid else failure_category(self.error or error),
+            payload_bytes=self.payload_bytes,
+            algorithm=self.algorithm,
+        )
+
+    def finish_result(self, operation: str, result: dict[str, Any]) -> GuardBandEvent:
+        """Finish from a ``{"valid": ..., "error": ...}`` verification result."""
+        valid = bool(result.get("valid"))
+        return self.finish(operation, valid, None if valid else result.get("error"))
+
+
+class HistogramObserver:
+    """Reference observer that aggregates events into in-memory histograms.
+
+    Durations are kept per ``(operation, phase)`` (the phase ``total`` holds
+    whole-operation time), payload sizes per operation, and outcome counts per
+    ``(operation, outcome)`` where the outcome is ``valid`` or a failure
+    category.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._latency: dict[tuple[str, str], LatencyHistogram] = {}
+        self._sizes: dict[str, LatencyHistogram] = {}
+        self._outcomes: dict[tuple[str, str], int] = {}
+
+    def observe(self, event: GuardBandEvent) -> None:
+        outcome = "valid" if event.valid else event.failure or "error"
+        with self._lock:
+            self._histogram(event.operation, "total").observe(event.duration)
+            for phase, seconds in event.phases.items():
+                self._histogram(event.operation, phase).observe(seconds)
+            if event.payload_bytes is not None:
+                sizes = self._sizes.get(event.operation)
+                if sizes is None:
+                    sizes = self._sizes[event.operation] = LatencyHistogram(DEFAULT_SIZE_BUCKETS)
+                sizes.observe(event.payload_bytes)
+            key = (event.operation, outcome)
+            self._outcomes[key] = self._outcomes.get(key, 0) + 1
+
+    def latency(self, operation: str, phase: str = "total") -> LatencyHistogram:
+        """Return a copy of the latency histogram for one operation phase."""
+        copy = LatencyHistogram()
+        with self._lock:
+            histogram = self._latency.get((operation, phase))
+            if histogram is not None:
+                copy.merge(histogram)
+        return copy
+
+    def outcomes(self) -> dict[tuple[str, str], int]:
+        with self._lock:
+            return dict(self._outcomes)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-compatible summary of everything observed."""
+        with self._lock:
+            operations: dict[str, Any] = {}
+            for (operation, phase), histogram in sorted(self._latency.items()):
+                entry = operations.setdefault(operation, {"phases": {}, "outcomes": {}})
+                entry["phases"][phase] = histogram.snapshot()
+            for (operation, outcome), count in sorted(self._outcomes.items()):
+                operations[operation]["outcomes"][outcome] = count
+            for operation, sizes in sorted(self._sizes.items()):
+                operations[operation]["payload_bytes"] = sizes.snapshot()
+        return operations
+
+    def _histogram(self, operation: str, phase: str) -> LatencyHistogram:
+        histogram = self._latency.get((operation, phase))
+        if histogram is None:
+            histogram = self._latency[(operation, phase)] = LatencyHistogram()
+        return histogram
+
+
+def observe_consume(
+    observer: GuardBandObserver,
+    operation: str,
+    consume: Callable[[], bool],
+) -> bool:
+    """Time one ledger call and report it; ledger errors count as unavailable."""
+    timer = PhaseTimer()
+    try:
+        fresh = consume()
+    except Exception:
+        _report_consume(observer, operation, timer, None)
+        raise
+    _report_consume(observer, operation, timer, fresh)
+    return fresh
+
+
+async def observe_consume_async(
+    observer: GuardBandObserver,
+    operation: str,
+    consume: Callable[[], Awaitable[bool]],
+) -> bool:
+    """Async variant of :func:`observe_consume`."""
+    timer = PhaseTimer()
+    try:
+        fresh = await consume()
+    except Exception:
+        _report_consume(observer, operation, timer, None)
+        raise
+    _report_consume(observer, operation, timer, fresh)
+    return fresh
+
+
+def _report_consume(
+    observer: GuardBandObserver,
+    operation: str,
+    timer: PhaseTimer,
+    fresh: bool | None,
+) -> None:
+    timer.mark("ledger_consume")
+    if fresh is None:
+        observer.observe(timer.finish(operation, False, "Replay ledger unavailable"))
+    else:
+        observer.observe(timer.finish(operation, fresh, "Replay detected"))
+
+
+__all__ = [
+    "DEFAULT_SIZE_BUCKETS",
+    "GuardBandEvent",
+    "GuardBandObserver",
+    "HistogramObserver",
+    "PhaseTimer",
+    "failure_category",
+    "observe_consume",
+    "observe_consume_async",
+]
@@ -0,0 +1,282 @@
+"""Prometheus text-format metrics for Guard Band observers.
+
+:class:`PrometheusCollector` is a :class:`~guardbands.observability.GuardBandObserver`
+that records into per-thread shards, so recording on the request path takes
+no lock. Shards are merged only when the endpoint is scraped.
+:func:`metrics_endpoint` exposes a collector as a plain ASGI application with
+no dependency beyond the standard library.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from typing import Any
+
+from .metrics import DEFAULT_LATENCY_BUCKETS, LatencyHistogram
+from .observability import DEFAULT_SIZE_BUCKETS, GuardBandEvent
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_NAMESPACE = "guardbands"
+
+_Labels = tuple[str, ...]
+ASGIMessage = dict[str, Any]
+ASGIReceive = Callable[[], Awaitable[ASGIMessage]]
+ASGISend = Callable[[ASGIMessage], Awaitable[None]]
+
+
+class _Shard:
+    """Metrics recorded by one thread. Only that thread ever writes to it."""
+
+    __slots__ = ("durations", "outcomes", "phases", "replays", "sizes")
+
+    def __init__(self) -> None:
+        self.outcomes: dict[_Labels, int] = {}
+        self.replays: dict[_Labels, int] = {}
+        self.durations: dict[_Labels, LatencyHistogram] = {}
+        self.phases: dict[_Labels, LatencyHistogram] = {}
+        self.sizes: dict[_Labels, LatencyHistogram] = {}
+
+
+class PrometheusCollector:
+    """Aggregate Guard Band events into Prometheus counters and histograms.
+
+    Exported series, with ``<ns>`` the namespace:
+
+    - ``<ns>_operations_total{operation,outcome}``: outcome is ``valid`` or a
+      failure category such as ``signature`` or ``replay``
+    - ``<ns>_replay_hits_total{operation}``
+    - ``<ns>_operation_duration_seconds{operation}``
+    - ``<ns>_phase_duration_seconds{operation,phase}``, which includes ledger
+      latency as ``phase="ledger_consume"``
+    - ``<ns>_payload_bytes{operation}``: request body or payload size
+
+    Each process keeps its own series. Under multi-process servers, pass a
+    distinguishing ``const_labels`` value per worker (the default adds the
+    process id as ``pid``) and aggregate in PromQL.
+    """
+
+    def __init__(
+        self,
+        *,
+        namespace: str = DEFAULT_NAMESPACE,
+        const_labels: Mapping[str, str] | None = None,
+        latency_buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+        size_buckets: Iterable[float] = DEFAULT_SIZE_BUCKETS,
+    ) -> None:
+        self.namespace = namespace
+        self.const_labels = (
+            dict(const_labels) if const_labels is not None else {"pid": str(os.getpid())}
+        )
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        LatencyHistogram(self.latency_buckets)  # validate bounds eagerly
+        LatencyHistogram(self.size_buckets)
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._shards_lock = threading.Lock()
+
+    def observe(self, event: GuardBandEvent) -> None:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._register_shard()
+        operation = (event.operation,)
+        outcome = (event.operation, "valid" if event.valid else event.failure or "error")
+        shard.outcomes[outcome] = shard.outcomes.get(outcome, 0) + 1
+        if event.failure == "replay":
+            shard.replays[operation] = shard.replays.get(operation, 0) + 1
+        _histogram(shard.durations, operation, self.latency_buckets).observe(event.duration)
+        for phase, seconds in event.phases.items():
+            _histogram(shard.phases, (event.operation, phase), self.latency_buckets).observe(
+                seconds
+            )
+        if event.payload_bytes is not None:
+            _histogram(shard.sizes, operation, self.size_buckets).observe(event.payload_bytes)
+
+    def render(self) -> str:
+        """Merge every shard and return the Prometheus text exposition."""
+        outcomes: dict[_Labels, int] = {}
+        replays: dict[_Labels, int] = {}
+        durations: dict[_Labels, LatencyHistogram] = {}
+        phases: dict[_Labels, LatencyHistogram] = {}
+        sizes: dict[_Labels, LatencyHistogram] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # ``dict.copy`` is atomic under the GIL, so a concurrent insert by
+            # the owning thread cannot break iteration. A histogram may be a
+            # single observation behind, which the next scrape picks up.
+            _merge_counts(outcomes, shard.outcomes.copy())
+            _merge_counts(replays, shard.replays.copy())
+            _merge_histograms(durations, shard.durations.copy())
+            _merge_histograms(phases, shard.phases.copy())
+            _merge_histograms(sizes, shard.sizes.copy())
+
+        ns = self.namespace
+        lines: list[str] = []
+        self._counter(
+            lines,
+            f"{ns}_operations_total",
+            "Guard Band operations by outcome or failure category.",
+            ("operation", "outcome"),
+            outcomes,
+        )
+        self._counter(
+            lines,
+            f"{ns}_replay_hits_total",
+            "Nonces rejected as replays.",
+            ("operation",),
+            replays,
+        )
+        self._histogram(
+            lines,
+            f"{ns}_operation_duration_seconds",
+            "Whole-operation latency in seconds.",
+            ("operation",),
+            durations,
+        )
+        self._histogram(
+            lines,
+            f"{ns}_phase_duration_seconds",
+            "Per-phase latency in seconds, including ledger consumption.",
+            ("operation", "phase"),
+            phases,
+        )
+        self._histogram(
+            lines,
+            f"{ns}_payload_bytes",
+            "Verified payload or request body size in bytes.",
+            ("operation",),
+            sizes,
+        )
+        return "\n".join(lines) + "\n"
+
+    def _register_shard(self) -> _Shard:
+        shard = _Shard()
+        self._local.shard = shard
+        with self._shards_lock:
+            self._shards.append(shard)
+        return shard
+
+    def _counter(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        label_names: _Labels,
+        values: dict[_Labels, int],
+    ) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{self._labels(label_names, labels)} {value}")
+
+    def _histogram(
+        self,
+        lines: list[str],
+        name: str,
+        help_text: str,
+        label_names: _Labels,
+        values: dict[_Labels, LatencyHistogram],
+    ) -> None:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in sorted(values.items()):
+            cumulative = 0
+            for index, count in enumerate(histogram.counts):
+                cumulative += count
+                bound = (
+                    "+Inf" if index == len(histogram.bounds) else _format(histogram.bounds[index])
+                )
+                rendered = self._labels(label_names, labels, (("le", bound),))
+                lines.append(f"{name}_bucket{rendered} {cumulative}")
+            rendered = self._labels(label_names, labels)
+            lines.append(f"{name}_sum{rendered} {_format(histogram.total)}")
+            lines.append(f"{name}_count{rendered} {histogram.count}")
+
+    def _labels(
+        self,
+        names: _Labels,
+        values: _Labels,
+        extra: tuple[tuple[str, str], ...] = (),
+    ) -> str:
+        pairs = [*self.const_labels.items(), *zip(names, values, strict=True), *extra]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def metrics_endpoint(
+    collector: PrometheusCollector,
+) -> Callable[[dict[str, Any], ASGIReceive, ASGISend], Awaitable[None]]:
+    """Return an ASGI app serving ``collector`` in Prometheus text format.
+
+    Mount it on any ASGI framework, for example
+    ``app.mount("/metrics", metrics_endpoint(collector))`` in FastAPI.
+    """
+
+    async def app(scope: dict[str, Any], receive: ASGIReceive, send: ASGISend) -> None:
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in {"GET", "HEAD"}:
+            await _respond(send, 405, b"Method Not Allowed\n", "text/plain; charset=utf-8")
+            return
+        body = collector.render().encode("utf-8")
+        await _respond(send, 200, b"" if scope["method"] == "HEAD" else body, CONTENT_TYPE)
+
+    return app
+
+
+async def _respond(send: ASGISend, status: int, body: bytes, content_type: str) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+def _histogram(
+    histograms: dict[_Labels, LatencyHistogram],
+    labels: _Labels,
+    bounds: tuple[float, ...],
+) -> LatencyHistogram:
+    histogram = histograms.get(labels)
+    if histogram is None:
+        histogram = histograms[labels] = LatencyHistogram(bounds)
+    return histogram
+
+
+def _merge_counts(target: dict[_Labels, int], source: dict[_Labels, int]) -> None:
+    for labels, value in source.items():
+        target[labels] = target.get(labels, 0) + value
+
+
+def _merge_histograms(
+    target: dict[_Labels, LatencyHistogram],
+    source: dict[_Labels, LatencyHistogram],
+) -> None:
+    for labels, histogram in source.items():
+        _histogram(target, labels, histogram.bounds).merge(histogram)
+
+
+def _format(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+__all__ = [
+    "CONTENT_TYPE",
+    "DEFAULT_NAMESPACE",
+    "PrometheusCollector",
+    "metrics_endpoint",
+]
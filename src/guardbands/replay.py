@@ -7,12 +7,24 @@ boundary.
 
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import mmap
+import os
 import sqlite3
+import struct
+import sys
+import tempfile
+import threading
 import time
+from array import array
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator, Sequence
 from pathlib import Path
 from typing import Protocol
 
 from .crypto import GuardBandContext, GuardBandResult, _canonical_json_v1
+from .observability import GuardBandObserver, PhaseTimer, observe_consume
 
 
 def _canonical_replay_value(value: object) -> str:
@@ -20,6 +32,46 @@ def _canonical_replay_value(value: object) -> str:
     return _canonical_json_v1(value)
 
 
+def _ledger_digest(context: GuardBandContext, key_id: str, nonce: str) -> bytes:
+    """Return a fixed-size SHA-256 identity for a consumed nonce."""
+    ledger_key = _canonical_replay_value({"context": context, "key_id": key_id, "nonce": nonce})
+    return hashlib.sha256(ledger_key.encode("utf-8")).digest()
+
+
+def _ledger_digests(context: GuardBandContext, entries: NonceEntries) -> list[bytes]:
+    """Batch ``_ledger_digest``, canonicalizing the shared context once."""
+    # Splicing the pre-serialized context into the sorted-key object is
+    # byte-identical to serializing the whole object.
+    prefix = '{"context":' + _canonical_replay_value(context) + ',"key_id":'
+    return [
+        hashlib.sha256(
+            (
+                prefix
+                + _canonical_replay_value(key_id)
+                + ',"nonce":'
+                + _canonical_replay_value(nonce)
+                + "}"
+            ).encode("utf-8")
+        ).digest()
+        for key_id, nonce in entries
+    ]
+
+
+class ReplayLedgerUnavailableError(RuntimeError):
+    """Raised when a ledger cannot decide whether a nonce is fresh.
+
+    Enforcement boundaries treat this as a verification failure so an outage
+    of a networked ledger never degrades into accepting replays.
+    """
+
+
+NonceEntries = Sequence[tuple[str, str]]
+
+
+def _has_duplicates(entries: Sequence[Hashable]) -> bool:
+    return len(set(entries)) != len(entries)
+
+
 class ReplayLedger(Protocol):
     """Storage contract for atomically consuming a verified nonce."""
 
@@ -31,13 +83,120 @@ class ReplayLedger(Protocol):
         now: float | None = None,
     ) -> bool: ...
 
+    def consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None = None,
+    ) -> bool:
+        """Consume ``(key_id, nonce)`` pairs all-or-nothing.
+
+        Returns ``True`` only when every nonce was fresh and all of them are
+        now recorded. Native implementations record nothing on rejection.
+        This default, inherited by ledgers that subclass the protocol, can
+        only stop at the first replay: nonces consumed before it stay
+        recorded, which keeps rejection fail-closed but is not a rollback.
+        """
+        return _consume_sequentially(self, context, entries, now)
+
+
+class AsyncReplayLedger(Protocol):
+    """Storage contract for ledgers consumed from an asyncio event loop."""
+
+    async def consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None = None,
+    ) -> bool: ...
+
+    async def consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None = None,
+    ) -> bool:
+        """Async counterpart of ``ReplayLedger.consume_many``."""
+        if _has_duplicates(entries):
+            return False
+        for key_id, nonce in entries:
+            if not await self.consume(context, key_id, nonce, now):
+                return False
+        return True
+
+
+def _consume_sequentially(
+    ledger: ReplayLedger,
+    context: GuardBandContext,
+    entries: NonceEntries,
+    now: float | None,
+) -> bool:
+    if _has_duplicates(entries):
+        return False
+    return all(ledger.consume(context, key_id, nonce, now) for key_id, nonce in entries)
+
+
+def consume_many(
+    ledger: ReplayLedger,
+    context: GuardBandContext,
+    entries: NonceEntries,
+    now: float | None = None,
+) -> bool:
+    """Consume a batch through ``ledger``, falling back for third-party ledgers.
+
+    Ledgers that only implement ``consume`` structurally get the protocol's
+    sequential fallback semantics.
+    """
+    native = getattr(ledger, "consume_many", None)
+    if native is None:
+        return _consume_sequentially(ledger, context, entries, now)
+    return bool(native(context, entries, now))
+
 
 class NonceReplayLedger:
-    """In-memory nonce ledger for tests and single-process applications."""
+    """In-memory nonce ledger for tests and single-process applications.
+
+    With ``snapshot_path`` the ledger restores consumed nonces at startup and
+    writes a snapshot on ``close()`` and, if ``snapshot_interval_seconds`` is
+    set, periodically from a background thread. A restart then reopens at
+    most one snapshot interval of replay window instead of a full TTL.
+    """
 
-    def __init__(self, ttl_seconds: int) -> None:
+    def __init__(
+        self,
+        ttl_seconds: int,
+        *,
+        snapshot_path: str | os.PathLike[str] | None = None,
+        snapshot_interval_seconds: float | None = None,
+        observer: GuardBandObserver | None = None,
+    ) -> None:
+        if snapshot_interval_seconds is not None:
+            if snapshot_path is None:
+                raise ValueError("snapshot_interval_seconds requires snapshot_path")
+            if snapshot_interval_seconds <= 0:
+                raise ValueError("snapshot_interval_seconds must be positive")
         self.ttl_seconds = ttl_seconds
-        self._seen: dict[tuple[str, str, str], float] = {}
+        self.snapshot_path = Path(snapshot_path) if snapshot_path is not None else None
+        self.snapshot_interval_seconds = snapshot_interval_seconds
+        self.observer = observer
+        # Insertion order tracks expiry order whenever time moves forward, so
+        # pruning only ever inspects the oldest entries.
+        self._seen: OrderedDict[bytes, float] = OrderedDict()
+        self._restored: _ReplaySnapshot | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._snapshot_thread: threading.Thread | None = None
+
+        if self.snapshot_path is not None and self.snapshot_path.exists():
+            self.load_snapshot(self.snapshot_path)
+        if snapshot_interval_seconds is not None:
+            self._snapshot_thread = threading.Thread(
+                target=self._snapshot_periodically,
+                name="guardbands-replay-snapshot",
+                daemon=True,
+            )
+            self._snapshot_thread.start()
 
     def consume(
         self,
@@ -45,29 +204,307 @@ class NonceReplayLedger:
         key_id: str,
         nonce: str,
         now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume(context, key_id, nonce, now)
+        return observe_consume(
+            observer, "ledger.consume", lambda: self._consume(context, key_id, nonce, now)
+        )
+
+    def consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume_many(context, entries, now)
+        return observe_consume(
+            observer, "ledger.consume_many", lambda: self._consume_many(context, entries, now)
+        )
+
+    def _consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None,
     ) -> bool:
         current_time = time.time() if now is None else now
-        self._prune(current_time)
+        digest = _ledger_digest(context, key_id, nonce)
+        with self._lock:
+            self._prune(current_time)
+            if self._is_consumed(digest, current_time):
+                return False
+            self._record(digest, current_time + self.ttl_seconds)
+        return True
 
-        ledger_key = (_canonical_replay_value(context), key_id, nonce)
-        if ledger_key in self._seen:
+    def _consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None,
+    ) -> bool:
+        current_time = time.time() if now is None else now
+        digests = _ledger_digests(context, entries)
+        if _has_duplicates(digests):
             return False
-
-        self._seen[ledger_key] = current_time + self.ttl_seconds
+        with self._lock:
+            self._prune(current_time)
+            if any(self._is_consumed(digest, current_time) for digest in digests):
+                return False
+            expires_at = current_time + self.ttl_seconds
+            for digest in digests:
+                self._record(digest, expires_at)
         return True
 
+    def save_snapshot(
+        self,
+        path: str | os.PathLike[str] | None = None,
+        now: float | None = None,
+    ) -> int:
+        """Atomically write unexpired entries to ``path`` and return the count."""
+        target = Path(path) if path is not None else self.snapshot_path
+        if target is None:
+            raise ValueError("No snapshot path configured")
+        current_time = time.time() if now is None else now
+        with self._lock:
+            live = list(self._seen.items())
+            restored = self._restored
+        entries = dict(restored.unexpired(current_time)) if restored is not None else {}
+        entries.update((digest, expires_at) for digest, expires_at in live)
+        return _write_replay_snapshot(target, entries, current_time)
+
+    def load_snapshot(self, path: str | os.PathLike[str], now: float | None = None) -> int:
+        """Map a snapshot written by ``save_snapshot`` and return its entry count.
+
+        Loading is O(1) in the number of entries: the file is memory-mapped
+        and consulted by binary search until its newest entry expires, and
+        expired entries are skipped at lookup. A snapshot whose every entry
+        has already expired is not mapped at all. Malformed files raise
+        ``ValueError``.
+        """
+        current_time = time.time() if now is None else now
+        snapshot = _ReplaySnapshot.open(Path(path))
+        if snapshot.max_expires_at <= current_time:
+            snapshot.close()
+            return 0
+        # A replaced or expired view is dropped rather than closed: a
+        # concurrent save_snapshot may still be reading it, and the mapping is
+        # released when the last reference goes away.
+        with self._lock:
+            self._restored = snapshot
+        return len(snapshot)
+
+    def close(self) -> None:
+        """Stop periodic snapshots and write a final one if configured."""
+        self._stop.set()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+            self._snapshot_thread = None
+        if self.snapshot_path is not None:
+            self.save_snapshot()
+
+    def __enter__(self) -> NonceReplayLedger:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _is_consumed(self, digest: bytes, now: float) -> bool:
+        expires_at = self._seen.get(digest)
+        if expires_at is not None and expires_at > now:
+            return True
+        return self._restored is not None and self._restored.contains(digest, now)
+
+    def _record(self, digest: bytes, expires_at: float) -> None:
+        self._seen[digest] = expires_at
+        self._seen.move_to_end(digest)
+
     def _prune(self, now: float) -> None:
-        expired = [key for key, expires_at in self._seen.items() if expires_at <= now]
-        for key in expired:
-            del self._seen[key]
+        while self._seen:
+            oldest = next(iter(self._seen))
+            if self._seen[oldest] > now:
+                break
+            del self._seen[oldest]
+        if self._restored is not None and self._restored.max_expires_at <= now:
+            self._restored = None
+
+    def _snapshot_periodically(self) -> None:
+        assert self.snapshot_interval_seconds is not None
+        while not self._stop.wait(self.snapshot_interval_seconds):
+            timer = PhaseTimer()
+            try:
+                self.save_snapshot()
+            except OSError:
+                # A full disk or an unwritable target may be transient. Ending
+                # the thread would leave a stale snapshot for the next restart.
+                saved = False
+            else:
+                saved = True
+            observer = self.observer
+            if observer is not None:
+                timer.mark("snapshot")
+                observer.observe(timer.finish("ledger.snapshot", saved, "Replay snapshot failed"))
+
+
+# Snapshot layout (little-endian): header, a 65,537-entry offset table indexed
+# by the first two digest bytes, every digest in ascending order, then the
+# float64 expiry of each digest in the same order. Fixed-size records make
+# restore a single mmap and lookup a bucketed binary search.
+_SNAPSHOT_MAGIC = b"GBRPLSNP"
+_SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<8sIIQdd")
+_SNAPSHOT_BUCKETS = 1 << 16
+_SNAPSHOT_INDEX_ITEM = struct.Struct("<I")
+_SNAPSHOT_EXPIRY = struct.Struct("<d")
+_DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+def _write_replay_snapshot(path: Path, entries: dict[bytes, float], now: float) -> int:
+    # Bucketing by digest prefix keeps every sort small, so a periodic writer
+    # thread never holds the GIL for one long sort of the whole ledger.
+    buckets: list[list[tuple[bytes, float]]] = [[] for _ in range(_SNAPSHOT_BUCKETS)]
+    for item in entries.items():
+        if item[1] > now:
+            digest = item[0]
+            buckets[digest[0] << 8 | digest[1]].append(item)
+
+    offsets = array("I", [0])
+    digest_parts: list[bytes] = []
+    expiries = array("d")
+    for bucket in buckets:
+        if bucket:
+            bucket.sort()
+            digest_parts.append(b"".join([digest for digest, _ in bucket]))
+            expiries.extend([expires_at for _, expires_at in bucket])
+        offsets.append(len(expiries))
+    max_expires_at = max(expiries, default=0.0)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        expiries.byteswap()
+
+    count = len(expiries)
+    header = _SNAPSHOT_HEADER.pack(
+        _SNAPSHOT_MAGIC,
+        _SNAPSHOT_VERSION,
+        _DIGEST_SIZE,
+        count,
+        now,
+        max_expires_at,
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(header)
+            handle.write(offsets.tobytes())
+            handle.writelines(digest_parts)
+            handle.write(expiries.tobytes())
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(temp_name)
+        raise
+    return count
+
+
+class _ReplaySnapshot:
+    """Read-only, memory-mapped view of a replay snapshot."""
+
+    def __init__(self, mapped: mmap.mmap, count: int, max_expires_at: float) -> None:
+        self._mapped = mapped
+        self._count = count
+        self.max_expires_at = max_expires_at
+        index_start = _SNAPSHOT_HEADER.size
+        self._digests_start = index_start + (_SNAPSHOT_BUCKETS + 1) * _SNAPSHOT_INDEX_ITEM.size
+        self._expiries_start = self._digests_start + count * _DIGEST_SIZE
+        self._offsets = array("I")
+        self._offsets.frombytes(mapped[index_start : self._digests_start])
+        if sys.byteorder != "little":
+            self._offsets.byteswap()
+
+    @classmethod
+    def open(cls, path: Path) -> _ReplaySnapshot:
+        with path.open("rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size < _SNAPSHOT_HEADER.size:
+                raise ValueError("Replay snapshot is truncated")
+            mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, digest_size, count, _, max_expires_at = _SNAPSHOT_HEADER.unpack_from(
+                mapped
+            )
+            if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+                raise ValueError("Unsupported replay snapshot format")
+            if digest_size != _DIGEST_SIZE:
+                raise ValueError("Unsupported replay snapshot digest size")
+            expected_size = (
+                _SNAPSHOT_HEADER.size
+                + (_SNAPSHOT_BUCKETS + 1) * _SNAPSHOT_INDEX_ITEM.size
+                + count * (_DIGEST_SIZE + _SNAPSHOT_EXPIRY.size)
+            )
+            if size != expected_size:
+                raise ValueError("Replay snapshot is truncated or corrupt")
+            snapshot = cls(mapped, count, max_expires_at)
+            if snapshot._offsets[-1] != count or snapshot._offsets[0] != 0:
+                raise ValueError("Replay snapshot index is corrupt")
+        except BaseException:
+            mapped.close()
+            raise
+        return snapshot
+
+    def __len__(self) -> int:
+        return self._count
+
+    def contains(self, digest: bytes, now: float) -> bool:
+        bucket = int.from_bytes(digest[:2], "big")
+        low, high = self._offsets[bucket], self._offsets[bucket + 1]
+        mapped, start = self._mapped, self._digests_start
+        while low < high:
+            middle = (low + high) // 2
+            offset = start + middle * _DIGEST_SIZE
+            candidate = mapped[offset : offset + _DIGEST_SIZE]
+            if candidate < digest:
+                low = middle + 1
+            elif candidate > digest:
+                high = middle
+            else:
+                return self._expires_at(middle) > now
+        return False
+
+    def unexpired(self, now: float) -> Iterator[tuple[bytes, float]]:
+        for index in range(self._count):
+            expires_at = self._expires_at(index)
+            if expires_at > now:
+                offset = self._digests_start + index * _DIGEST_SIZE
+                yield self._mapped[offset : offset + _DIGEST_SIZE], expires_at
+
+    def close(self) -> None:
+        self._mapped.close()
+
+    def _expires_at(self, index: int) -> float:
+        offset = self._expiries_start + index * _SNAPSHOT_EXPIRY.size
+        return float(_SNAPSHOT_EXPIRY.unpack_from(self._mapped, offset)[0])
 
 
 class SQLiteReplayLedger:
     """SQLite-backed replay ledger for durable single-node applications."""
 
-    def __init__(self, path: str, ttl_seconds: int) -> None:
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: int,
+        *,
+        observer: GuardBandObserver | None = None,
+    ) -> None:
         self.path = Path(path)
         self.ttl_seconds = ttl_seconds
+        self.observer = observer
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._init_db()
 
@@ -77,6 +514,33 @@ class SQLiteReplayLedger:
         key_id: str,
         nonce: str,
         now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume(context, key_id, nonce, now)
+        return observe_consume(
+            observer, "ledger.consume", lambda: self._consume(context, key_id, nonce, now)
+        )
+
+    def consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume_many(context, entries, now)
+        return observe_consume(
+            observer, "ledger.consume_many", lambda: self._consume_many(context, entries, now)
+        )
+
+    def _consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None,
     ) -> bool:
         current_time = time.time() if now is None else now
         ledger_key = self._ledger_key(context, key_id, nonce)
@@ -102,6 +566,39 @@ class SQLiteReplayLedger:
                 return False
         return True
 
+    def _consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None,
+    ) -> bool:
+        current_time = time.time() if now is None else now
+        expires_at = current_time + self.ttl_seconds
+        context_value = _canonical_replay_value(context)
+        rows = [
+            (self._ledger_key(context, key_id, nonce), context_value, key_id, nonce, expires_at)
+            for key_id, nonce in entries
+        ]
+
+        conn = self._connect()
+        try:
+            # The connection context manager rolls back on the escaping
+            # IntegrityError, so a single replayed nonce records none of them.
+            with conn:
+                conn.execute("DELETE FROM replay_nonces WHERE expires_at <= ?", (current_time,))
+                conn.executemany(
+                    """
+                    INSERT INTO replay_nonces (ledger_key, context_value, key_id, nonce, expires_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """,
+                    rows,
+                )
+        except sqlite3.IntegrityError:
+            return False
+        finally:
+            conn.close()
+        return True
+
     def _init_db(self) -> None:
         with self._connect() as conn:
             conn.execute("PRAGMA journal_mode=WAL")
@@ -137,12 +634,71 @@ def apply_replay_protection(
     if not result.get("valid") or ledger is None:
         return result
 
-    if not ledger.consume(context, result["key_id"], result["nonce"]):
-        return {
-            "valid": False,
-            "error": "Replay detected for nonce in this context",
-            "nonce": result.get("nonce"),
-            "key_id": result.get("key_id"),
-        }
+    try:
+        fresh = ledger.consume(context, result["key_id"], result["nonce"])
+    except ReplayLedgerUnavailableError:
+        return _ledger_unavailable(result)
+    return result if fresh else _replay_detected(result)
+
+
+def apply_replay_protection_many(
+    results: Sequence[GuardBandResult],
+    context: GuardBandContext,
+    ledger: ReplayLedger | None,
+) -> list[GuardBandResult]:
+    """Consume every valid result's nonce in one all-or-nothing batch.
+
+    Invalid results pass through unchanged. If any nonce was already consumed,
+    every valid result is rejected as a replay, because the batch is accepted
+    or refused as a unit.
+    """
+    if ledger is None:
+        return list(results)
+    valid = [result for result in results if result.get("valid")]
+    if not valid:
+        return list(results)
+
+    entries = [(result["key_id"], result["nonce"]) for result in valid]
+    try:
+        fresh = consume_many(ledger, context, entries)
+    except ReplayLedgerUnavailableError:
+        return [
+            _ledger_unavailable(result) if result.get("valid") else result for result in results
+        ]
+    if fresh:
+        return list(results)
+    return [_replay_detected(result) if result.get("valid") else result for result in results]
+
+
+async def apply_async_replay_protection(
+    result: GuardBandResult,
+    context: GuardBandContext,
+    ledger: AsyncReplayLedger | None,
+) -> GuardBandResult:
+    """Async counterpart of ``apply_replay_protection`` for awaitable ledgers."""
+    if not result.get("valid") or ledger is None:
+        return result
+
+    try:
+        fresh = await ledger.consume(context, result["key_id"], result["nonce"])
+    except ReplayLedgerUnavailableError:
+        return _ledger_unavailable(result)
+    return result if fresh else _replay_detected(result)
+
+
+def _replay_detected(result: GuardBandResult) -> GuardBandResult:
+    return {
+        "valid": False,
+        "error": "Replay detected for nonce in this context",
+        "nonce": result.get("nonce"),
+        "key_id": result.get("key_id"),
+    }
+
 
-    return result
+def _ledger_unavailable(result: GuardBandResult) -> GuardBandResult:
+    return {
+        "valid": False,
+        "error": "Replay ledger unavailable",
+        "nonce": result.get("nonce"),
+        "key_id": result.get("key_id"),
+    }
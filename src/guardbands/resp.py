@@ -0,0 +1,557 @@
+"""Replay ledgers backed by a shared Redis-protocol (RESP2) server.
+
+The ledgers speak only the subset of the Redis wire protocol needed for atomic
+nonce consumption -- ``SET key 1 NX PX ttl`` -- so any RESP-compatible server
+can provide cross-host replay protection without a client-library dependency.
+Connection, protocol, and server errors raise ``ReplayLedgerUnavailableError`` so
+enforcement boundaries fail closed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Sequence
+from typing import BinaryIO
+
+from .crypto import GuardBandContext
+from .metrics import LatencyHistogram
+from .observability import GuardBandObserver, observe_consume, observe_consume_async
+from .replay import (
+    NonceEntries,
+    ReplayLedgerUnavailableError,
+    _canonical_replay_value,
+    _has_duplicates,
+    _ledger_digest,
+    _ledger_digests,
+)
+
+DEFAULT_KEY_PREFIX = "guardbands:replay:"
+
+
+class RESPError:
+    """An error reply returned by the server for one command."""
+
+    __slots__ = ("message",)
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+
+    def __repr__(self) -> str:
+        return f"RESPError({self.message!r})"
+
+
+RESPReply = bytes | int | None | RESPError | list["RESPReply"]
+
+
+def encode_command(*args: bytes | str | int) -> bytes:
+    """Encode one command as a RESP array of bulk strings."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        raw = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(raw), raw))
+    return b"".join(parts)
+
+
+def _decode_header(line: bytes) -> tuple[bytes, bytes]:
+    if len(line) < 3 or not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed by RESP server")
+    return line[:1], line[1:-2]
+
+
+def _read_reply(stream: BinaryIO) -> RESPReply:
+    prefix, payload = _decode_header(stream.readline())
+    if prefix == b"+":
+        return payload
+    if prefix == b"-":
+        return RESPError(payload.decode("utf-8", "replace"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = stream.read(length + 2)
+        if len(data) != length + 2:
+            raise ConnectionError("Connection closed by RESP server")
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [_read_reply(stream) for _ in range(length)]
+    raise ConnectionError(f"Unexpected RESP reply type: {prefix!r}")
+
+
+async def _read_reply_async(reader: asyncio.StreamReader) -> RESPReply:
+    prefix, payload = _decode_header(await reader.readline())
+    if prefix == b"+":
+        return payload
+    if prefix == b"-":
+        return RESPError(payload.decode("utf-8", "replace"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply_async(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected RESP reply type: {prefix!r}")
+
+
+def _handshake_commands(password: str | None, db: int) -> list[bytes]:
+    commands = []
+    if password is not None:
+        commands.append(encode_command("AUTH", password))
+    if db:
+        commands.append(encode_command("SELECT", db))
+    return commands
+
+
+def _check_handshake(replies: Sequence[RESPReply]) -> None:
+    for reply in replies:
+        if isinstance(reply, RESPError):
+            raise ConnectionError(f"RESP handshake failed: {reply.message}")
+
+
+class _RESPLedgerBase:
+    """Key derivation, reply interpretation, and latency accounting."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int,
+        key_prefix: str,
+        pool_size: int,
+        timeout: float,
+        observer: GuardBandObserver | None,
+    ) -> None:
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if pool_size <= 0:
+            raise ValueError("pool_size must be positive")
+        if timeout <= 0:
+            raise ValueError("timeout must be positive")
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.observer = observer
+        self._latency: dict[int, LatencyHistogram] = {}
+        self._latency_lock = threading.Lock()
+
+    def pipeline_latency(self) -> dict[int, LatencyHistogram]:
+        """Return round-trip latency histograms keyed by pipeline depth."""
+        with self._latency_lock:
+            snapshot = {}
+            for depth, histogram in self._latency.items():
+                copy = LatencyHistogram(histogram.bounds)
+                copy.merge(histogram)
+                snapshot[depth] = copy
+            return snapshot
+
+    def _record_latency(self, depth: int, elapsed: float) -> None:
+        with self._latency_lock:
+            histogram = self._latency.get(depth)
+            if histogram is None:
+                histogram = self._latency[depth] = LatencyHistogram()
+            histogram.observe(elapsed)
+
+    def _key_prefix(self, context: GuardBandContext) -> str:
+        # The hash tag sends every key of one context to the same Redis
+        # Cluster slot, so a batch transaction never spans shards.
+        tag = hashlib.sha256(_canonical_replay_value(context).encode("utf-8")).hexdigest()
+        return f"{self.key_prefix}{{{tag[:16]}}}:"
+
+    def _ledger_key(self, context: GuardBandContext, key_id: str, nonce: str) -> str:
+        return self._key_prefix(context) + _ledger_digest(context, key_id, nonce).hex()
+
+    def _set_command(self, context: GuardBandContext, key_id: str, nonce: str) -> bytes:
+        # Redis owns expiry, so the TTL is relative to the server clock.
+        return encode_command(
+            "SET",
+            self._ledger_key(context, key_id, nonce),
+            "1",
+            "NX",
+            "PX",
+            self.ttl_seconds * 1000,
+        )
+
+    def _batch_commands(self, context: GuardBandContext, entries: NonceEntries) -> list[bytes]:
+        # MSETNX is the server's all-or-nothing primitive but cannot set a TTL,
+        # so the expiries ride in the same MULTI/EXEC transaction. PEXPIRE on
+        # an already-consumed key only extends how long it stays rejected.
+        prefix = self._key_prefix(context)
+        keys = [prefix + digest.hex() for digest in _ledger_digests(context, entries)]
+        ttl_ms = self.ttl_seconds * 1000
+        return [
+            encode_command("MULTI"),
+            encode_command("MSETNX", *(part for key in keys for part in (key, "1"))),
+            *(encode_command("PEXPIRE", key, ttl_ms) for key in keys),
+            encode_command("EXEC"),
+        ]
+
+    @staticmethod
+    def _batch_consumed(replies: Sequence[RESPReply]) -> bool:
+        transaction = replies[-1]
+        if isinstance(transaction, list) and transaction and isinstance(transaction[0], int):
+            return transaction[0] == 1
+        errors = [reply.message for reply in replies if isinstance(reply, RESPError)]
+        detail = errors[0] if errors else f"unexpected reply {transaction!r}"
+        raise ReplayLedgerUnavailableError(f"RESP transaction failed: {detail}")
+
+    @staticmethod
+    def _consumed(reply: RESPReply) -> bool:
+        if reply == b"OK":
+            return True
+        if reply is None:
+            return False
+        if isinstance(reply, RESPError):
+            raise ReplayLedgerUnavailableError(f"RESP server error: {reply.message}")
+        raise ReplayLedgerUnavailableError(f"Unexpected RESP reply: {reply!r}")
+
+
+class _Connection:
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile("rb")
+
+    def execute(self, commands: Sequence[bytes]) -> list[RESPReply]:
+        self.sock.sendall(b"".join(commands))
+        return [_read_reply(self.stream) for _ in commands]
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            self.sock.close()
+
+
+class RESPReplayLedger(_RESPLedgerBase):
+    """Replay ledger shared across hosts through a Redis-protocol server.
+
+    Connections are pooled and every round trip is pipelined: commands are
+    written in one send and their replies read back in order. Expiry is
+    enforced by the server clock; ``now`` is accepted for protocol
+    compatibility only.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        ttl_seconds: int,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+        pool_size: int = 8,
+        timeout: float = 1.0,
+        password: str | None = None,
+        db: int = 0,
+        observer: GuardBandObserver | None = None,
+    ) -> None:
+        super().__init__(
+            ttl_seconds=ttl_seconds,
+            key_prefix=key_prefix,
+            pool_size=pool_size,
+            timeout=timeout,
+            observer=observer,
+        )
+        self.host = host
+        self.port = port
+        self._handshake = _handshake_commands(password, db)
+        self._idle: list[_Connection] = []
+        self._idle_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume(context, key_id, nonce, now)
+        return observe_consume(
+            observer, "ledger.consume", lambda: self._consume(context, key_id, nonce, now)
+        )
+
+    def consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return self._consume_many(context, entries, now)
+        return observe_consume(
+            observer, "ledger.consume_many", lambda: self._consume_many(context, entries, now)
+        )
+
+    def _consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None,
+    ) -> bool:
+        (reply,) = self._execute([self._set_command(context, key_id, nonce)])
+        return self._consumed(reply)
+
+    def _consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None,
+    ) -> bool:
+        if not entries:
+            return True
+        if _has_duplicates(entries):
+            return False
+        return self._batch_consumed(self._execute(self._batch_commands(context, entries)))
+
+    def close(self) -> None:
+        """Close idle pooled connections."""
+        with self._idle_lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    def _execute(self, commands: Sequence[bytes]) -> list[RESPReply]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise ReplayLedgerUnavailableError("RESP connection pool exhausted")
+        try:
+            with self._idle_lock:
+                connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = self._connect()
+                started = time.perf_counter()
+                replies = connection.execute(commands)
+            except (OSError, ValueError) as exc:
+                if connection is not None:
+                    connection.close()
+                raise ReplayLedgerUnavailableError(f"RESP ledger unavailable: {exc}") from exc
+            self._record_latency(len(commands), time.perf_counter() - started)
+            with self._idle_lock:
+                self._idle.append(connection)
+            return replies
+        finally:
+            self._slots.release()
+
+    def _connect(self) -> _Connection:
+        connection = _Connection(self.host, self.port, self.timeout)
+        try:
+            if self._handshake:
+                _check_handshake(connection.execute(self._handshake))
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+
+class _AsyncConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def execute(self, commands: Sequence[bytes]) -> list[RESPReply]:
+        self.writer.write(b"".join(commands))
+        await self.writer.drain()
+        return [await _read_reply_async(self.reader) for _ in commands]
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class AsyncRESPReplayLedger(_RESPLedgerBase):
+    """Asyncio replay ledger that coalesces concurrent consumes.
+
+    Consumes issued in the same event-loop iteration, or while every pooled
+    connection is busy, are written as a single pipeline and resolved from
+    one round trip. Instances must be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        ttl_seconds: int,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+        pool_size: int = 4,
+        timeout: float = 1.0,
+        password: str | None = None,
+        db: int = 0,
+        max_pipeline: int = 256,
+        observer: GuardBandObserver | None = None,
+    ) -> None:
+        super().__init__(
+            ttl_seconds=ttl_seconds,
+            key_prefix=key_prefix,
+            pool_size=pool_size,
+            timeout=timeout,
+            observer=observer,
+        )
+        if max_pipeline <= 0:
+            raise ValueError("max_pipeline must be positive")
+        self.host = host
+        self.port = port
+        self.max_pipeline = max_pipeline
+        self._handshake = _handshake_commands(password, db)
+        self._idle: list[_AsyncConnection] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self._pending: deque[tuple[list[bytes], asyncio.Future[list[RESPReply]]]] = deque()
+        self._flush_scheduled = False
+        self._workers: set[asyncio.Task[None]] = set()
+
+    async def consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return await self._consume(context, key_id, nonce, now)
+        return await observe_consume_async(
+            observer, "ledger.consume", lambda: self._consume(context, key_id, nonce, now)
+        )
+
+    async def consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None = None,
+    ) -> bool:
+        observer = self.observer
+        if observer is None:
+            return await self._consume_many(context, entries, now)
+        return await observe_consume_async(
+            observer, "ledger.consume_many", lambda: self._consume_many(context, entries, now)
+        )
+
+    async def _consume(
+        self,
+        context: GuardBandContext,
+        key_id: str,
+        nonce: str,
+        now: float | None,
+    ) -> bool:
+        (reply,) = await self._submit([self._set_command(context, key_id, nonce)])
+        return self._consumed(reply)
+
+    async def _consume_many(
+        self,
+        context: GuardBandContext,
+        entries: NonceEntries,
+        now: float | None,
+    ) -> bool:
+        if not entries:
+            return True
+        if _has_duplicates(entries):
+            return False
+        return self._batch_consumed(await self._submit(self._batch_commands(context, entries)))
+
+    async def aclose(self) -> None:
+        """Wait for in-flight pipelines, then close idle connections."""
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            connection.close()
+
+    async def _submit(self, commands: list[bytes]) -> list[RESPReply]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list[RESPReply]] = loop.create_future()
+        self._pending.append((commands, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._spawn_worker)
+        return await future
+
+    def _spawn_worker(self) -> None:
+        self._flush_scheduled = False
+        worker = asyncio.get_running_loop().create_task(self._drain())
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+
+    def _take_batch(self) -> list[tuple[list[bytes], asyncio.Future[list[RESPReply]]]]:
+        batch: list[tuple[list[bytes], asyncio.Future[list[RESPReply]]]] = []
+        depth = 0
+        while self._pending and (
+            not batch or depth + len(self._pending[0][0]) <= self.max_pipeline
+        ):
+            item = self._pending.popleft()
+            batch.append(item)
+            depth += len(item[0])
+        return batch
+
+    async def _drain(self) -> None:
+        async with self._slots:
+            if not self._pending:
+                return
+            try:
+                connection = self._idle.pop() if self._idle else await self._connect()
+            except (OSError, ValueError, TimeoutError) as exc:
+                self._fail(list(self._pending), exc)
+                self._pending.clear()
+                return
+
+            while self._pending:
+                batch = self._take_batch()
+                commands = [command for commands, _ in batch for command in commands]
+                try:
+                    started = time.perf_counter()
+                    async with asyncio.timeout(self.timeout):
+                        replies = await connection.execute(commands)
+                except (OSError, ValueError, TimeoutError, asyncio.IncompleteReadError) as exc:
+                    connection.close()
+                    self._fail(batch, exc)
+                    if self._pending and not self._flush_scheduled:
+                        self._flush_scheduled = True
+                        asyncio.get_running_loop().call_soon(self._spawn_worker)
+                    return
+                self._record_latency(len(commands), time.perf_counter() - started)
+                offset = 0
+                for item_commands, future in batch:
+                    if not future.done():
+                        future.set_result(replies[offset : offset + len(item_commands)])
+                    offset += len(item_commands)
+            self._idle.append(connection)
+
+    @staticmethod
+    def _fail(
+        batch: Sequence[tuple[list[bytes], asyncio.Future[list[RESPReply]]]],
+        exc: BaseException,
+    ) -> None:
+        for _, future in batch:
+            if not future.done():
+                error = ReplayLedgerUnavailableError(f"RESP ledger unavailable: {exc}")
+                error.__cause__ = exc
+                future.set_exception(error)
+
+    async def _connect(self) -> _AsyncConnection:
+        async with asyncio.timeout(self.timeout):
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+            connection = _AsyncConnection(reader, writer)
+            try:
+                if self._handshake:
+                    _check_handshake(await connection.execute(self._handshake))
+            except BaseException:
+                connection.close()
+                raise
+        return connection
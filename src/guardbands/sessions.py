@@ -0,0 +1,242 @@
+"""Session-derived HMAC subkeys.
+
+An Ed25519 signature on every message gives role separation, but costs an
+asymmetric sign and verify per band. A session amortizes that: the server
+signs one short-lived :class:`SessionGrant` with its ordinary key, and both
+peers derive two HMAC-SHA256 subkeys from it with HKDF, one per direction.
+Bands made under those subkeys carry the session algorithm tag, so they never
+verify as ordinary HMAC or Ed25519 bands, and the subkeys of one session
+cannot verify another session's bands.
+
+The grant carries the session secret, so it must travel over a confidential
+channel, and only the two session peers can verify session bands.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import re
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from .crypto import (
+    CURRENT_PROTOCOL_VERSION,
+    DEFAULT_TTL_SECONDS,
+    GuardBandContext,
+    GuardBandCrypto,
+    GuardBandKey,
+    GuardBandResult,
+    SessionKey,
+    canonical_json,
+)
+from .observability import GuardBandObserver
+
+SessionRole = Literal["client", "server"]
+SESSION_SECRET_BYTES = 32
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{16,43}$")
+_GRANT_FIELDS = frozenset(
+    {"audience", "expires_at", "issued_at", "secret", "session_id", "subject"}
+)
+_HKDF_INFO = b"guard-bands/session/v1/"
+
+
+def _grant_context(audience: str) -> GuardBandContext:
+    return {"audience": audience, "integration": "guard-bands", "purpose": "session-grant"}
+
+
+@dataclass(frozen=True, slots=True)
+class SessionGrant:
+    """What the server vouches for when it opens a session.
+
+    ``subject`` is the key id that authenticated the peer which asked for
+    the session, and ``secret`` is the base64url HKDF input key material.
+    """
+
+    session_id: str
+    audience: str
+    subject: str
+    issued_at: int
+    expires_at: int
+    secret: str
+
+    def to_value(self) -> dict[str, Any]:
+        return {
+            "audience": self.audience,
+            "expires_at": self.expires_at,
+            "issued_at": self.issued_at,
+            "secret": self.secret,
+            "session_id": self.session_id,
+            "subject": self.subject,
+        }
+
+    @classmethod
+    def from_value(cls, value: Any) -> SessionGrant:
+        """Parse a grant value, rejecting anything but the exact fields."""
+        if not isinstance(value, dict) or set(value) != _GRANT_FIELDS:
+            raise ValueError("Malformed session grant")
+        for field in ("audience", "secret", "session_id", "subject"):
+            if not isinstance(value[field], str):
+                raise ValueError("Malformed session grant")
+        for field in ("issued_at", "expires_at"):
+            if isinstance(value[field], bool) or not isinstance(value[field], int):
+                raise ValueError("Malformed session grant")
+        if not _SESSION_ID_PATTERN.fullmatch(value["session_id"]):
+            raise ValueError("Malformed session grant")
+        grant = cls(**value)
+        if len(grant.secret_bytes()) != SESSION_SECRET_BYTES:
+            raise ValueError("Malformed session grant")
+        return grant
+
+    def secret_bytes(self) -> bytes:
+        try:
+            return base64.urlsafe_b64decode(self.secret + "=" * (-len(self.secret) % 4))
+        except ValueError:
+            return b""
+
+    def digest(self) -> bytes:
+        """SHA-256 of the canonical grant, which salts every subkey."""
+        return hashlib.sha256(canonical_json(self.to_value()).encode("utf-8")).digest()
+
+
+def issue_session_grant(
+    crypto: GuardBandCrypto,
+    *,
+    audience: str,
+    subject: str,
+    ttl_seconds: int = DEFAULT_TTL_SECONDS,
+    key_id: str | None = None,
+    issuer: str | None = None,
+    now: float | None = None,
+) -> tuple[SessionGrant, GuardBandResult]:
+    """Open a session and return its grant with a detached signature.
+
+    The grant is signed with ``crypto``'s ordinary signing key, normally an
+    Ed25519 key, and expires together with its envelope.
+    """
+    if ttl_seconds <= 0:
+        raise ValueError("ttl_seconds must be positive")
+    issued_at = int(time.time() if now is None else now)
+    grant = SessionGrant(
+        session_id=secrets.token_urlsafe(16),
+        audience=audience,
+        subject=subject,
+        issued_at=issued_at,
+        expires_at=issued_at + ttl_seconds,
+        secret=base64.urlsafe_b64encode(secrets.token_bytes(SESSION_SECRET_BYTES))
+        .decode("ascii")
+        .rstrip("="),
+    )
+    envelope = crypto.sign_value(
+        grant.to_value(),
+        _grant_context(audience),
+        key_id=key_id,
+        issuer=issuer,
+        ttl_seconds=ttl_seconds,
+        now=issued_at,
+    )
+    return grant, envelope
+
+
+def verify_session_grant(
+    crypto: GuardBandCrypto,
+    value: Any,
+    envelope: Any,
+    *,
+    audience: str,
+    now: float | None = None,
+) -> SessionGrant:
+    """Return the grant if ``envelope`` authenticates it for ``audience``.
+
+    Raises :class:`ValueError` when the grant is malformed, forged, expired,
+    or was issued for another audience.
+    """
+    if not isinstance(envelope, dict):
+        raise ValueError("Session grant verification failed")
+    verification = crypto.verify_value(value, envelope, _grant_context(audience), now=now)
+    if not verification.get("valid"):
+        raise ValueError("Session grant verification failed")
+    grant = SessionGrant.from_value(value)
+    if grant.audience != audience or grant.expires_at != verification["expires_at"]:
+        raise ValueError("Session grant verification failed")
+    return grant
+
+
+def derive_session_key(grant: SessionGrant, sender: SessionRole) -> SessionKey:
+    """Derive the subkey that authenticates bands sent by ``sender``."""
+    hkdf = HKDF(
+        algorithm=SHA256(),
+        length=32,
+        salt=grant.digest(),
+        info=_HKDF_INFO + sender.encode("ascii"),
+    )
+    return SessionKey(hkdf.derive(grant.secret_bytes()))
+
+
+def session_key_id(grant: SessionGrant, sender: SessionRole) -> str:
+    return f"{grant.session_id}.{sender}"
+
+
+class SessionKeyResolver:
+    """Key resolver for one peer of one session.
+
+    It signs with the subkey for bands this peer sends and resolves only the
+    other peer's subkey for verification. Both stop working once the grant
+    expires, and no other key id resolves, so one session's bands never
+    verify in another.
+    """
+
+    def __init__(self, grant: SessionGrant, role: SessionRole) -> None:
+        peer: SessionRole = "server" if role == "client" else "client"
+        self.grant = grant
+        self.role = role
+        self._signing = (session_key_id(grant, role), derive_session_key(grant, role))
+        self._verification = (session_key_id(grant, peer), derive_session_key(grant, peer))
+
+    def expired(self, now: float | None = None) -> bool:
+        return int(time.time() if now is None else now) > self.grant.expires_at
+
+    def get_signing_key(self, key_id: str | None = None) -> tuple[str, GuardBandKey]:
+        if key_id is not None and key_id != self._signing[0]:
+            raise ValueError(f"Unknown signing key id: {key_id}")
+        if self.expired():
+            raise ValueError("Guard Band session has expired")
+        return self._signing
+
+    def get_verification_key(self, key_id: str) -> GuardBandKey | None:
+        if key_id != self._verification[0] or self.expired():
+            return None
+        return self._verification[1]
+
+
+def session_crypto(
+    grant: SessionGrant,
+    role: SessionRole,
+    *,
+    signing_version: str = CURRENT_PROTOCOL_VERSION,
+    observer: GuardBandObserver | None = None,
+) -> GuardBandCrypto:
+    """Return a :class:`GuardBandCrypto` that signs and verifies as ``role``."""
+    return GuardBandCrypto(
+        key_resolver=SessionKeyResolver(grant, role),
+        signing_version=signing_version,
+        observer=observer,
+    )
+
+
+__all__ = [
+    "SESSION_SECRET_BYTES",
+    "SessionGrant",
+    "SessionKeyResolver",
+    "SessionRole",
+    "derive_session_key",
+    "issue_session_grant",
+    "session_crypto",
+    "session_key_id",
+    "verify_session_grant",
+]
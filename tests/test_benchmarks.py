@@ -0,0 +1,105 @@
+import asyncio
+
+from benchmarks.cases import all_cases
+from benchmarks.harness import (
+    RESULT_SCHEMA,
+    BenchmarkCase,
+    Fixture,
+    compare,
+    load_results,
+    regressions,
+    run_suite,
+)
+from benchmarks.load import LoadConfig, run_load
+from benchmarks.memory import (
+    BASELINE,
+    DEFAULT_MEMORY_THRESHOLD,
+    METRIC,
+    memory_cases,
+    run_memory_suite,
+)
+from benchmarks.parallel import measure_parallel
+from benchmarks.response import measure_response
+
+
+def test_every_benchmark_case_runs_once():
+    results = run_suite(all_cases((100,)), min_time=0, repeat=1)
+
+    assert results["schema"] == RESULT_SCHEMA
+    assert "crypto.extract_hostile[100]" in results["results"]
+    assert "mcp.guarded_call[100]" in results["results"]
+    assert "ledger.resp_async.consume_coalesced" in results["results"]
+    assert all(result["median_ns"] > 0 for result in results["results"].values())
+
+
+def test_regressions_are_reported_against_the_threshold():
+    cleaned = []
+    case = BenchmarkCase("noop", lambda: Fixture(lambda: None, lambda: cleaned.append(True)), 10)
+    current = run_suite([case], min_time=0, repeat=2)
+    assert cleaned == [True]
+    assert set(current["results"]["noop[10]"]) >= {"median_ns", "ops_per_sec", "bytes_per_sec"}
+
+    current["results"]["noop[10]"]["median_ns"] = 130.0
+    baseline = {"schema": RESULT_SCHEMA, "results": {"noop[10]": {"median_ns": 100.0}}}
+    comparisons = compare(current, baseline)
+
+    assert [item.key for item in regressions(comparisons, 0.25)] == ["noop[10]"]
+    assert regressions(comparisons, 0.5) == []
+
+
+def test_memory_cases_report_peak_bytes_per_input_byte():
+    results = run_memory_suite(memory_cases((1_000,)), repeat=1)["results"]
+
+    assert set(results) == {
+        "memory.wrap[1000]",
+        "memory.verify[1000]",
+        "memory.extract[1000]",
+        "memory.mcp_sign_result[1000]",
+    }
+    # Every path holds at least one full copy of the content at its peak.
+    assert all(result["peak_bytes_per_input_byte"] >= 1 for result in results.values())
+
+
+def test_memory_peaks_stay_within_the_committed_baseline():
+    # Allocation peaks are deterministic, so this gates regressions in
+    # every test run. At 100 KB the ratio is dominated by content copies,
+    # which keeps it stable across interpreter versions.
+    current = run_memory_suite(memory_cases((100_000,)), repeat=1)
+    comparisons = compare(current, load_results(BASELINE), metric=METRIC)
+
+    assert len(comparisons) == 4
+    assert regressions(comparisons, DEFAULT_MEMORY_THRESHOLD) == []
+
+
+def test_load_harness_returns_expected_statuses_for_every_request_kind():
+    config = LoadConfig(clients=4, requests=60, size=100, sample_interval=0.05)
+    report = asyncio.run(run_load("memory", config))
+
+    assert report["completed"] == 60
+    assert set(report["kinds"]) == {"valid", "forged", "expired", "replayed", "oversized"}
+    assert all(stats["unexpected_status"] == 0 for stats in report["kinds"].values())
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99", "max"}
+    assert report["rss"]
+
+
+def test_streamed_response_signing_stays_below_the_buffered_peak():
+    size = 1_000_000
+    streamed = measure_response("hmac_stream", size=size, chunk_size=10_000, repeat=1)
+    buffered = measure_response("ed25519_buffered", size=size, chunk_size=10_000, repeat=1)
+    digest = measure_response("ed25519_digest_stream", size=size, chunk_size=10_000, repeat=1)
+
+    assert streamed["response_bytes"] > size
+    assert streamed["peak_bytes"] < size // 4 < size < buffered["peak_bytes"]
+    assert streamed["ttfb_ns"] < buffered["ttfb_ns"]
+    # A digest-bound band streams under the Ed25519 key that had to buffer.
+    assert digest["peak_bytes"] < size // 4
+    assert digest["ttfb_ns"] < buffered["ttfb_ns"]
+
+
+def test_parallel_calls_are_verified_in_every_mode():
+    for mode in ("inline", "executor_capped"):
+        report = measure_parallel(mode, calls=4, size=10_000, threshold=1_000)
+
+        assert report["calls"] == 4
+        assert report["calls_per_sec"] > 0
+        assert set(report["loop_lag_ms"]) == {"p50", "p95", "p99", "max"}
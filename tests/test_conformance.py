@@ -58,6 +58,13 @@ def test_signature_vectors_verify_and_v2_artifacts_reproduce():
             result = verifier.extract_and_verify(
                 vector["artifact"], vector["context"], now=vector["issued_at"]
             )
+        elif vector["mode"] == "detached-bytes":
+            result = verifier.verify_bytes(
+                bytes.fromhex(vector["bytes_hex"]),
+                vector["artifact"],
+                vector["context"],
+                now=vector["issued_at"],
+            )
         else:
             result = verifier.verify_value(
                 vector["value"],
@@ -66,6 +73,7 @@ def test_signature_vectors_verify_and_v2_artifacts_reproduce():
                 now=vector["issued_at"],
             )
         assert result["valid"] is True, vector["id"]
+        assert result.get("content_sha256") == vector.get("content_sha256"), vector["id"]
 
         if vector["version"] != "2":
             continue
@@ -82,6 +90,15 @@ def test_signature_vectors_verify_and_v2_artifacts_reproduce():
                 issuer=vector["issuer"],
                 ttl_seconds=ttl,
                 now=vector["issued_at"],
+                kind=vector.get("kind", "text"),
+            )
+        elif vector["mode"] == "detached-bytes":
+            reproduced = signer.sign_bytes(
+                bytes.fromhex(vector["bytes_hex"]),
+                vector["context"],
+                issuer=vector["issuer"],
+                ttl_seconds=ttl,
+                now=vector["issued_at"],
             )
         else:
             reproduced = signer.sign_value(
@@ -106,6 +123,13 @@ def test_negative_conformance_vectors_are_rejected():
             result = verifier.extract_and_verify(
                 vector["artifact"], vector["context"], now=1_700_000_000
             )
+        elif vector["mode"] == "detached-bytes":
+            result = verifier.verify_bytes(
+                bytes.fromhex(vector["bytes_hex"]),
+                vector["artifact"],
+                vector["context"],
+                now=1_700_000_000,
+            )
         else:
             result = verifier.verify_value(
                 vector["value"],
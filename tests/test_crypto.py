@@ -1,16 +1,30 @@
+import errno
 import sqlite3
+import time
 
 import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
 
+from guardbands import replay
 from guardbands.crypto import (
     CURRENT_PROTOCOL_VERSION,
+    DIGEST_TEXT_KIND,
+    TEXT_KIND,
     GuardBandCrypto,
     StaticKeyResolver,
     _encode_issuer,
     canonical_context,
+    content_sha256,
     extract_guard_band_blocks,
+    negotiate_band_kind,
+)
+from guardbands.observability import HistogramObserver
+from guardbands.replay import (
+    NonceReplayLedger,
+    SQLiteReplayLedger,
+    apply_replay_protection_many,
+    consume_many,
 )
-from guardbands.replay import NonceReplayLedger, SQLiteReplayLedger
 
 
 def make_crypto() -> GuardBandCrypto:
@@ -258,6 +272,102 @@ def test_nonce_replay_ledger_expires_entries():
     assert ledger.consume(context, "key001", "nonce-value", now=1011) is True
 
 
+def test_nonce_replay_ledger_snapshot_round_trip_skips_expired(tmp_path):
+    snapshot = tmp_path / "replay.snapshot"
+    ledger = NonceReplayLedger(ttl_seconds=60)
+    assert ledger.consume({"request_id": "req-001"}, "key001", "old-nonce", now=900) is True
+    for index in range(100):
+        assert ledger.consume({"request_id": "req-001"}, "key001", f"nonce-{index}", now=1_000)
+
+    assert ledger.save_snapshot(snapshot, now=1_000) == 100
+
+    restored = NonceReplayLedger(ttl_seconds=60)
+    assert restored.load_snapshot(snapshot, now=1_001) == 100
+    assert restored.consume({"request_id": "req-001"}, "key001", "nonce-7", now=1_001) is False
+    assert restored.consume({"request_id": "req-002"}, "key001", "nonce-7", now=1_001) is True
+    assert restored.consume({"request_id": "req-001"}, "key001", "old-nonce", now=1_001) is True
+    assert (
+        restored.consume_many(
+            {"request_id": "req-001"}, [("key001", "fresh"), ("key001", "nonce-8")], now=1_001
+        )
+        is False
+    )
+    assert restored.consume({"request_id": "req-001"}, "key001", "nonce-7", now=1_061) is True
+    assert NonceReplayLedger(ttl_seconds=60).load_snapshot(snapshot, now=1_060) == 0
+
+
+def test_nonce_replay_ledger_restores_at_startup_and_snapshots_on_close(tmp_path):
+    snapshot = tmp_path / "replay.snapshot"
+    context = {"request_id": "req-001"}
+    with NonceReplayLedger(ttl_seconds=60, snapshot_path=snapshot) as ledger:
+        assert ledger.consume(context, "key001", "nonce-value") is True
+
+    with NonceReplayLedger(ttl_seconds=60, snapshot_path=snapshot) as restarted:
+        assert restarted.consume(context, "key001", "nonce-value") is False
+        assert restarted.consume(context, "key001", "another-nonce") is True
+
+    assert NonceReplayLedger(ttl_seconds=60).load_snapshot(snapshot) == 2
+
+
+def test_nonce_replay_ledger_writes_periodic_snapshots(tmp_path):
+    snapshot = tmp_path / "replay.snapshot"
+    ledger = NonceReplayLedger(
+        ttl_seconds=60, snapshot_path=snapshot, snapshot_interval_seconds=0.01
+    )
+    ledger.consume({}, "key001", "nonce-value")
+    deadline = time.monotonic() + 5
+    while not snapshot.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    ledger.close()
+
+    assert NonceReplayLedger(ttl_seconds=60).load_snapshot(snapshot) == 1
+
+
+def test_periodic_snapshots_survive_a_failed_write(tmp_path, monkeypatch):
+    snapshot = tmp_path / "replay.snapshot"
+    write = replay._write_replay_snapshot
+    attempts = []
+
+    def flaky_write(path, entries, now):
+        attempts.append(path)
+        if len(attempts) == 1:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return write(path, entries, now)
+
+    monkeypatch.setattr(replay, "_write_replay_snapshot", flaky_write)
+    observer = HistogramObserver()
+    ledger = NonceReplayLedger(
+        ttl_seconds=60,
+        snapshot_path=snapshot,
+        snapshot_interval_seconds=0.01,
+        observer=observer,
+    )
+    ledger.consume({}, "key001", "nonce-value")
+    deadline = time.monotonic() + 5
+    while not snapshot.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    ledger.close()
+
+    assert NonceReplayLedger(ttl_seconds=60).load_snapshot(snapshot) == 1
+    outcomes = observer.outcomes()
+    assert outcomes[("ledger.snapshot", "snapshot_failed")] == 1
+    assert outcomes[("ledger.snapshot", "valid")] >= 1
+
+
+def test_nonce_replay_ledger_rejects_corrupt_snapshots(tmp_path):
+    snapshot = tmp_path / "replay.snapshot"
+    ledger = NonceReplayLedger(ttl_seconds=60)
+    ledger.consume({}, "key001", "nonce-value", now=1_000)
+    ledger.save_snapshot(snapshot, now=1_000)
+    snapshot.write_bytes(snapshot.read_bytes()[:-1])
+
+    with pytest.raises(ValueError, match="truncated or corrupt"):
+        NonceReplayLedger(ttl_seconds=60, snapshot_path=snapshot)
+    snapshot.write_bytes(b"not a snapshot" * 10)
+    with pytest.raises(ValueError, match="Unsupported replay snapshot format"):
+        NonceReplayLedger(ttl_seconds=60).load_snapshot(snapshot)
+
+
 def test_sqlite_replay_ledger_persists_consumed_nonces(tmp_path):
     ledger_path = tmp_path / "replay.sqlite3"
     context = {"request_id": "req-001"}
@@ -289,6 +399,63 @@ def test_sqlite_replay_ledger_preserves_pre_v2_key_serialization(tmp_path):
     assert stored_key == ('{"context":{"ratio":1.0},"key_id":"key001","nonce":"nonce-value"}')
 
 
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_consume_many_is_all_or_nothing(tmp_path, backend):
+    if backend == "memory":
+        ledger = NonceReplayLedger(ttl_seconds=60)
+    else:
+        ledger = SQLiteReplayLedger(str(tmp_path / "replay.sqlite3"), ttl_seconds=60)
+    context = {"request_id": "req-001"}
+
+    assert ledger.consume(context, "key001", "nonce-b", now=1_000) is True
+    batch = [("key001", "nonce-a"), ("key001", "nonce-b"), ("key001", "nonce-c")]
+    assert ledger.consume_many(context, batch, now=1_001) is False
+    # Nothing from the rejected batch was recorded.
+    assert ledger.consume(context, "key001", "nonce-a", now=1_002) is True
+    assert ledger.consume(context, "key001", "nonce-c", now=1_002) is True
+
+    fresh = [("key001", f"nonce-{index}") for index in range(50)]
+    assert ledger.consume_many(context, fresh, now=1_003) is True
+    assert ledger.consume_many(context, fresh[:1], now=1_004) is False
+    assert ledger.consume_many(context, [("key001", "dup"), ("key001", "dup")], now=1_004) is False
+    assert ledger.consume(context, "key001", "dup", now=1_004) is True
+    assert ledger.consume_many(context, fresh, now=1_100) is True
+
+
+def test_consume_many_falls_back_for_third_party_ledgers():
+    class ConsumeOnlyLedger:
+        def __init__(self):
+            self.inner = NonceReplayLedger(ttl_seconds=60)
+
+        def consume(self, context, key_id, nonce, now=None):
+            return self.inner.consume(context, key_id, nonce, now)
+
+    ledger = ConsumeOnlyLedger()
+    context = {"request_id": "req-001"}
+
+    assert consume_many(ledger, context, [("k", "nonce-a"), ("k", "nonce-b")]) is True
+    assert consume_many(ledger, context, [("k", "nonce-c"), ("k", "nonce-a")]) is False
+    assert consume_many(ledger, context, [("k", "nonce-d"), ("k", "nonce-d")]) is False
+
+
+def test_apply_replay_protection_many_rejects_whole_batch_on_replay():
+    crypto = make_crypto()
+    ledger = NonceReplayLedger(ttl_seconds=60)
+    context = {"request_id": "req-001"}
+    wrapped = [crypto.wrap_content(f"Band {index}", context) for index in range(3)]
+    results = [crypto.extract_and_verify(band, context) for band in wrapped]
+    invalid = crypto.extract_and_verify("not a band", context)
+
+    first = apply_replay_protection_many([*results, invalid], context, ledger)
+    assert [result["valid"] for result in first] == [True, True, True, False]
+
+    replayed = apply_replay_protection_many(results[1:], context, ledger)
+    assert [result["error"] for result in replayed] == [
+        "Replay detected for nonce in this context",
+        "Replay detected for nonce in this context",
+    ]
+
+
 def test_tampered_key_id_is_rejected():
     crypto = GuardBandCrypto(
         key_resolver=StaticKeyResolver(
@@ -416,3 +583,265 @@ def test_extract_guard_band_blocks_skips_malformed_candidate_before_valid_band()
     )
 
     assert extract_guard_band_blocks(f"{malformed}\n{wrapped}") == [wrapped]
+
+
+def test_extract_and_verify_many_matches_single_verification():
+    class CountingResolver(StaticKeyResolver):
+        lookups = 0
+
+        def get_verification_key(self, key_id):
+            CountingResolver.lookups += 1
+            return super().get_verification_key(key_id)
+
+    resolver = CountingResolver({"key001": b"test-secret", "key002": b"other-secret"})
+    crypto = GuardBandCrypto(key_resolver=resolver)
+    legacy = GuardBandCrypto(key_resolver=resolver, signing_version="1")
+    context = {"tenant": "a", "note": "naïve ✓", "limits": [1, 2.5, None], "nested": {"b": 1}}
+    bands = [
+        crypto.wrap_content('quotes " and ,"exp": inside', context),
+        crypto.wrap_content("second", context, key_id="key002"),
+        legacy.wrap_content("legacy v1 band", context),
+        crypto.wrap_content("tampered", context).replace("tampered", "tampereD"),
+        crypto.wrap_content("other tenant", {"tenant": "b"}),
+        "not a band",
+    ]
+
+    CountingResolver.lookups = 0
+    batch = crypto.extract_and_verify_many(bands, context, now=time.time())
+    batch_lookups = CountingResolver.lookups
+    single = [crypto.extract_and_verify(band, context) for band in bands]
+
+    assert [result["valid"] for result in batch] == [True, True, True, False, False, False]
+    for batched, expected in zip(batch, single, strict=True):
+        assert batched.get("error") == expected.get("error")
+        assert batched.get("content") == expected.get("content")
+    assert batch_lookups == 2
+
+
+@pytest.mark.parametrize("version", ["1", "2"])
+def test_stream_wrap_matches_wrap_content(version):
+    crypto = GuardBandCrypto(b"test-secret", signing_version=version)
+    context = {"tenant": "a", "note": "naïve ✓"}
+    pieces = ['quotes " and \\ slashes\n', "\x00\x1f\x7f ü", "😀 emoji", "", "tail ⟪INERT", ":x⟫"]
+
+    signer = crypto.stream_wrap(context, issuer="svc", now=1_000)
+    band = signer.start() + "".join(signer.update(piece) for piece in pieces) + signer.finish()
+
+    result = crypto.extract_and_verify(band, context, now=1_001)
+    assert result["valid"] is True
+    assert result["content"] == "".join(pieces)
+    assert result["nonce"] == signer.metadata["nonce"]
+    assert crypto.extract_and_verify(band, {"tenant": "b"}, now=1_001)["valid"] is False
+
+
+def test_stream_wrap_rejects_markers_split_across_pieces_and_ed25519_keys():
+    crypto = GuardBandCrypto(b"test-secret")
+    signer = crypto.stream_wrap({})
+    signer.start()
+    signer.update("before ⟪INE")
+    with pytest.raises(ValueError, match="reserved Guard Band markers"):
+        signer.update("RT:END after")
+    # An aborted stream can never be closed into a valid band.
+    with pytest.raises(ValueError, match="already finished"):
+        signer.finish()
+
+    signing = GuardBandCrypto(
+        key_resolver=StaticKeyResolver({"k": Ed25519PrivateKey.generate()}, "k")
+    )
+    with pytest.raises(ValueError, match="require an HMAC signing key"):
+        signing.stream_wrap({})
+
+
+class RemoteKeyCrypto(GuardBandCrypto):
+    """Signs and verifies with a key the resolver never sees, like a KMS."""
+
+    def __init__(self, remote_key, **kwargs):
+        super().__init__(b"placeholder-never-used", **kwargs)
+        self.remote_key = remote_key
+        self.calls = []
+
+    def sign_message(self, message, signing_key):
+        self.calls.append("sign")
+        return super().sign_message(message, self.remote_key)
+
+    def verify_message(self, message, signature, verification_key):
+        self.calls.append("verify")
+        return super().verify_message(message, signature, self.remote_key)
+
+
+def test_every_signing_path_goes_through_sign_message_and_verify_message():
+    remote = RemoteKeyCrypto(b"remote-secret")
+    local = GuardBandCrypto(b"remote-secret")
+    context = {"tenant": "a"}
+
+    bands = [
+        remote.wrap_content("plain", context),
+        remote.signer(context).wrap("prepared"),
+        remote.signer(context, kind=DIGEST_TEXT_KIND).wrap("digest"),
+    ]
+    streamed = remote.stream_wrap(context, kind=DIGEST_TEXT_KIND)
+    bands.append(streamed.start() + streamed.update("streamed") + streamed.finish())
+    envelope = remote.sign_value({"answer": 42}, context)
+    byte_envelope = remote.sign_bytes(b"raw", context)
+    assert remote.calls == ["sign"] * 6
+
+    # Only the remote key made these signatures.
+    for band in bands:
+        assert local.extract_and_verify(band, context)["valid"] is True
+    assert local.verify_value({"answer": 42}, envelope, context)["valid"] is True
+    assert local.verify_bytes(b"raw", byte_envelope, context)["valid"] is True
+
+    remote.calls.clear()
+    for band in bands:
+        assert remote.extract_and_verify(band, context)["valid"] is True
+    assert remote.verifier(context).verify(bands[1])["valid"] is True
+    assert remote.verify_value({"answer": 42}, envelope, context)["valid"] is True
+    assert remote.verify_bytes(b"raw", byte_envelope, context)["valid"] is True
+    assert remote.calls == ["verify"] * 7
+
+    # A text band would be HMACed incrementally, bypassing the override.
+    with pytest.raises(ValueError, match="overridden sign_message"):
+        remote.stream_wrap(context)
+
+
+def test_overriding_generate_mac_or_verify_mac_is_deprecated():
+    with pytest.warns(DeprecationWarning, match="override sign_message"):
+
+        class LegacySigner(GuardBandCrypto):
+            def generate_mac(self, *args, **kwargs):
+                return super().generate_mac(*args, **kwargs)
+
+    crypto = LegacySigner(b"test-secret")
+    band = crypto.wrap_content("content", {})
+    assert crypto.extract_and_verify(band, {})["valid"] is True
+
+
+def test_digest_bands_bind_the_content_hash_and_their_kind():
+    crypto = GuardBandCrypto(b"test-secret")
+    context = {"tenant": "a"}
+    content = "large document café"
+    digest = content_sha256(content)
+
+    band = crypto.wrap_content(content, context, kind=DIGEST_TEXT_KIND, now=1_000)
+    assert band.startswith(f"⟪INERT:START:v:2:k:{DIGEST_TEXT_KIND}:r:")
+    result = crypto.extract_and_verify(band, context, now=1_001)
+    assert result["valid"] is True
+    assert result["content"] == content and result["content_sha256"] == digest
+    assert "content_sha256" not in crypto.extract_and_verify(
+        crypto.wrap_content(content, context), context
+    )
+
+    # A digest computed upstream is signed as-is, so a wrong one cannot verify.
+    reused = crypto.wrap_content(content, context, kind=DIGEST_TEXT_KIND, content_digest=digest)
+    assert crypto.extract_and_verify(reused, context)["valid"] is True
+    wrong = crypto.wrap_content(content, context, kind=DIGEST_TEXT_KIND, content_digest="0" * 64)
+    assert crypto.extract_and_verify(wrong, context)["error"] == "MAC verification failed"
+    with pytest.raises(ValueError, match="lowercase hex"):
+        crypto.wrap_content(content, context, kind=DIGEST_TEXT_KIND, content_digest=digest.upper())
+    with pytest.raises(ValueError, match="requires the text-sha256 band kind"):
+        crypto.wrap_content(content, context, content_digest=digest)
+
+    tampered = band.replace("café", "cafe")
+    assert crypto.extract_and_verify(tampered, context)["error"] == "MAC verification failed"
+    stripped = band.replace(f":k:{DIGEST_TEXT_KIND}", "")
+    assert crypto.extract_and_verify(stripped, context)["error"] == "MAC verification failed"
+    spelled_out = crypto.wrap_content(content, context).replace(":v:2:", ":v:2:k:text:")
+    assert crypto.extract_and_verify(spelled_out, context)["error"] == (
+        "Unsupported guard band kind: text"
+    )
+    legacy_kind = band.replace(":v:2:", ":v:1:")
+    assert crypto.extract_and_verify(legacy_kind, context)["error"] == (
+        f"Unsupported guard band kind: {DIGEST_TEXT_KIND}"
+    )
+    with pytest.raises(ValueError, match="not supported by protocol version 1"):
+        GuardBandCrypto(b"test-secret", signing_version="1").wrap_content(
+            content, context, kind=DIGEST_TEXT_KIND
+        )
+
+
+def test_digest_bands_stream_and_batch_under_any_key():
+    private_key = Ed25519PrivateKey.generate()
+    signing = GuardBandCrypto(key_resolver=StaticKeyResolver({"k": private_key}, "k"))
+    verifying = GuardBandCrypto(
+        key_resolver=StaticKeyResolver({"k": private_key.public_key()}, "k")
+    )
+    context = {"tenant": "a"}
+    pieces = ['quotes " and \\ slashes\n', "😀 emoji", "", "tail"]
+
+    stream = signing.stream_wrap(context, kind=DIGEST_TEXT_KIND, now=1_000)
+    band = stream.start() + "".join(stream.update(piece) for piece in pieces) + stream.finish()
+    result = verifying.extract_and_verify(band, context, now=1_001)
+    assert result["valid"] is True
+    assert result["content_sha256"] == content_sha256("".join(pieces))
+
+    signer = signing.signer(context, index_field="index", kind=DIGEST_TEXT_KIND)
+    bands = signer.wrap_many(["a", "b"], indexes=[0, 1])
+    verifier = verifying.verifier(context, index_field="index")
+    assert [verifier.verify(band, index=i)["valid"] for i, band in enumerate(bands)] == [
+        True,
+        True,
+    ]
+    assert verifier.verify(bands[0], index=1)["valid"] is False
+
+
+def test_band_kind_negotiation_falls_back_to_text():
+    assert negotiate_band_kind([TEXT_KIND, DIGEST_TEXT_KIND]) == DIGEST_TEXT_KIND
+    assert negotiate_band_kind([TEXT_KIND]) == TEXT_KIND
+    assert negotiate_band_kind([]) == TEXT_KIND
+    assert negotiate_band_kind([DIGEST_TEXT_KIND], version="1") == TEXT_KIND
+
+
+def test_verifier_caches_results_without_extending_band_lifetimes():
+    class CountingResolver(StaticKeyResolver):
+        lookups = 0
+
+        def get_verification_key(self, key_id):
+            CountingResolver.lookups += 1
+            return super().get_verification_key(key_id)
+
+    crypto = GuardBandCrypto(key_resolver=CountingResolver({"key001": b"test-secret"}))
+    context = {"session": "s-1"}
+    band = crypto.wrap_content("repeated", context, ttl_seconds=60, now=1_000)
+    forged = band.replace("repeated", "Repeated")
+    verifier = crypto.verifier(context, cache_size=2)
+
+    first = verifier.verify(band, now=1_010)
+    first["content"] = "mutated by the caller"
+    again = verifier.verify(band, now=1_020)
+    assert again["valid"] is True and again["content"] == "repeated"
+    assert verifier.verify(forged, now=1_020)["error"] == "MAC verification failed"
+    assert verifier.verify(forged, now=1_020)["error"] == "MAC verification failed"
+    assert CountingResolver.lookups == 1
+
+    expired = verifier.verify(band, now=1_061)
+    assert expired["valid"] is False
+    assert expired == crypto.extract_and_verify(band, context, now=1_061)
+
+
+@pytest.mark.parametrize("version", ["1", "2"])
+def test_signer_bands_verify_like_wrap_content_with_indexes(version):
+    crypto = GuardBandCrypto(b"test-secret", signing_version=version)
+    context = {"tool": "echo", "application": {"content_index": 7, "tenant": "naïve"}}
+    signer = crypto.signer(context, issuer="svc", ttl_seconds=60, index_field="content_index")
+
+    bands = signer.wrap_many(["zero", "two"], now=1_000, indexes=[0, 2])
+
+    for band, index, content in zip(bands, [0, 2], ["zero", "two"], strict=True):
+        expected = crypto.extract_and_verify(band, {**context, "content_index": index}, now=1_001)
+        assert expected["valid"] is True and expected["content"] == content
+        assert expected["issuer"] == "svc" and expected["expires_at"] == 1_060
+    verifier = crypto.verifier(context, index_field="content_index")
+    assert [r["valid"] for r in verifier.verify_many(bands, now=1_001, indexes=[0, 2])] == [
+        True,
+        True,
+    ]
+    # A band moved to another block position no longer verifies.
+    assert verifier.verify(bands[0], now=1_001, index=2)["error"] == "MAC verification failed"
+    assert crypto.extract_and_verify(signer.wrap("plain"), context)["valid"] is True
+
+    with pytest.raises(ValueError, match="requires an index_field"):
+        crypto.signer(context).wrap("x", index=0)
+    with pytest.raises(TypeError, match="must be an int"):
+        verifier.verify(bands[0], index=True)
+    with pytest.raises(ValueError, match="reserved Guard Band markers"):
+        signer.wrap("⟪INERT:END", index=0)
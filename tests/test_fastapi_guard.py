@@ -1,10 +1,31 @@
-from fastapi import FastAPI, Request
+import asyncio
+from typing import Annotated
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from fastapi import Depends, FastAPI, Request, WebSocket
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from starlette.websockets import WebSocketDisconnect
 
-from guardbands import GuardBandCrypto, NonceReplayLedger
+from guardbands import (
+    DIGEST_TEXT_KIND,
+    GuardBandCrypto,
+    NonceReplayLedger,
+    StaticKeyResolver,
+    content_sha256,
+)
 from guardbands.integrations.fastapi import (
+    GuardBandResponseRoute,
+    GuardBandResponseSigningMiddleware,
+    GuardBandRoute,
     GuardBandVerificationMiddleware,
+    GuardBandWebSocketPolicy,
+    guard_band_body,
+    guard_band_payload,
     guard_band_verification,
+    guard_band_verifications,
 )
 
 
@@ -98,6 +119,19 @@ def test_fastapi_guard_middleware_rejects_oversized_body():
     assert response.json()["detail"] == "Request body exceeds 20 bytes"
 
 
+def test_fastapi_guard_middleware_rejects_malformed_json_bodies():
+    app = make_app(GuardBandCrypto(b"test-secret"), max_body_bytes=200_000)
+    json_type = {"content-type": "application/json"}
+
+    with TestClient(app) as client:
+        nested = client.post("/protected", content=b"[" * 100_000, headers=json_type)
+        not_utf8 = client.post("/protected", content=b'{"a": "\xff"}', headers=json_type)
+
+    for response in (nested, not_utf8):
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Malformed JSON request body"
+
+
 def test_fastapi_guard_middleware_uses_injected_replay_ledger():
     crypto = GuardBandCrypto(b"test-secret")
     app = make_app(crypto, replay_ledger=NonceReplayLedger(ttl_seconds=60))
@@ -117,3 +151,521 @@ def test_fastapi_guard_middleware_uses_injected_replay_ledger():
     assert first.status_code == 200
     assert second.status_code == 400
     assert "Replay detected" in second.json()["detail"]
+
+
+def test_fastapi_guard_middleware_publishes_parsed_payload_to_dependencies():
+    class ToolInput(BaseModel):
+        wrapped_content: str
+        context: dict
+        priority: int
+
+    crypto = GuardBandCrypto(b"test-secret")
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandVerificationMiddleware,
+        crypto=crypto,
+        required_paths={"/protected", "/typed"},
+        publish_payload=True,
+    )
+
+    @app.post("/protected")
+    async def protected(payload: Annotated[dict, Depends(guard_band_payload)]):
+        return {"payload_keys": sorted(payload)}
+
+    @app.post("/typed")
+    async def typed(body: Annotated[ToolInput, Depends(guard_band_body(ToolInput))]):
+        return {"priority": body.priority}
+
+    @app.post("/unguarded")
+    async def unguarded(payload: Annotated[dict, Depends(guard_band_payload)]):
+        return payload
+
+    context = {"request_id": "req-001"}
+    body = {"wrapped_content": crypto.wrap_content("Tool input", context), "context": context}
+
+    with TestClient(app) as client:
+        keys = client.post("/protected", json={**body, "other": 1})
+        typed_ok = client.post("/typed", json={**body, "priority": 2})
+        typed_bad = client.post("/typed", json={**body, "priority": "high"})
+        missing = client.post("/unguarded", json=body)
+
+    assert keys.json() == {"payload_keys": ["context", "other", "wrapped_content"]}
+    assert typed_ok.json() == {"priority": 2}
+    assert typed_bad.status_code == 422
+    assert typed_bad.json()["detail"][0]["loc"] == ["body", "priority"]
+    assert missing.status_code == 500
+
+
+async def _asgi_post(app, path, headers, chunks):
+    pending = list(chunks)
+    received = []
+    started = {}
+
+    async def receive():
+        if not pending:
+            return {"type": "http.disconnect"}
+        chunk = pending.pop(0)
+        received.append(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started.update(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 80),
+    }
+    await app(scope, receive, send)
+    return started["status"], dict(started["headers"]), received
+
+
+def test_fastapi_guard_middleware_rejects_from_headers_before_reading_body():
+    async def downstream(scope, receive, send):
+        raise AssertionError("rejected requests must not reach the app")
+
+    app = GuardBandVerificationMiddleware(
+        downstream,
+        crypto=GuardBandCrypto(b"test-secret"),
+        required_paths={"/protected", GuardBandRoute("/small", max_body_bytes=10)},
+        max_drain_bytes=100,
+    )
+    json_type = (b"content-type", b"application/json")
+
+    declared_huge = asyncio.run(
+        _asgi_post(
+            app, "/protected", [json_type, (b"content-length", b"10000000")], [b"x" * 1000] * 3
+        )
+    )
+    wrong_type = asyncio.run(
+        _asgi_post(
+            app,
+            "/protected",
+            [(b"content-type", b"text/plain"), (b"content-length", b"5")],
+            [b"hello"],
+        )
+    )
+    per_route = asyncio.run(
+        _asgi_post(app, "/small", [json_type, (b"content-length", b"50")], [b"{" + b" " * 49])
+    )
+    undeclared_overflow = asyncio.run(
+        _asgi_post(app, "/small", [json_type], [b"x" * 8, b"x" * 8, b"x" * 200, b"x"])
+    )
+    non_ascii_length = asyncio.run(
+        _asgi_post(app, "/protected", [json_type, (b"content-length", b"\xb2")], [b"{}"])
+    )
+
+    status, headers, received = declared_huge
+    assert (status, headers.get(b"connection"), received) == (400, b"close", [])
+    status, headers, received = wrong_type
+    assert (status, headers.get(b"connection"), received) == (400, None, [b"hello"])
+    status, headers, received = per_route
+    assert (status, headers.get(b"connection")) == (400, None)
+    status, headers, received = undeclared_overflow
+    assert (status, headers.get(b"connection"), len(received)) == (400, b"close", 3)
+    status, headers, received = non_ascii_length
+    assert status == 400
+
+
+def test_fastapi_guard_middleware_matches_templates_and_per_route_policies():
+    crypto = GuardBandCrypto(b"test-secret")
+    ledger = NonceReplayLedger(ttl_seconds=60)
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandVerificationMiddleware,
+        crypto=crypto,
+        required_paths=[
+            "/docs/{doc_id}/summarize",
+            GuardBandRoute("/batch/*", wrapped_content_field="band", replay_ledger=ledger),
+        ],
+    )
+
+    @app.post("/docs/{doc_id}/summarize")
+    async def summarize(doc_id: str, request: Request):
+        return {"doc": doc_id, "content": guard_band_verification(request)["content"]}
+
+    @app.post("/docs/{doc_id}/comments")
+    async def comments(doc_id: str):
+        return {"doc": doc_id}
+
+    @app.post("/batch/{job:path}")
+    async def batch(job: str, request: Request):
+        return {"job": job, "content": guard_band_verification(request)["content"]}
+
+    context = {"request_id": "req-001"}
+    wrapped = crypto.wrap_content("Tool input", context)
+
+    with TestClient(app) as client:
+        summarized = client.post(
+            "/docs/42/summarize", json={"wrapped_content": wrapped, "context": context}
+        )
+        unsigned = client.post("/docs/42/summarize", json={"context": context})
+        open_route = client.post("/docs/42/comments", json={})
+        batched = client.post("/batch/a/b", json={"band": wrapped, "context": context})
+        replayed = client.post("/batch/a/b", json={"band": wrapped, "context": context})
+
+    assert summarized.json() == {"doc": "42", "content": "Tool input"}
+    assert unsigned.status_code == 400
+    assert open_route.json() == {"doc": "42"}
+    assert batched.json() == {"job": "a/b", "content": "Tool input"}
+    assert replayed.status_code == 400
+    assert "Replay detected" in replayed.json()["detail"]
+
+
+def test_fastapi_guard_route_matching_prefers_specific_segments():
+    async def downstream(scope, receive, send):
+        return None
+
+    middleware = GuardBandVerificationMiddleware(
+        downstream,
+        crypto=GuardBandCrypto(b"test-secret"),
+        required_paths=[
+            "/items/new",
+            "/items/{item_id:int}",
+            "/items/{slug}/edit",
+            "/items/{slug}",
+            "/items/*",
+        ],
+    )
+
+    def matched(path):
+        route = middleware._route_for({"type": "http", "method": "POST", "path": path})
+        return route and route.path
+
+    assert matched("/items/new") == "/items/new"
+    assert matched("/items/7") == "/items/{item_id:int}"
+    # Non-ASCII digits are not integers to Starlette either.
+    assert matched("/items/²") == matched("/items/١٢٣") == "/items/{slug}"
+    assert matched("/items/7/edit") == "/items/{slug}/edit"
+    assert matched("/items/widget") == "/items/{slug}"
+    assert matched("/items/widget/photos/1") == "/items/*"
+    assert matched("/items") is None
+    assert matched("/other") is None
+    with pytest.raises(ValueError, match="last segment"):
+        GuardBandVerificationMiddleware(
+            downstream, crypto=GuardBandCrypto(b"k"), required_paths=["/a/*/b"]
+        )
+
+
+def test_fastapi_guard_middleware_verifies_selected_fields_as_one_batch():
+    crypto = GuardBandCrypto(b"test-secret")
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandVerificationMiddleware,
+        crypto=crypto,
+        required_paths=[
+            GuardBandRoute(
+                "/batch",
+                wrapped_fields=("/documents/*/wrapped", "/summary/wrapped"),
+                replay_ledger=NonceReplayLedger(ttl_seconds=60),
+            )
+        ],
+    )
+
+    @app.post("/batch")
+    async def batch(request: Request):
+        results = guard_band_verifications(request)
+        return {pointer: result["content"] for pointer, result in results.items()}
+
+    context = {"request_id": "req-001"}
+    first, second, summary = (crypto.wrap_content(text, context) for text in ("a", "b", "sum"))
+    body = {
+        "context": context,
+        "documents": [{"wrapped": first}, {"wrapped": second}],
+        "summary": {"wrapped": summary},
+    }
+    tampered = {**body, "summary": {"wrapped": summary.replace("sum", "SUM")}}
+
+    with TestClient(app) as client:
+        rejected = client.post("/batch", json=tampered)
+        accepted = client.post("/batch", json=body)
+        replayed = client.post("/batch", json=body)
+        duplicate = crypto.wrap_content("dup", context)
+        duplicated = client.post(
+            "/batch",
+            json={**body, "documents": [{"wrapped": duplicate}], "summary": {"wrapped": duplicate}},
+        )
+        not_string = client.post("/batch", json={**body, "documents": [{"wrapped": 1}]})
+        no_match = client.post("/batch", json={"context": context})
+
+    assert rejected.status_code == 400
+    assert rejected.json()["detail"] == (
+        "Guard Band verification failed at /summary/wrapped: MAC verification failed"
+    )
+    # The tampered batch consumed no nonces, so its valid bands still verify.
+    assert accepted.json() == {
+        "/documents/0/wrapped": "a",
+        "/documents/1/wrapped": "b",
+        "/summary/wrapped": "sum",
+    }
+    assert "Replay detected" in replayed.json()["detail"]
+    # The same band at two locations is a replay within the batch.
+    assert "Replay detected" in duplicated.json()["detail"]
+    assert not_string.json()["detail"] == "Field must be a string: /documents/0/wrapped"
+    assert no_match.json()["detail"] == "No Guard Band fields matched"
+
+
+def make_signing_app(crypto: GuardBandCrypto, **options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandResponseSigningMiddleware,
+        crypto=crypto,
+        signed_paths=[
+            "/report",
+            "/stream",
+            "/binary",
+            GuardBandResponseRoute("/docs/{doc_id}", wrapped_fields=("/items/*/text",)),
+            GuardBandResponseRoute("/detached", wrapped_fields=("/summary",), detached=True),
+        ],
+        **options,
+    )
+
+    @app.get("/report")
+    async def report():
+        return {"status": "ok", "note": "naïve ✓"}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            # Split a multi-byte character across two chunks.
+            encoded = "first ✓ second".encode()
+            yield encoded[:7]
+            yield encoded[7:]
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/binary")
+    async def binary():
+        return PlainTextResponse(b"\xff", media_type="application/octet-stream")
+
+    @app.get("/docs/deep")
+    async def deep():
+        return PlainTextResponse("[" * 100_000, media_type="application/json")
+
+    @app.get("/docs/{doc_id}")
+    async def doc(doc_id: str):
+        return {"id": doc_id, "items": [{"text": "one"}, {"text": "two"}]}
+
+    @app.get("/detached")
+    async def detached():
+        return {"summary": {"rows": 2}}
+
+    @app.get("/open")
+    async def open_route():
+        return {"open": True}
+
+    return app
+
+
+def test_response_signing_streams_whole_bodies_as_one_band():
+    crypto = GuardBandCrypto(b"test-secret")
+
+    with TestClient(make_signing_app(crypto)) as client:
+        report = client.get("/report?verbose=1")
+        stream = client.get("/stream")
+        binary = client.get("/binary")
+        unsigned = client.get("/open")
+
+    context = {"method": "GET", "path": "/report", "query": "verbose=1"}
+    result = crypto.extract_and_verify(report.text, context)
+    assert result["valid"] is True
+    assert result["content"] == '{"status":"ok","note":"naïve ✓"}'
+    assert report.headers["content-type"] == "text/plain; charset=utf-8"
+    assert report.headers["x-guard-band-content-type"] == "application/json"
+    assert crypto.extract_and_verify(report.text, {**context, "query": ""})["valid"] is False
+
+    stream_context = {"method": "GET", "path": "/stream", "query": ""}
+    assert crypto.extract_and_verify(stream.text, stream_context)["content"] == "first ✓ second"
+    assert "content-length" not in stream.headers
+
+    assert binary.status_code == 500
+    assert "requires a text or JSON body" in binary.json()["detail"]
+    assert unsigned.json() == {"open": True}
+
+
+def test_response_signing_wraps_or_detaches_selected_fields():
+    crypto = GuardBandCrypto(b"test-secret")
+
+    with TestClient(make_signing_app(crypto)) as client:
+        inline = client.get("/docs/7")
+        detached = client.get("/detached")
+        nested = client.get("/docs/deep")
+
+    context = {"method": "GET", "path": "/docs/7", "query": ""}
+    items = inline.json()["items"]
+    assert inline.json()["id"] == "7"
+    assert [crypto.extract_and_verify(item["text"], context)["content"] for item in items] == [
+        "one",
+        "two",
+    ]
+
+    body = detached.json()
+    envelope = body["guard_bands"]["/summary"]
+    context = {"method": "GET", "path": "/detached", "query": ""}
+    assert crypto.verify_value(body["summary"], envelope, context)["valid"] is True
+    assert crypto.verify_value({"rows": 3}, envelope, context)["valid"] is False
+
+    assert nested.status_code == 500
+    assert nested.json()["detail"].startswith("Guard Band response signing failed")
+
+
+def test_response_signing_buffers_ed25519_and_bounds_context_and_body():
+    signing = GuardBandCrypto(
+        key_resolver=StaticKeyResolver({"k": Ed25519PrivateKey.generate()}, "k")
+    )
+
+    with TestClient(make_signing_app(signing)) as client:
+        report = client.get("/report")
+    context = {"method": "GET", "path": "/report", "query": ""}
+    assert signing.extract_and_verify(report.text, context)["valid"] is True
+    assert int(report.headers["content-length"]) == len(report.content)
+
+    with TestClient(make_signing_app(signing, max_body_bytes=8)) as client:
+        too_large = client.get("/report")
+    assert too_large.status_code == 500
+    assert too_large.json()["detail"] == "Response body exceeds 8 bytes"
+
+    crypto = GuardBandCrypto(b"test-secret")
+    with TestClient(make_signing_app(crypto, max_context_bytes=64)) as client:
+        long_query = client.get("/report?q=" + "x" * 100)
+    assert long_query.status_code == 500
+    assert long_query.json()["detail"] == "Guard Band response context exceeds 64 bytes"
+
+
+def test_digest_band_responses_stream_under_ed25519_keys():
+    private_key = Ed25519PrivateKey.generate()
+    signing = GuardBandCrypto(key_resolver=StaticKeyResolver({"k": private_key}, "k"))
+    verifying = GuardBandCrypto(
+        key_resolver=StaticKeyResolver({"k": private_key.public_key()}, "k")
+    )
+
+    with TestClient(make_signing_app(signing, band_kind=DIGEST_TEXT_KIND)) as client:
+        stream = client.get("/stream")
+        items = client.get("/docs/7").json()["items"]
+    result = verifying.extract_and_verify(
+        stream.text, {"method": "GET", "path": "/stream", "query": ""}
+    )
+    assert result["content"] == "first ✓ second"
+    assert result["content_sha256"] == content_sha256("first ✓ second")
+    assert "content-length" not in stream.headers
+    context = {"method": "GET", "path": "/docs/7", "query": ""}
+    assert all(verifying.extract_and_verify(item["text"], context)["valid"] for item in items)
+
+    with pytest.raises(ValueError, match="Unsupported band kind"):
+        GuardBandResponseSigningMiddleware(
+            FastAPI(),
+            GuardBandCrypto(b"test-secret", signing_version="1"),
+            signed_paths=["/report"],
+            band_kind=DIGEST_TEXT_KIND,
+        )
+
+
+def test_response_signing_aborts_streams_that_hit_a_reserved_marker():
+    crypto = GuardBandCrypto(b"test-secret")
+    app = FastAPI()
+    app.add_middleware(GuardBandResponseSigningMiddleware, crypto=crypto, signed_paths=["/s"])
+
+    @app.get("/s")
+    async def stream():
+        async def chunks():
+            yield b"harmless "
+            yield b"\xe2\x9f\xaaINERT:END"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    with TestClient(app) as client, pytest.raises(RuntimeError, match="reserved Guard"):
+        client.get("/s")
+
+
+def make_websocket_app(crypto: GuardBandCrypto, **options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandVerificationMiddleware,
+        crypto=crypto,
+        required_paths=["/ws", GuardBandRoute("/ws/batch", wrapped_fields=("/parts/*",))],
+        **options,
+    )
+
+    @app.websocket("/ws")
+    async def stream(websocket: WebSocket):
+        await websocket.accept()
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            await websocket.send_json({"content": message["guard_band_verification"]["content"]})
+
+    @app.websocket("/ws/batch")
+    async def batch(websocket: WebSocket):
+        await websocket.accept()
+        message = await websocket.receive()
+        results = message["guard_band_verifications"]
+        await websocket.send_json(
+            {pointer: result["content"] for pointer, result in results.items()}
+        )
+        await websocket.close()
+
+    return app
+
+
+def test_websocket_messages_are_verified_against_the_handshake_context():
+    crypto = GuardBandCrypto(b"test-secret")
+    context = {"path": "/ws", "query": "session=1"}
+    first, second = crypto.wrap_content("first", context), crypto.wrap_content("second", context)
+    wrong_context = crypto.wrap_content("other", {"path": "/ws", "query": ""})
+
+    with TestClient(make_websocket_app(crypto)) as client:
+        with client.websocket_connect("/ws?session=1") as websocket:
+            websocket.send_json({"wrapped_content": first})
+            accepted = websocket.receive_json()
+            websocket.send_json({"wrapped_content": first})
+            replayed = websocket.receive_json()
+            websocket.send_json({"wrapped_content": wrong_context})
+            forged = websocket.receive_json()
+            websocket.send_text("not json")
+            malformed = websocket.receive_json()
+            websocket.send_text("[" * 40_000)
+            nested = websocket.receive_json()
+            # The connection survives every rejection.
+            websocket.send_json({"wrapped_content": second})
+            still_open = websocket.receive_json()
+
+        with client.websocket_connect("/ws/batch?session=1") as websocket:
+            batch_context = {"path": "/ws/batch", "query": "session=1"}
+            parts = [crypto.wrap_content(text, batch_context) for text in ("a", "b")]
+            websocket.send_json({"parts": parts})
+            batch = websocket.receive_json()
+
+    assert accepted == {"content": "first"}
+    assert replayed["type"] == "guard_band_error"
+    assert "Replay detected" in replayed["detail"]
+    assert forged["detail"] == "Guard Band verification failed: MAC verification failed"
+    assert malformed["detail"] == nested["detail"] == "Malformed JSON message"
+    assert still_open == {"content": "second"}
+    assert batch == {"/parts/0": "a", "/parts/1": "b"}
+
+
+def test_websocket_policy_can_close_on_invalid_messages():
+    crypto = GuardBandCrypto(b"test-secret")
+    policy = GuardBandWebSocketPolicy(close_on_invalid=True, send_errors=False)
+
+    with (
+        TestClient(make_websocket_app(crypto, websocket_policy=policy)) as client,
+        client.websocket_connect("/ws") as websocket,
+    ):
+        websocket.send_json({"wrapped_content": "not a band"})
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_json()
+
+    assert closed.value.code == 1008
+    assert closed.value.reason == "Guard Band verification failed: Missing start marker"
@@ -1,17 +1,33 @@
 import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import mcp.types as mcp_types
 import pytest
 from mcp import Client
+from mcp.client import advertise
 from mcp.server.mcpserver import MCPServer
 from mcp.shared.exceptions import MCPError
 from mcp.types import CallToolResult, ImageContent, TextContent
 
-from guardbands import GuardBandCrypto
+from guardbands import (
+    SESSION_MAC_ALG,
+    GuardBandCrypto,
+    StaticKeyResolver,
+    generate_ed25519_keypair,
+    load_ed25519_private_key,
+    load_ed25519_public_key,
+)
 from guardbands.integrations.mcp import (
     MCP_GUARD_BAND_ID,
+    MCP_GUARD_BAND_VERSION,
     GuardBandMCPClient,
     GuardBandMCPServerExtension,
+    MCPContextCache,
     MCPGuardBandError,
+    MCPInputReplayLedger,
+    MCPTaskStore,
     MCPToolPolicy,
     guard_bands_client_capability,
 )
@@ -23,7 +39,7 @@ def run(coro):
     return asyncio.run(coro)
 
 
-def make_server(*, context=None, policies=None, tool=None):
+def make_server(*, context=None, policies=None, tool=None, replay_ledger=None, executor=None):
     crypto = GuardBandCrypto(b"mcp-test-secret")
     extension = GuardBandMCPServerExtension(
         crypto,
@@ -31,6 +47,8 @@ def make_server(*, context=None, policies=None, tool=None):
         policies={"echo": POLICY} if policies is None else policies,
         context_resolver=lambda _name, _args, _ctx: context or {},
         issuer="test-server",
+        replay_ledger=replay_ledger,
+        executor=executor,
     )
     server = MCPServer("test-server", extensions=[extension])
     if tool is None:
@@ -212,6 +230,24 @@ def test_output_only_policy_uses_call_binding_without_input_signature():
     run(scenario())
 
 
+def test_result_text_band_kind_is_negotiated_from_client_capabilities():
+    async def call(extension):
+        server, crypto = make_server()
+        raw, guarded, _ = await guarded_client(
+            server, crypto, client=Client(server, extensions=[extension])
+        )
+        async with raw:
+            result = await guarded.call_tool("echo", {"text": "hello"})
+        return result.content[0].text
+
+    # Clients that list digest bands get them; older clients get text bands.
+    digest = run(call(guard_bands_client_capability()))
+    assert digest.startswith("⟪INERT:START:v:2:k:text-sha256:")
+    legacy = advertise(MCP_GUARD_BAND_ID, {"envelopeVersion": MCP_GUARD_BAND_VERSION})
+    text = run(call(legacy))
+    assert text.startswith("⟪INERT:START:v:2:r:")
+
+
 def test_result_from_another_call_cannot_be_transplanted():
     class ReplayClient:
         def __init__(self, client):
@@ -267,3 +303,590 @@ def test_reserved_metadata_payload_limits_and_marker_smuggling_fail_closed():
                 await guarded.call_tool("echo", {"text": "hello"})
 
     run(scenario())
+
+
+def test_input_replay_ledger_allows_bounded_retries_of_one_call():
+    ledger = MCPInputReplayLedger(retry_window_seconds=30, max_retries=2)
+    call = ("call-id-000000000001", "a" * 64, "nonce-value-000001")
+
+    assert ledger.consume(*call, expires_at=1_060, now=1_000) is True
+    assert ledger.consume(*call, expires_at=1_060, now=1_010) is True
+    assert ledger.consume(*call, expires_at=1_060, now=1_020) is True
+    assert ledger.consume(*call, expires_at=1_060, now=1_021) is False
+
+    late = ("call-id-000000000002", "a" * 64, "nonce-value-000002")
+    assert ledger.consume(*late, expires_at=1_060, now=1_000) is True
+    assert ledger.consume(*late, expires_at=1_060, now=1_031) is False
+    assert ledger.consume(*late, expires_at=1_060, now=1_060) is False
+
+    assert ledger.consume(*late, expires_at=1_060, now=1_061) is False
+    assert len(ledger) == 0
+    fresh = ("call-id-000000000003", "b" * 64, "nonce-value-000003")
+    assert ledger.consume(*fresh, expires_at=5_000, now=4_000) is True
+    assert ledger.consume(*fresh, expires_at=5_000, now=4_999) is False
+    assert len(ledger) == 1
+
+
+def test_server_rejects_replayed_inputs_beyond_the_retry_budget():
+    calls = 0
+
+    def echo(text: str) -> str:
+        nonlocal calls
+        calls += 1
+        return text
+
+    class ResendingClient:
+        def __init__(self, client):
+            self.client = client
+
+        async def call_tool(self, name, arguments, *, meta=None, **kwargs):
+            for _ in range(2):
+                await self.client.call_tool(name, arguments, meta=meta, **kwargs)
+            return await self.client.call_tool(name, arguments, meta=meta, **kwargs)
+
+    async def scenario():
+        ledger = MCPInputReplayLedger(max_retries=1)
+        server, crypto = make_server(tool=echo, replay_ledger=ledger)
+        async with Client(server) as raw:
+            guarded = GuardBandMCPClient(
+                ResendingClient(raw),
+                crypto,
+                audience="test-server",
+                policies={"echo": POLICY},
+            )
+            with pytest.raises(MCPError, match="Guard Band input replay detected"):
+                await guarded.call_tool("echo", {"text": "hello"})
+
+    run(scenario())
+    assert calls == 2
+
+
+def test_arguments_are_canonicalized_once_per_side_of_a_call(monkeypatch):
+    import guardbands.crypto
+
+    arguments = {"text": "untrusted document"}
+    passes = []
+
+    def counting(value):
+        if value == arguments:
+            passes.append(value)
+        return original(value)
+
+    original = guardbands.crypto.canonical_json
+    monkeypatch.setattr(guardbands.crypto, "canonical_json", counting)
+
+    def many_blocks(text: str) -> CallToolResult:
+        return CallToolResult(content=[TextContent(type="text", text=text)] * 20)
+
+    async def scenario():
+        server, crypto = make_server(tool=many_blocks)
+        raw, guarded, _ = await guarded_client(server, crypto)
+        async with raw:
+            return await guarded.call_tool("echo", arguments)
+
+    result = run(scenario())
+
+    assert len(result.content) == 20
+    # One pass on the client and one on the server, for the input digest,
+    # input signing or verification, and all 22 contexts.
+    assert len(passes) == 2
+
+
+def test_oversized_arguments_are_rejected_without_canonicalizing_them(monkeypatch):
+    import guardbands.crypto
+
+    passes = []
+    original = guardbands.crypto.canonical_json
+
+    def counting(value):
+        passes.append(value)
+        return original(value)
+
+    monkeypatch.setattr(guardbands.crypto, "canonical_json", counting)
+
+    async def scenario():
+        server, crypto = make_server()
+        async with Client(server) as raw:
+            guarded = GuardBandMCPClient(
+                raw,
+                crypto,
+                audience="test-server",
+                policies={"echo": POLICY},
+                max_payload_bytes=1_000,
+            )
+            with pytest.raises(MCPGuardBandError, match="payload is too large"):
+                await guarded.call_tool("echo", {"text": "x" * 1_000_000})
+
+    run(scenario())
+
+    assert not any(value == {"text": "x" * 1_000_000} for value in passes)
+
+
+def test_guarded_results_are_dumped_once_per_side(monkeypatch):
+    dumps = []
+    original = TextContent.model_dump
+
+    def counting(self, **kwargs):
+        dumps.append(self.text)
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(TextContent, "model_dump", counting)
+
+    def three_blocks(text: str) -> CallToolResult:
+        return CallToolResult(content=[TextContent(type="text", text=text)] * 3)
+
+    async def scenario():
+        server, crypto = make_server(tool=three_blocks)
+        raw, guarded, _ = await guarded_client(server, crypto)
+        async with raw:
+            return await guarded.call_tool("echo", {"text": "untrusted"})
+
+    result = run(scenario())
+
+    assert all(block.text.startswith("⟪INERT:START") for block in result.content)
+    # The server dumps each block before wrapping; the client dumps the
+    # wrapped blocks it verifies.
+    assert dumps == ["untrusted"] * 3 + [block.text for block in result.content]
+
+
+def test_text_blocks_are_signed_and_verified_in_an_executor():
+    class CountingExecutor(ThreadPoolExecutor):
+        submitted = 0
+
+        def submit(self, fn, /, *args, **kwargs):
+            CountingExecutor.submitted += 1
+            return super().submit(fn, *args, **kwargs)
+
+    image = ImageContent(type="image", data="aGVsbG8=", mimeType="image/png")
+
+    def interleaved(text: str) -> CallToolResult:
+        blocks = [TextContent(type="text", text=f"{text} {index}") for index in range(4)]
+        return CallToolResult(content=[blocks[0], image, *blocks[1:]])
+
+    class SwappingClient:
+        def __init__(self, client):
+            self.client = client
+
+        async def call_tool(self, name, arguments, *, meta=None, **kwargs):
+            result = await self.client.call_tool(name, arguments, meta=meta, **kwargs)
+            first, image, second, *rest = result.content
+            return result.model_copy(update={"content": [second, image, first, *rest]})
+
+    async def scenario(executor):
+        server, crypto = make_server(tool=interleaved, executor=executor)
+        async with Client(server) as raw:
+            guarded = GuardBandMCPClient(
+                raw, crypto, audience="test-server", policies={"echo": POLICY}, executor=executor
+            )
+            result = await guarded.call_tool("echo", {"text": "block"})
+            swapped = GuardBandMCPClient(
+                SwappingClient(raw),
+                crypto,
+                audience="test-server",
+                policies={"echo": POLICY},
+                executor=executor,
+            )
+            with pytest.raises(MCPGuardBandError, match="output verification failed"):
+                await swapped.call_tool("echo", {"text": "block"})
+        return result
+
+    with CountingExecutor(max_workers=4) as executor:
+        result = run(scenario(executor))
+
+    assert result.content[1] == image
+    texts = [block.text for block in result.content if isinstance(block, TextContent)]
+    assert [text.split("\n")[1] for text in texts] == [f"block {index}" for index in range(4)]
+    # Four blocks signed on the server, then the whole result and four blocks
+    # verified on the client, for the successful call; the swapped call signs
+    # four more blocks and fails verifying the whole result.
+    assert CountingExecutor.submitted == 14
+
+
+def test_client_verifies_large_results_in_the_executor_under_a_concurrency_cap(monkeypatch):
+    active = peak = 0
+    threads = set()
+    lock = threading.Lock()
+
+    async def scenario(executor):
+        server, crypto = make_server()
+        async with Client(server) as raw:
+            guarded = GuardBandMCPClient(
+                raw,
+                crypto,
+                audience="test-server",
+                policies={"echo": POLICY},
+                executor=executor,
+                executor_threshold_bytes=1_000,
+                max_concurrent_verifications=2,
+            )
+            verify_output = guarded._verify_output
+
+            def tracked(*args):
+                nonlocal active, peak
+                with lock:
+                    threads.add(threading.get_ident())
+                    active += 1
+                    peak = max(peak, active)
+                time.sleep(0.02)
+                with lock:
+                    active -= 1
+                return verify_output(*args)
+
+            monkeypatch.setattr(guarded, "_verify_output", tracked)
+            # A small result stays on the event loop.
+            await guarded.call_tool("echo", {"text": "small"})
+            assert threads == {threading.get_ident()}
+            threads.clear()
+            results = await asyncio.gather(
+                *(
+                    guarded.call_tool("echo", {"text": f"{index} " + "x" * 2_000})
+                    for index in range(6)
+                )
+            )
+        return results
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = run(scenario(executor))
+
+    assert [result.structured_content["echo"][0] for result in results] == list("012345")
+    assert threading.get_ident() not in threads
+    assert peak == 2
+
+
+def test_async_context_resolver_overlaps_calls_and_binds_its_context():
+    started = []
+    release = asyncio.Event()
+
+    async def resolve(name, arguments, _ctx):
+        started.append(arguments["text"])
+        await release.wait()
+        return {"tenant": "a", "tool": name}
+
+    async def scenario():
+        crypto = GuardBandCrypto(b"mcp-test-secret")
+        extension = GuardBandMCPServerExtension(
+            crypto,
+            audience="test-server",
+            policies={"echo": POLICY},
+            async_context_resolver=resolve,
+        )
+        server = MCPServer("test-server", extensions=[extension])
+
+        @server.tool(name="echo")
+        def echo(text: str) -> dict[str, str]:
+            return {"echo": text}
+
+        raw, guarded, _ = await guarded_client(server, crypto)
+        async with raw:
+            calls = [
+                asyncio.create_task(
+                    guarded.call_tool(
+                        "echo", {"text": text}, guard_context={"tenant": "a", "tool": "echo"}
+                    )
+                )
+                for text in ("one", "two")
+            ]
+            while len(started) < 2:
+                await asyncio.sleep(0)
+            release.set()
+            results = await asyncio.gather(*calls)
+            with pytest.raises(MCPError, match="input verification failed"):
+                await guarded.call_tool("echo", {"text": "x"}, guard_context={"tenant": "b"})
+        return results
+
+    results = run(scenario())
+
+    assert [result.structured_content for result in results] == [{"echo": "one"}, {"echo": "two"}]
+    with pytest.raises(ValueError, match="not both"):
+        GuardBandMCPServerExtension(
+            GuardBandCrypto(b"k"),
+            audience="a",
+            policies={},
+            context_resolver=lambda _name, _args, _ctx: {},
+            async_context_resolver=resolve,
+        )
+
+
+def test_context_cache_reuses_contexts_per_tool_and_tenant_until_they_expire():
+    clock = [0.0]
+    lookups = []
+    release = asyncio.Event()
+
+    async def resolve_for(tenant):
+        lookups.append(tenant)
+        await release.wait()
+        if tenant == "broken":
+            raise RuntimeError("database unavailable")
+        return {"tenant": tenant}
+
+    cache = MCPContextCache(
+        lambda _name, arguments, _ctx: arguments.get("tenant"),
+        ttl_seconds=30,
+        max_entries=2,
+        clock=lambda: clock[0],
+    )
+
+    def get(tool, tenant):
+        arguments = {} if tenant is None else {"tenant": tenant}
+        return cache.get(tool, arguments, None, lambda: resolve_for(tenant))
+
+    async def scenario():
+        # Concurrent misses for one key share a single lookup.
+        first = [asyncio.create_task(get("echo", "a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        assert await asyncio.gather(*first) == [{"tenant": "a"}] * 3
+        assert await get("echo", "a") == {"tenant": "a"}
+        assert await get("other", "a") == {"tenant": "a"}
+        assert lookups == ["a", "a"]
+
+        with pytest.raises(RuntimeError, match="database unavailable"):
+            await get("echo", "broken")
+        with pytest.raises(RuntimeError, match="database unavailable"):
+            await get("echo", "broken")
+        await get("echo", None)
+        await get("echo", None)
+        assert lookups == ["a", "a", "broken", "broken", None, None]
+
+        clock[0] = 30.0
+        await get("echo", "a")
+        assert lookups[-1] == "a" and len(cache) == 2
+
+    run(scenario())
+
+
+def ed25519_peers():
+    client_private, client_public = generate_ed25519_keypair()
+    server_private, server_public = generate_ed25519_keypair()
+    server_crypto = GuardBandCrypto(
+        key_resolver=StaticKeyResolver(
+            {
+                "server": load_ed25519_private_key(server_private),
+                "client": load_ed25519_public_key(client_public),
+            },
+            "server",
+        )
+    )
+    client_crypto = GuardBandCrypto(
+        key_resolver=StaticKeyResolver(
+            {
+                "client": load_ed25519_private_key(client_private),
+                "server": load_ed25519_public_key(server_public),
+            },
+            "client",
+        )
+    )
+    return server_crypto, client_crypto
+
+
+def make_session_server(server_crypto):
+    extension = GuardBandMCPServerExtension(
+        server_crypto, audience="test-server", policies={"echo": POLICY}, session_ttl_seconds=600
+    )
+    server = MCPServer("test-server", extensions=[extension])
+
+    @server.tool(name="echo")
+    def echo(text: str) -> dict[str, str]:
+        return {"echo": text}
+
+    return server, extension
+
+
+def test_session_calls_use_hmac_subkeys_after_one_ed25519_grant():
+    server_crypto, client_crypto = ed25519_peers()
+    server, extension = make_session_server(server_crypto)
+    sent = []
+
+    class RecordingClient:
+        def __init__(self, client):
+            self.client = client
+
+        async def call_tool(self, name, arguments, *, meta=None, **kwargs):
+            sent.append(meta[MCP_GUARD_BAND_ID])
+            return await self.client.call_tool(name, arguments, meta=meta, **kwargs)
+
+    async def scenario():
+        async with Client(server) as raw:
+            guarded = GuardBandMCPClient(
+                RecordingClient(raw),
+                client_crypto,
+                audience="test-server",
+                policies={"echo": POLICY},
+                use_sessions=True,
+            )
+            first = await guarded.call_tool("echo", {"text": "one"})
+            second = await guarded.call_tool("echo", {"text": "two"})
+            # A server that lost its sessions makes the client open a new one.
+            extension._sessions.clear()
+            third = await guarded.call_tool("echo", {"text": "three"})
+            return first, second, third
+
+    first, second, third = run(scenario())
+
+    assert [result.structured_content["echo"] for result in (first, second, third)] == [
+        "one",
+        "two",
+        "three",
+    ]
+    assert sent[0]["session"] == "request" and sent[0]["input"]["key_id"] == "client"
+    session_id = sent[1]["session_id"]
+    assert sent[1]["input"]["algorithm"] == SESSION_MAC_ALG
+    assert first.meta[MCP_GUARD_BAND_ID]["session"]["grant"]["subject"] == "client"
+    assert second.meta[MCP_GUARD_BAND_ID]["output"]["key_id"] == f"{session_id}.server"
+    assert f":kid:{session_id}.server:" in second.content[0].text
+    # The retried call was rejected, resent without the session, and re-granted.
+    assert sent[2]["session_id"] == session_id
+    assert "session_id" not in sent[3] and sent[3]["session"] == "request"
+    assert len(extension._sessions) == 1
+
+
+def test_session_subkeys_cannot_be_used_in_another_session():
+    server_crypto, client_crypto = ed25519_peers()
+    server, extension = make_session_server(server_crypto)
+
+    async def scenario():
+        async with Client(server) as raw:
+            clients = [
+                GuardBandMCPClient(
+                    raw,
+                    client_crypto,
+                    audience="test-server",
+                    policies={"echo": POLICY},
+                    use_sessions=True,
+                )
+                for _ in range(2)
+            ]
+            for guarded in clients:
+                await guarded.call_tool("echo", {"text": "open"})
+            first, second = clients
+            # The second client names the first client's session but signs
+            # with its own session's subkey.
+            second._session = (first._session[0], second._session[1])
+            with pytest.raises(MCPError, match="input verification failed"):
+                await second.call_tool("echo", {"text": "crossed"})
+
+    run(scenario())
+    assert len(extension._sessions) == 2
+
+
+DEFERRED_POLICY = MCPToolPolicy(guard_inputs=True, guard_outputs=True, deferred=True)
+
+
+def make_task_server(store, *, fail=False, policy=DEFERRED_POLICY):
+    crypto = GuardBandCrypto(b"mcp-test-secret")
+    extension = GuardBandMCPServerExtension(
+        crypto, audience="test-server", policies={"echo": policy}, task_store=store
+    )
+    server = MCPServer("test-server", extensions=[extension])
+
+    @server.tool(name="echo")
+    async def echo(text: str) -> dict[str, str]:
+        await asyncio.sleep(0.05)
+        if fail:
+            raise MCPError(mcp_types.INTERNAL_ERROR, "report backend unavailable")
+        return {"echo": text}
+
+    return server, crypto
+
+
+def task_client(raw):
+    # The client has its own crypto so that only the server's signing counts.
+    return GuardBandMCPClient(
+        raw,
+        GuardBandCrypto(b"mcp-test-secret"),
+        audience="test-server",
+        policies={"echo": DEFERRED_POLICY},
+    )
+
+
+def test_deferred_results_are_signed_once_and_served_from_the_task_store(monkeypatch):
+    store = MCPTaskStore(poll_interval_ms=5)
+    server, crypto = make_task_server(store)
+    signed = []
+    sign_value = crypto.sign_value
+    monkeypatch.setattr(
+        crypto,
+        "sign_value",
+        lambda *args, **kwargs: signed.append(1) or sign_value(*args, **kwargs),
+    )
+    polls = []
+
+    async def scenario():
+        async with Client(server, extensions=[guard_bands_client_capability(tasks=True)]) as raw:
+            result = await task_client(raw).call_tool("echo", {"text": "long report"})
+            (task_id,) = store._tasks
+            request = mcp_types.GetTaskRequest(
+                params=mcp_types.GetTaskRequestParams(task_id=task_id)
+            )
+            for _ in range(3):
+                polls.append(await raw.session.send_request(request, mcp_types.GetTaskResult))
+            return result, task_id
+
+    result, task_id = run(scenario())
+
+    assert result.structured_content == {"echo": "long report"}
+    assert result.content[0].text.startswith("⟪INERT:START:v:2:")
+    assert {poll.status for poll in polls} == {"completed"}
+    # However often it is polled, the final result was guarded exactly once.
+    assert signed == [1]
+    assert store.get(task_id)["result"] is store.get(task_id)["result"]
+
+
+def test_deferred_results_are_bound_to_the_call_that_started_them(monkeypatch):
+    store = MCPTaskStore(poll_interval_ms=5)
+    server, _ = make_task_server(store)
+
+    async def scenario():
+        async with Client(server, extensions=[guard_bands_client_capability(tasks=True)]) as raw:
+            guarded = task_client(raw)
+            await guarded.call_tool("echo", {"text": "first"})
+            (first_task,) = store._tasks
+            get = store.get
+            monkeypatch.setattr(store, "get", lambda _task_id: get(first_task))
+            with pytest.raises(MCPGuardBandError, match="result metadata"):
+                await guarded.call_tool("echo", {"text": "second"})
+        # Without the task capability the same tool runs inline.
+        async with Client(server, extensions=[guard_bands_client_capability()]) as raw:
+            return await task_client(raw).call_tool("echo", {"text": "inline"})
+
+    result = run(scenario())
+
+    assert result.structured_content == {"echo": "inline"}
+    assert len(store) == 2
+
+
+def test_completed_tasks_are_kept_only_while_their_result_verifies():
+    skew = [0.0]
+    store = MCPTaskStore(poll_interval_ms=5, clock=lambda: time.time() + skew[0])
+    policy = MCPToolPolicy(guard_inputs=True, guard_outputs=True, deferred=True, ttl_seconds=60)
+    server, _ = make_task_server(store, policy=policy)
+
+    async def scenario():
+        async with Client(server, extensions=[guard_bands_client_capability(tasks=True)]) as raw:
+            await task_client(raw).call_tool("echo", {"text": "report"})
+
+    run(scenario())
+    (task_id,) = store._tasks
+    task = store.get(task_id)
+    expires_at = task["result"]["_meta"][MCP_GUARD_BAND_ID]["output"]["expires_at"]
+
+    # The task ttl shrinks from an hour to the signature's lifetime.
+    assert task["status"] == "completed"
+    assert 59_000 <= task["ttl"] <= 61_000
+    skew[0] = expires_at - 1 - time.time()
+    assert store.get(task_id) is task
+    skew[0] += 2
+    with pytest.raises(MCPError, match="Unknown or expired Guard Band task"):
+        store.get(task_id)
+    assert len(store) == 0
+
+
+def test_failed_deferred_tools_surface_their_error():
+    server, _ = make_task_server(MCPTaskStore(poll_interval_ms=5), fail=True)
+
+    async def scenario():
+        async with Client(server, extensions=[guard_bands_client_capability(tasks=True)]) as raw:
+            with pytest.raises(MCPError, match="report backend unavailable"):
+                await task_client(raw).call_tool("echo", {"text": "report"})
+
+    run(scenario())
@@ -0,0 +1,201 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from mcp import Client
+from mcp.server.mcpserver import MCPServer
+
+from guardbands import GuardBandCrypto, HistogramObserver, NonceReplayLedger
+from guardbands.integrations.fastapi import GuardBandVerificationMiddleware
+from guardbands.integrations.mcp import (
+    GuardBandMCPClient,
+    GuardBandMCPServerExtension,
+    MCPToolPolicy,
+)
+from guardbands.observability import failure_category
+
+
+class RecordingObserver:
+    def __init__(self):
+        self.events = []
+
+    def observe(self, event):
+        self.events.append(event)
+
+
+def test_crypto_reports_phase_timings_and_failure_categories():
+    observer = RecordingObserver()
+    crypto = GuardBandCrypto(b"test-secret", observer=observer)
+    context = {"request_id": "req-001"}
+
+    wrapped = crypto.wrap_content("Body", context, now=1_000, ttl_seconds=60)
+    assert crypto.extract_and_verify(wrapped, context, now=1_010)["valid"] is True
+    crypto.extract_and_verify(wrapped, {"request_id": "req-002"}, now=1_010)
+    crypto.extract_and_verify(wrapped, context, now=2_000)
+    crypto.extract_and_verify("⟪INERT:START:v:2⟫ junk ⟪INERT:END", context)
+
+    wrap, valid, forged, expired, malformed = observer.events
+    assert wrap.operation == "wrap"
+    assert list(wrap.phases) == ["parse", "resolve", "canonicalize", "sign"]
+    assert valid.operation == "extract_and_verify"
+    assert valid.valid is True and valid.failure is None
+    assert list(valid.phases) == ["parse", "resolve", "canonicalize", "verify", "freshness"]
+    assert valid.algorithm == "GBv2-HMAC-SHA256"
+    assert valid.payload_bytes and valid.payload_bytes > len("Body")
+    assert valid.duration >= sum(valid.phases.values())
+    assert (forged.failure, expired.failure, malformed.failure) == (
+        "signature",
+        "expired",
+        "malformed",
+    )
+
+
+def test_crypto_reports_detached_value_operations():
+    observer = HistogramObserver()
+    crypto = GuardBandCrypto(b"test-secret", observer=observer)
+    envelope = crypto.sign_value({"a": 1}, {"tool": "x"})
+
+    assert crypto.verify_value({"a": 1}, envelope, {"tool": "x"})["valid"] is True
+    assert crypto.verify_value({"a": 2}, envelope, {"tool": "x"})["valid"] is False
+
+    assert observer.outcomes() == {
+        ("sign_value", "valid"): 1,
+        ("verify_value", "signature"): 1,
+        ("verify_value", "valid"): 1,
+    }
+    assert observer.latency("verify_value", "canonicalize").count == 2
+    assert observer.latency("verify_value").count == 2
+    snapshot = observer.snapshot()
+    assert snapshot["sign_value"]["payload_bytes"]["count"] == 1
+    assert set(snapshot["verify_value"]["phases"]) >= {"total", "resolve", "verify"}
+
+
+def test_crypto_reports_byte_envelope_operations():
+    observer = RecordingObserver()
+    crypto = GuardBandCrypto(b"test-secret", observer=observer)
+    envelope = crypto.sign_bytes(b"x" * 1_000, {})
+    assert crypto.verify_bytes(b"x" * 1_000, envelope, {})["valid"] is True
+
+    signed, verified = observer.events
+    assert signed.operation == "sign_bytes"
+    assert list(signed.phases) == ["hash", "resolve", "canonicalize", "sign"]
+    assert verified.operation == "verify_bytes" and verified.valid is True
+    assert list(verified.phases) == [
+        "parse",
+        "resolve",
+        "hash",
+        "canonicalize",
+        "verify",
+        "freshness",
+    ]
+    # The size reported is that of the bytes, not of the small signed payload.
+    assert signed.payload_bytes == verified.payload_bytes == 1_000
+
+
+def test_ledgers_report_consume_latency_and_replays():
+    observer = HistogramObserver()
+    ledger = NonceReplayLedger(ttl_seconds=60, observer=observer)
+
+    assert ledger.consume({}, "key001", "nonce-a") is True
+    assert ledger.consume({}, "key001", "nonce-a") is False
+    assert ledger.consume_many({}, [("key001", "nonce-b")]) is True
+
+    assert observer.outcomes() == {
+        ("ledger.consume", "replay"): 1,
+        ("ledger.consume", "valid"): 1,
+        ("ledger.consume_many", "valid"): 1,
+    }
+    assert observer.latency("ledger.consume", "ledger_consume").count == 2
+
+
+def test_fastapi_middleware_reports_request_outcomes():
+    observer = HistogramObserver()
+    crypto = GuardBandCrypto(b"test-secret")
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandVerificationMiddleware,
+        crypto=crypto,
+        required_paths={"/protected"},
+        replay_ledger=NonceReplayLedger(ttl_seconds=60),
+        observer=observer,
+    )
+
+    @app.post("/protected")
+    async def protected(payload: dict):
+        return {}
+
+    context = {"request_id": "req-001"}
+    wrapped = crypto.wrap_content("Body", context)
+    with TestClient(app) as client:
+        body = {"wrapped_content": wrapped, "context": context}
+        assert client.post("/protected", json=body).status_code == 200
+        assert client.post("/protected", json=body).status_code == 400
+        forged = {"wrapped_content": wrapped.replace("Body", "Evil"), "context": context}
+        assert client.post("/protected", json=forged).status_code == 400
+        malformed = client.post(
+            "/protected", content=b"[", headers={"content-type": "application/json"}
+        )
+        assert malformed.status_code == 400
+
+    assert observer.outcomes() == {
+        ("fastapi.request", "malformed"): 1,
+        ("fastapi.request", "replay"): 1,
+        ("fastapi.request", "signature"): 1,
+        ("fastapi.request", "valid"): 1,
+    }
+    assert observer.latency("fastapi.request", "ledger_consume").count == 2
+    assert observer.snapshot()["fastapi.request"]["payload_bytes"]["count"] == 4
+
+
+def test_mcp_integrations_report_tool_call_phases():
+    server_observer = RecordingObserver()
+    client_observer = RecordingObserver()
+    policy = MCPToolPolicy(guard_inputs=True, guard_outputs=True)
+    crypto = GuardBandCrypto(b"mcp-test-secret")
+    server = MCPServer(
+        "test-server",
+        extensions=[
+            GuardBandMCPServerExtension(
+                crypto,
+                audience="test-server",
+                policies={"echo": policy},
+                observer=server_observer,
+            )
+        ],
+    )
+
+    @server.tool(name="echo")
+    def echo(text: str) -> str:
+        return text
+
+    async def scenario():
+        async with Client(server) as raw:
+            guarded = GuardBandMCPClient(
+                raw,
+                crypto,
+                audience="test-server",
+                policies={"echo": policy},
+                observer=client_observer,
+            )
+            await guarded.call_tool("echo", {"text": "hello"})
+
+    asyncio.run(scenario())
+
+    (server_event,) = server_observer.events
+    assert server_event.operation == "mcp.tool_call" and server_event.valid
+    assert list(server_event.phases) == [
+        "parse",
+        "resolve_context",
+        "verify_input",
+        "handler",
+        "sign_output",
+    ]
+    (client_event,) = client_observer.events
+    assert list(client_event.phases) == ["sign_input", "call", "verify_output"]
+
+
+def test_failure_categories_never_echo_error_text():
+    assert failure_category("Unknown key id: attacker-chosen") == "unknown_key"
+    assert failure_category("Request body exceeds 10 bytes") == "too_large"
+    assert failure_category("Unsupported marker parameter: x") == "malformed"
+    assert failure_category(None) == "error"
@@ -0,0 +1,91 @@
+import threading
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from guardbands import (
+    GuardBandCrypto,
+    NonceReplayLedger,
+    PrometheusCollector,
+    metrics_endpoint,
+)
+from guardbands.integrations.fastapi import GuardBandVerificationMiddleware
+from guardbands.observability import GuardBandEvent
+
+
+def test_fastapi_metrics_endpoint_exports_outcomes_latency_and_sizes():
+    collector = PrometheusCollector(const_labels={"worker": "0"})
+    crypto = GuardBandCrypto(b"test-secret")
+    app = FastAPI()
+    app.add_middleware(
+        GuardBandVerificationMiddleware,
+        crypto=crypto,
+        required_paths={"/protected"},
+        replay_ledger=NonceReplayLedger(ttl_seconds=60, observer=collector),
+        observer=collector,
+    )
+    app.mount("/metrics", metrics_endpoint(collector))
+
+    @app.post("/protected")
+    async def protected(payload: dict):
+        return {}
+
+    context = {"request_id": "req-001"}
+    body = {"wrapped_content": crypto.wrap_content("Body", context), "context": context}
+    with TestClient(app) as client:
+        assert client.post("/protected", json=body).status_code == 200
+        assert client.post("/protected", json=body).status_code == 400
+        response = client.get("/metrics/")
+        assert client.post("/metrics/").status_code == 405
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    text = response.text
+    assert "# TYPE guardbands_operations_total counter" in text
+    assert (
+        'guardbands_operations_total{worker="0",operation="fastapi.request",outcome="valid"} 1'
+        in text
+    )
+    assert (
+        'guardbands_operations_total{worker="0",operation="fastapi.request",outcome="replay"} 1'
+        in text
+    )
+    assert 'guardbands_replay_hits_total{worker="0",operation="fastapi.request"} 1' in text
+    assert 'guardbands_replay_hits_total{worker="0",operation="ledger.consume"} 1' in text
+    assert (
+        'guardbands_phase_duration_seconds_count{worker="0",operation="fastapi.request",'
+        'phase="ledger_consume"} 2' in text
+    )
+    assert (
+        'guardbands_operation_duration_seconds_bucket{worker="0",operation="fastapi.request",'
+        'le="+Inf"} 2' in text
+    )
+    assert 'guardbands_payload_bytes_count{worker="0",operation="fastapi.request"} 2' in text
+
+
+def test_collector_merges_per_thread_shards_and_escapes_labels():
+    collector = PrometheusCollector(const_labels={})
+    event = GuardBandEvent(
+        operation='odd"op\n', valid=False, duration=0.001953125, failure="replay"
+    )
+
+    def record():
+        for _ in range(500):
+            collector.observe(event)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    text = collector.render()
+    assert 'guardbands_operations_total{operation="odd\\"op\\n",outcome="replay"} 2000' in text
+    assert (
+        'guardbands_operation_duration_seconds_bucket{operation="odd\\"op\\n",le="0.001"} 0' in text
+    )
+    assert (
+        'guardbands_operation_duration_seconds_bucket{operation="odd\\"op\\n",le="0.0025"} 2000'
+        in text
+    )
+    assert 'guardbands_operation_duration_seconds_sum{operation="odd\\"op\\n"} 3.90625' in text
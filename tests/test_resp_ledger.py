@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from benchmarks.resp_stub import RESPStubServer, key_slot
+from guardbands import GuardBandCrypto
+from guardbands.replay import (
+    ReplayLedgerUnavailableError,
+    apply_async_replay_protection,
+    apply_replay_protection,
+)
+from guardbands.resp import AsyncRESPReplayLedger, RESPReplayLedger
+
+
+def unused_port() -> int:
+    server = RESPStubServer()
+    port = server.port
+    server.stop()
+    return port
+
+
+def test_resp_ledger_consumes_once_per_context():
+    with RESPStubServer() as server:
+        ledger = RESPReplayLedger(port=server.port, ttl_seconds=60)
+
+        assert ledger.consume({"request_id": "req-001"}, "key001", "nonce-a") is True
+        assert ledger.consume({"request_id": "req-001"}, "key001", "nonce-a") is False
+        assert ledger.consume({"request_id": "req-002"}, "key001", "nonce-a") is True
+        ledger.close()
+
+    set_commands = [command for command in server.commands if command[0] == b"SET"]
+    assert set_commands[0][1].startswith(b"guardbands:replay:")
+    assert set_commands[0][2:] == [b"1", b"NX", b"PX", b"60000"]
+
+
+def test_resp_ledger_consume_many_is_all_or_nothing():
+    with RESPStubServer() as server:
+        ledger = RESPReplayLedger(port=server.port, ttl_seconds=60)
+        context = {"request_id": "req-001"}
+
+        assert ledger.consume(context, "key001", "nonce-b") is True
+        batch = [("key001", "nonce-a"), ("key001", "nonce-b")]
+        assert ledger.consume_many(context, batch) is False
+        assert ledger.consume(context, "key001", "nonce-a") is True
+
+        fresh = [("key001", f"nonce-{index}") for index in range(50)]
+        assert ledger.consume_many(context, fresh) is True
+        assert ledger.consume_many(context, fresh[-1:]) is False
+        ledger.close()
+
+    assert max(ledger.pipeline_latency()) == 53
+    assert all(at is not None for at in server.data.values())
+
+
+def test_resp_ledger_batches_stay_in_one_cluster_slot():
+    with RESPStubServer(cluster=True) as server:
+        # Untagged keys of one batch would land on different shards.
+        assert server.execute([b"MSETNX", b"a", b"1", b"b", b"1"]).startswith(b"-CROSSSLOT")
+        ledger = RESPReplayLedger(port=server.port, ttl_seconds=60)
+        context = {"request_id": "req-001"}
+
+        batch = [("key001", f"nonce-{index}") for index in range(20)]
+        assert ledger.consume_many(context, batch) is True
+        assert ledger.consume(context, "key001", "nonce-3") is False
+        assert ledger.consume({"request_id": "req-002"}, "key001", "nonce-3") is True
+        ledger.close()
+
+    slots = {key_slot(key) for key in server.data}
+    assert len(server.data) == 21 and len(slots) == 2
+
+
+def test_async_resp_ledger_consume_many_shares_pipelines():
+    async def scenario(port):
+        ledger = AsyncRESPReplayLedger(port=port, ttl_seconds=60)
+        results = await asyncio.gather(
+            ledger.consume_many({}, [("key001", "nonce-a"), ("key001", "nonce-b")]),
+            ledger.consume_many({}, [("key001", "nonce-b"), ("key001", "nonce-c")]),
+            ledger.consume({}, "key001", "nonce-c"),
+        )
+        await ledger.aclose()
+        return results
+
+    with RESPStubServer() as server:
+        assert asyncio.run(scenario(server.port)) == [True, False, True]
+
+
+def test_resp_ledger_reuses_pooled_connection_and_records_latency():
+    with RESPStubServer(password="s3cret") as server:
+        ledger = RESPReplayLedger(port=server.port, ttl_seconds=60, password="s3cret", db=2)
+        for index in range(5):
+            assert ledger.consume({}, "key001", f"nonce-{index}") is True
+        ledger.close()
+
+    assert [command[0] for command in server.commands].count(b"AUTH") == 1
+    assert [command[0] for command in server.commands].count(b"SELECT") == 1
+    latency = ledger.pipeline_latency()
+    assert set(latency) == {1}
+    assert latency[1].count == 5
+
+
+def test_resp_ledger_fails_closed_when_server_is_unreachable():
+    crypto = GuardBandCrypto(b"test-secret")
+    context = {"request_id": "req-001"}
+    result = crypto.extract_and_verify(crypto.wrap_content("Body", context), context)
+    ledger = RESPReplayLedger(port=unused_port(), ttl_seconds=60, timeout=0.5)
+
+    with pytest.raises(ReplayLedgerUnavailableError):
+        ledger.consume(context, result["key_id"], result["nonce"])
+
+    rejected = apply_replay_protection(result, context, ledger)
+    assert rejected["valid"] is False
+    assert rejected["error"] == "Replay ledger unavailable"
+
+
+def test_resp_ledger_fails_closed_on_dropped_connection():
+    with RESPStubServer() as server:
+        ledger = RESPReplayLedger(port=server.port, ttl_seconds=60)
+        assert ledger.consume({}, "key001", "nonce-a") is True
+        server.stop()
+
+        with pytest.raises(ReplayLedgerUnavailableError):
+            ledger.consume({}, "key001", "nonce-b")
+
+
+def test_async_resp_ledger_coalesces_concurrent_consumes_into_pipelines():
+    async def scenario(port):
+        ledger = AsyncRESPReplayLedger(port=port, ttl_seconds=60, pool_size=1)
+        results = await asyncio.gather(
+            *(
+                ledger.consume({"tenant": "a"}, "key001", f"nonce-{index % 15}")
+                for index in range(20)
+            )
+        )
+        await ledger.aclose()
+        return list(results), ledger.pipeline_latency()
+
+    with RESPStubServer() as server:
+        results, latency = asyncio.run(scenario(server.port))
+
+    assert results[:15] == [True] * 15
+    assert results[15:] == [False] * 5
+    assert sum(depth * histogram.count for depth, histogram in latency.items()) == 20
+    assert max(latency) > 1
+
+
+def test_async_resp_ledger_fails_closed_on_connection_errors():
+    crypto = GuardBandCrypto(b"test-secret")
+    context = {"request_id": "req-001"}
+    result = crypto.extract_and_verify(crypto.wrap_content("Body", context), context)
+
+    async def scenario() -> dict:
+        ledger = AsyncRESPReplayLedger(port=unused_port(), ttl_seconds=60, timeout=0.5)
+        with pytest.raises(ReplayLedgerUnavailableError):
+            await ledger.consume(context, "key001", "nonce-a")
+        return await apply_async_replay_protection(result, context, ledger)
+
+    rejected = asyncio.run(scenario())
+    assert rejected == {
+        "valid": False,
+        "error": "Replay ledger unavailable",
+        "nonce": result["nonce"],
+        "key_id": result["key_id"],
+    }
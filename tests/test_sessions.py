@@ -0,0 +1,118 @@
+import time
+
+import pytest
+
+from guardbands.crypto import (
+    LEGACY_SESSION_MAC_ALG,
+    SESSION_MAC_ALG,
+    GuardBandCrypto,
+    SessionKey,
+    StaticKeyResolver,
+    generate_ed25519_keypair,
+    key_algorithm,
+    load_ed25519_private_key,
+    load_ed25519_public_key,
+)
+from guardbands.sessions import (
+    SessionGrant,
+    derive_session_key,
+    issue_session_grant,
+    session_crypto,
+    session_key_id,
+    verify_session_grant,
+)
+
+
+def make_peers():
+    private_b64, public_b64 = generate_ed25519_keypair()
+    server = GuardBandCrypto(
+        key_resolver=StaticKeyResolver({"server": load_ed25519_private_key(private_b64)}, "server")
+    )
+    client = GuardBandCrypto(
+        key_resolver=StaticKeyResolver({"server": load_ed25519_public_key(public_b64)}, "server")
+    )
+    return server, client
+
+
+def open_session(server, client, **kwargs):
+    grant, envelope = issue_session_grant(server, audience="tools", subject="client-1", **kwargs)
+    received = verify_session_grant(client, grant.to_value(), envelope, audience="tools")
+    return session_crypto(grant, "server"), session_crypto(received, "client"), grant
+
+
+def test_session_peers_derive_the_same_directional_subkeys():
+    server, client = make_peers()
+    server_session, client_session, grant = open_session(server, client)
+    context = {"call_id": "call-1"}
+
+    band = client_session.wrap_content("arguments", context)
+    result = server_session.extract_and_verify(band, context)
+    assert result["valid"] is True and result["key_id"] == session_key_id(grant, "client")
+    envelope = server_session.sign_value({"answer": 42}, context)
+    assert envelope["algorithm"] == SESSION_MAC_ALG
+    assert client_session.verify_value({"answer": 42}, envelope, context)["valid"] is True
+
+    # Each direction has its own subkey, so a band cannot be reflected back.
+    assert derive_session_key(grant, "client") != derive_session_key(grant, "server")
+    reflected = client_session.extract_and_verify(band, context)
+    assert reflected["error"] == f"Unknown key id: {session_key_id(grant, 'client')}"
+
+
+def test_subkeys_cannot_cross_sessions():
+    server, client = make_peers()
+    first_server, first_client, first = open_session(server, client)
+    second_server, _, second = open_session(server, client)
+    context = {"call_id": "call-1"}
+
+    band = first_client.wrap_content("arguments", context)
+    assert second_server.extract_and_verify(band, context)["error"].startswith("Unknown key id")
+    # Even relabelled with the other session's key id, the tag does not verify.
+    relabelled = band.replace(session_key_id(first, "client"), session_key_id(second, "client"))
+    assert second_server.extract_and_verify(relabelled, context)["error"] == (
+        "MAC verification failed"
+    )
+    assert first_server.extract_and_verify(band, context)["valid"] is True
+
+
+def test_session_tags_are_not_plain_hmac_tags():
+    server, client = make_peers()
+    server_session, _, grant = open_session(server, client)
+    subkey = derive_session_key(grant, "client")
+    assert isinstance(subkey, SessionKey)
+    assert key_algorithm(subkey) == SESSION_MAC_ALG
+    assert key_algorithm(subkey, version="1") == LEGACY_SESSION_MAC_ALG
+
+    plain = GuardBandCrypto(
+        key_resolver=StaticKeyResolver(
+            {session_key_id(grant, "client"): bytes(subkey)}, session_key_id(grant, "client")
+        )
+    )
+    band = plain.wrap_content("arguments", {})
+    assert server_session.extract_and_verify(band, {})["error"] == "MAC verification failed"
+
+
+def test_grants_fail_closed():
+    server, client = make_peers()
+    now = time.time()
+    grant, envelope = issue_session_grant(
+        server, audience="tools", subject="client-1", ttl_seconds=60, now=now
+    )
+    value = grant.to_value()
+
+    with pytest.raises(ValueError, match="verification failed"):
+        verify_session_grant(client, value, envelope, audience="other-tools")
+    with pytest.raises(ValueError, match="verification failed"):
+        verify_session_grant(client, {**value, "subject": "client-2"}, envelope, audience="tools")
+    with pytest.raises(ValueError, match="verification failed"):
+        verify_session_grant(client, value, envelope, audience="tools", now=now + 61)
+    with pytest.raises(ValueError, match="Malformed"):
+        SessionGrant.from_value({**value, "secret": "c2hvcnQ"})
+
+    # A session stops signing and verifying once its grant has expired.
+    expired, _ = issue_session_grant(
+        server, audience="tools", subject="client-1", ttl_seconds=1, now=now - 10
+    )
+    with pytest.raises(ValueError, match="session has expired"):
+        session_crypto(expired, "client").wrap_content("late", {})
+    resolver = session_crypto(expired, "server").key_resolver
+    assert resolver.get_verification_key(session_key_id(expired, "client")) is None
@@ -1,13 +1,21 @@
 import base64
+import hashlib
+import io
+import tracemalloc
 
 import pytest
+from hypothesis import given
+from hypothesis import strategies as st
 
 from guardbands import (
+    BYTES_VALUE_KIND,
+    DIGEST_TEXT_KIND,
     ED25519_ALG,
     MAC_ALG,
     GuardBandCrypto,
     StaticKeyResolver,
     canonical_json,
+    canonical_json_size,
 )
 from guardbands.crypto import (
     generate_ed25519_keypair,
@@ -119,3 +127,123 @@ def test_detached_value_rejects_non_json_values():
         crypto.sign_value({"bad": object()}, {})
     with pytest.raises(ValueError, match="not representable in JCS"):
         crypto.sign_value({"bad": float("nan")}, {})
+
+
+def test_byte_envelopes_round_trip_for_bytes_files_and_streams(tmp_path):
+    crypto = GuardBandCrypto(b"structured-secret")
+    context = {"artifact": "report.pdf"}
+    data = bytes(range(256)) * 1_000
+    path = tmp_path / "report.pdf"
+    path.write_bytes(data)
+
+    envelopes = [
+        crypto.sign_bytes(data, context, now=1_000),
+        crypto.sign_file(path, context, now=1_000),
+        crypto.sign_stream(io.BytesIO(data), context, now=1_000, chunk_size=4_096),
+    ]
+    for envelope in envelopes:
+        results = [
+            crypto.verify_bytes(memoryview(data), envelope, context, now=1_001),
+            crypto.verify_file(path, envelope, context, now=1_001, chunk_size=4_096),
+            crypto.verify_stream(io.BytesIO(data), envelope, context, now=1_001, chunk_size=7),
+        ]
+        for result in results:
+            assert result["valid"] is True
+            assert result["content_sha256"] == hashlib.sha256(data).hexdigest()
+
+    envelope = envelopes[0]
+    assert crypto.verify_bytes(data[:-1] + b"\x00", envelope, context)["error"] == (
+        "Signature verification failed"
+    )
+    assert crypto.verify_bytes(data, envelope, {"artifact": "other.pdf"})["valid"] is False
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert crypto.verify_bytes(b"", crypto.sign_file(empty, context), context)["valid"] is True
+
+
+def test_byte_envelopes_are_domain_separated_and_v2_only():
+    crypto = GuardBandCrypto(b"structured-secret")
+    data = b"embedding blob"
+    digest = hashlib.sha256(data).hexdigest()
+
+    # Neither a JSON envelope nor a digest band over the same bytes verifies.
+    json_envelope = crypto.sign_value(digest, {}, now=1_000)
+    assert crypto.verify_bytes(data, json_envelope, {})["valid"] is False
+    assert crypto.verify_value(digest, crypto.sign_bytes(data, {}), {})["valid"] is False
+    band = crypto.wrap_with_metadata(data.decode(), {}, now=1_000, kind=DIGEST_TEXT_KIND)
+    transplanted = {
+        **crypto.sign_bytes(data, {}, now=1_000),
+        "nonce": band["nonce"],
+        "signature": band["wrapped"].split(":mac:")[1].split(":")[0],
+    }
+    assert crypto.verify_bytes(data, transplanted, {}, now=1_001)["error"] == (
+        "Signature verification failed"
+    )
+
+    legacy = GuardBandCrypto(b"structured-secret", signing_version="1")
+    with pytest.raises(ValueError, match="not supported by protocol version 1"):
+        legacy.sign_bytes(data, {})
+    relabelled = {**crypto.sign_bytes(data, {}), "version": "1", "algorithm": "GBv1-HMAC-SHA256"}
+    assert crypto.verify_bytes(data, relabelled, {})["error"] == (
+        f"Unsupported envelope kind: {BYTES_VALUE_KIND}"
+    )
+
+
+def test_byte_envelopes_hash_streams_in_constant_memory_after_checking_the_envelope(tmp_path):
+    class Zeros(io.RawIOBase):
+        def __init__(self, size):
+            self.remaining = size
+
+        def readable(self):
+            return True
+
+        def read(self, size=-1):
+            count = min(size, self.remaining)
+            self.remaining -= count
+            return bytes(count)
+
+    crypto = GuardBandCrypto(b"structured-secret")
+    size = 16_000_000
+    tracemalloc.start()
+    try:
+        envelope = crypto.sign_stream(Zeros(size), {}, chunk_size=65_536)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < 1_000_000
+    assert crypto.verify_stream(Zeros(size), envelope, {})["valid"] is True
+
+    # A malformed envelope is rejected before the file is even opened.
+    missing = tmp_path / "missing.bin"
+    result = crypto.verify_file(missing, {**envelope, "extra": 1}, {})
+    assert result["error"] == "Invalid detached envelope fields"
+    with pytest.raises(OSError):
+        crypto.verify_file(missing, envelope, {})
+
+
+_JSON_VALUES = st.recursive(
+    st.none()
+    | st.booleans()
+    | st.integers(min_value=-(2**53) + 1, max_value=2**53 - 1)
+    | st.floats(allow_nan=False, allow_infinity=False)
+    | st.text(),
+    lambda children: st.lists(children) | st.dictionaries(st.text(), children),
+    max_leaves=20,
+)
+
+
+@given(_JSON_VALUES)
+def test_canonical_json_size_matches_the_encoded_length(value):
+    size = len(canonical_json(value).encode("utf-8"))
+
+    assert canonical_json_size(value) == size
+    assert canonical_json_size(value, limit=size) == size
+    if size:
+        assert canonical_json_size(value, limit=size - 1) > size - 1
+
+
+def test_canonical_json_size_stops_at_the_limit():
+    # The 100 MB string is rejected from its length, before it is escaped,
+    # and the nested arrays stop after the first few items.
+    assert canonical_json_size({"text": "x" * 100_000_000}, limit=1_000) > 1_000
+    assert 500 < canonical_json_size([["y" * 100] * 10] * 1_000_000, limit=500) < 2_000_000